@@ -0,0 +1,212 @@
+import os
+import time
+import signal
+import ctypes
+import threading
+import collections
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+asyncio = lazy_import('asyncio')
+
+# 常量定义
+LOG_LINES = 200  # 每个任务在内存中保留的最近输出行数
+READ_CHUNK_SIZE = 64 * 1024  # 按块读取子进程输出，避免渲染进度等超长行超出 readline 的长度限制
+MEMORY_PER_JOB = 2 * 1024 * 1024 * 1024  # 估算的单个后台渲染进程内存占用，用于限制并行数
+MIN_THREADS_PER_JOB = 2  # 每个渲染进程至少分到的 CPU 核心数
+TERMINATE_TIMEOUT = 10  # 取消时等待进程退出的秒数，超时后强制结束
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+class MEMORYSTATUSEX(ctypes.Structure):
+    _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong), ('ullTotalPhys', ctypes.c_ulonglong),
+                ('ullAvailPhys', ctypes.c_ulonglong), ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong), ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+def available_memory():
+    # 当前可用的物理内存字节数；Linux 读取 /proc/meminfo，Windows 调用 GlobalMemoryStatusEx，其他系统退回物理内存总量，都取不到时返回 None
+    try:
+        with open('/proc/meminfo', 'r') as file:
+            for line in file:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if os.name == 'nt':
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(status)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+        return None
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def cpu_cores():
+    # 本进程可用的 CPU 核心数，Linux 上考虑 CPU 亲和性设置
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def default_workers():
+    # 并行数同时受核心数和可用内存限制：每个进程至少分到 MIN_THREADS_PER_JOB 个核心和 MEMORY_PER_JOB 内存
+    workers = cpu_cores() // MIN_THREADS_PER_JOB
+    memory = available_memory()
+    if memory is not None:
+        workers = min(workers, memory // MEMORY_PER_JOB)
+    return max(1, workers)
+
+def stop_process(process, kill=False):
+    # POSIX 上子进程在独立的进程组中运行，信号发给整个进程组，它启动的子进程也一并结束，不会继续占用输出管道
+    try:
+        if os.name == 'nt':
+            process.kill() if kill else process.terminate()
+        else:
+            os.killpg(process.pid, signal.SIGKILL if kill else signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+class BatchJob:
+    # 批量运行中的一个版本：状态、退出码、耗时，以及最近 LOG_LINES 行输出组成的环形缓冲
+    def __init__(self, name, executable, args=()):
+        self.name = name
+        self.executable = executable
+        self.args = list(args)
+        self.state = JOB_PENDING
+        self.exit_code = None
+        self.started = None
+        self.duration = None
+        self.error = None
+        self.log = collections.deque(maxlen=LOG_LINES)
+        self.process = None
+        self._start_time = None
+    
+    def elapsed(self):
+        # 运行中的任务返回已运行的秒数
+        if self.duration is not None:
+            return self.duration
+        return time.monotonic() - self._start_time if self._start_time is not None else None
+    
+    def log_lines(self):
+        # deque 的复制由 GIL 保证原子性，界面线程可以随时读取
+        return list(self.log)
+    
+    def result(self):
+        return {
+            'name': self.name,
+            'state': self.state,
+            'exit_code': self.exit_code,
+            'started': self.started,
+            'duration': round(self.duration, 3) if self.duration is not None else None,
+            'error': self.error
+        }
+
+class BatchRunner:
+    # 在多个版本上并行运行同一个后台任务；所有子进程由同一个 asyncio 事件循环监视和读取输出，
+    # 不为每个进程创建线程，并行数由信号量限制。run() 阻塞到全部任务结束，可在后台线程中调用
+    def __init__(self, jobs, workers=None, on_change=None):
+        self.jobs = list(jobs)
+        self.workers = max(1, workers or default_workers())
+        self.on_change = on_change  # on_change(job) 在任务开始和结束时于事件循环线程中调用
+        self._loop = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+    
+    def run(self):
+        asyncio.run(self.supervise())
+        return [job.result() for job in self.jobs]
+    
+    def start(self):
+        # 在后台线程中运行，返回该线程
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    async def supervise(self):
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.workers)
+        try:
+            await asyncio.gather(*(self.run_job(job, semaphore) for job in self.jobs))
+        finally:
+            with self._lock:
+                self._loop = None
+    
+    async def run_job(self, job, semaphore):
+        async with semaphore:
+            if self._cancelled:
+                self.finish(job, JOB_CANCELLED)
+                return
+            job.started = time.time()
+            job._start_time = time.monotonic()
+            job.state = JOB_RUNNING
+            self.notify(job)
+            try:
+                job.process = await asyncio.create_subprocess_exec(job.executable, *job.args, stdin=asyncio.subprocess.DEVNULL,
+                                                                   stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                                                                   start_new_session=os.name != 'nt')
+            except OSError as e:
+                job.error = str(e)
+                self.finish(job, JOB_FAILED)
+                return
+            if self._cancelled:
+                stop_process(job.process)
+            try:
+                await self.read_output(job)
+                job.exit_code = await job.process.wait()
+            except asyncio.CancelledError:
+                # 事件循环被中断（例如命令行按下 Ctrl+C）时不留下孤儿进程
+                stop_process(job.process, kill=True)
+                raise
+            if self._cancelled:
+                self.finish(job, JOB_CANCELLED)
+            else:
+                self.finish(job, JOB_DONE if job.exit_code == 0 else JOB_FAILED)
+    
+    async def read_output(self, job):
+        # 按块读取输出并拆分为行放入环形缓冲，最后不完整的一行留到下一块拼接
+        pending = b''
+        while True:
+            data = await job.process.stdout.read(READ_CHUNK_SIZE)
+            if not data:
+                break
+            lines = (pending + data).split(b'\n')
+            pending = lines.pop()
+            job.log.extend(line.rstrip(b'\r').decode('utf-8', errors='replace') for line in lines)
+        if pending:
+            job.log.append(pending.rstrip(b'\r').decode('utf-8', errors='replace'))
+    
+    def finish(self, job, state):
+        if job._start_time is not None:
+            job.duration = time.monotonic() - job._start_time
+        job.state = state
+        self.notify(job)
+    
+    def notify(self, job):
+        if self.on_change:
+            self.on_change(job)
+    
+    def cancel(self):
+        # 可在任意线程调用：尚未开始的任务不再启动，运行中的进程立即收到退出请求（调用方随后退出也不会留下进程），
+        # 超时仍未退出的由事件循环强制结束
+        self._cancelled = True
+        running = [job.process for job in self.jobs if job.process is not None and job.process.returncode is None]
+        for process in running:
+            stop_process(process)
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self.schedule_kill, running)
+    
+    def schedule_kill(self, processes):
+        for process in processes:
+            asyncio.ensure_future(self.kill_after(process))
+    
+    async def kill_after(self, process):
+        try:
+            await asyncio.wait_for(process.wait(), TERMINATE_TIMEOUT)
+        except asyncio.TimeoutError:
+            stop_process(process, kill=True)
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import gettext
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+gettext.install('messages')
+
+from mirror_index import parse_listing
+
+# 对比流式目录页解析器与 BeautifulSoup(html.parser) 的解析耗时和峰值内存
+# 用法: python benchmarks/bench_listing_parser.py [保存的目录页.html ...]
+
+APACHE_ROW = '<tr><td valign="top"><img src="/icons/compressed.gif" alt="[   ]"></td><td><a href="{0}">{0}</a></td><td align="right">2024-10-15 10:20  </td><td align="right">330M</td><td>&nbsp;</td></tr>\n'
+NGINX_ROW = '<a href="{0}">{0}</a>{1}15-Oct-2024 10:20{2}\n'
+
+def synthetic_listing(style, count):
+    # 生成与镜像 autoindex 页面结构相同的大型目录页
+    rows = []
+    for index in range(count):
+        name = f"blender-{index // 100}.{index // 10 % 10}.{index % 10}-windows-x64.zip"
+        if style == 'apache':
+            rows.append(APACHE_ROW.format(name))
+        else:
+            rows.append(NGINX_ROW.format(name, ' ' * (52 - len(name)), str(346030080 + index).rjust(20)))
+    if style == 'apache':
+        return '<html><body><h1>Index of /release</h1><table>\n' + ''.join(rows) + '</table></body></html>'
+    return '<html><body><h1>Index of /release/</h1><hr><pre><a href="../">../</a>\n' + ''.join(rows) + '</pre><hr></body></html>'
+
+def parse_with_soup(page):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(page, 'html.parser')
+    return [a.text.strip('/') for a in soup.find_all('a')]
+
+def measure(function, page, repeat):
+    # 返回 (最短耗时秒数, 峰值内存字节数, 结果条数)
+    best = None
+    for _index in range(repeat):
+        start = time.perf_counter()
+        result = function(page)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    function(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description="目录页解析基准测试")
+    parser.add_argument('pages', nargs='*', help="保存的目录页 HTML 文件")
+    parser.add_argument('--entries', type=int, default=20000, help="合成目录页的条目数")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    pages = []
+    for path in args.pages:
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            pages.append((os.path.basename(path), file.read()))
+    if not pages:
+        pages = [(f"{style} x{args.entries}", synthetic_listing(style, args.entries)) for style in ('apache', 'nginx')]
+    
+    try:
+        import bs4  # noqa: F401
+        parsers = [('parse_listing', parse_listing), ('BeautifulSoup', parse_with_soup)]
+    except ImportError:
+        print("bs4 未安装，仅测试 parse_listing")
+        parsers = [('parse_listing', parse_listing)]
+    
+    print(f"{'page':<24}{'parser':<16}{'entries':>9}{'time (ms)':>12}{'peak (MB)':>12}")
+    for label, page in pages:
+        for name, function in parsers:
+            elapsed, peak, count = measure(function, page, args.repeat)
+            print(f"{label:<24}{name:<16}{count:>9}{elapsed * 1000:>12.1f}{peak / 1024 / 1024:>12.1f}")
+
+if __name__ == "__main__":
+    main()
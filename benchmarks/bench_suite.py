@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import gettext
+import zipfile
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+gettext.install('messages')
+
+import http_client
+from mirror_index import parse_listing
+from downloader import SegmentedDownloader
+from extractor import StreamingInstaller, extract_archive
+from delta_installer import DeltaInstaller
+from version_scanner import FolderScanner
+from bench_listing_parser import synthetic_listing
+from tests.range_server import RangeServer
+
+# 下载、解压、目录页和版本文件夹扫描的基准测试与回归检查，不需要网络：
+# 本地 HTTP 服务器（与测试共用 tests/range_server.py，在独立进程中运行，不计入峰值内存）提供合成的 Blender 安装包和 autoindex 目录页。
+# 每个阶段记录最短耗时、吞吐和 Python 堆峰值内存，结果保存为 JSON；与基线相比变差超过容差时退出码为 1。
+# 基线与机器相关，不随代码提交：没有基线或基线的参数不同时无法做回归检查，给出提示并以退出码 2 结束
+# 用法: python benchmarks/bench_suite.py [--output results.json] [--save-baseline] [--stages download extract ...]
+
+# 常量定义
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25  # 允许的变差比例
+MIN_TIME_DELTA = 0.005  # 耗时差异小于此值（秒）视为噪声
+MIN_MEMORY_DELTA = 1024 * 1024  # 峰值内存差异小于此值（字节）视为噪声
+ARCHIVE_NAME = 'blender-4.2.0-linux-x64.zip'
+PATCH_ARCHIVE_NAME = 'blender-4.2.1-linux-x64.zip'  # 增量更新的目标：与 ARCHIVE_NAME 相比只改动可执行文件和少量脚本
+PATCH_INTERVAL = 500  # 补丁版本中每隔多少个脚本改动一个
+STAGES = ('listing_parse', 'listing_fetch', 'download', 'extract', 'streaming_install', 'delta_install', 'scan')
+
+def serve(root, port_queue):
+    server = RangeServer(root)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+def start_server(root):
+    # 返回 (进程, 根 URL)
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(root, port_queue), daemon=True)
+    process.start()
+    return process, f'http://127.0.0.1:{port_queue.get(timeout=30)}/'
+
+def make_archive(path, size, small_files, patch=False):
+    # 生成结构与 Blender 安装包相同的 ZIP：可执行文件、大量可压缩的小脚本和几个不可压缩的大动态库，返回解压后的总字节数；
+    # patch 为 True 时生成补丁版本，可执行文件和每 PATCH_INTERVAL 个脚本中的一个有改动
+    generator = random.Random(0)
+    prefix = os.path.basename(path)[:-len('.zip')] + '/'
+    script = b''.join(b'def function_%d(context):\n    return context.scene.frame_current * %d\n' % (index, index) for index in range(40))
+    total = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        def add(name, data, mode=0o644):
+            info = zipfile.ZipInfo(prefix + name, date_time=(2024, 10, 15, 10, 20, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o100000 | mode) << 16
+            archive.writestr(info, data)
+            return len(data)
+        
+        executable = generator.randbytes(1024 * 1024)
+        total += add('blender', executable[::-1] if patch else executable, 0o755)
+        for index in range(small_files):
+            changed = patch and index % PATCH_INTERVAL == 0
+            total += add(f'4.2/scripts/modules/package_{index // 100}/module_{index}.py', script + b'# patched\n' if changed else script)
+        library_size = max(1024 * 1024, size - len(executable) - small_files * len(script))  # 补丁版本的动态库与原版相同
+        for index in range(4):
+            total += add(f'lib/libblender_{index}.so', generator.randbytes(library_size // 4))
+    return total
+
+def make_versions_folder(path, count):
+    # 版本文件夹：count 个安装目录（各含可执行文件和资源目录）和一些无关文件
+    for index in range(count):
+        directory = os.path.join(path, f'Blender {index // 10}.{index % 10}.0')
+        os.makedirs(os.path.join(directory, f'{index // 10}.{index % 10}', 'datafiles'))
+        with open(os.path.join(directory, 'blender'), 'wb') as file:
+            file.write(b'\0' * 64)
+        with open(os.path.join(path, f'notes_{index}.txt'), 'w') as file:
+            file.write('x')
+
+def measure(function, setup=None, repeat=3):
+    # 返回 (最短耗时秒数, 峰值内存字节数, 最后一次的结果)；峰值内存在单独一轮中用 tracemalloc 测量，不影响计时
+    best = None
+    for _index in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    if setup:
+        setup()
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+def record(seconds, peak, size=None, count=None):
+    result = {'seconds': round(seconds, 6), 'peak_memory': peak}
+    if size is not None:
+        result['bytes'] = size
+        result['throughput'] = round(size / seconds / 1024 / 1024, 3) if seconds else None
+    if count is not None:
+        result['count'] = count
+    return result
+
+def run_benchmarks(args, work_dir):
+    results = {}
+    stages = set(args.stages)
+    server_root = os.path.join(work_dir, 'server')
+    release_dir = os.path.join(server_root, 'release')
+    os.makedirs(release_dir)
+    archive_path = os.path.join(release_dir, ARCHIVE_NAME)
+    uncompressed_size = make_archive(archive_path, args.size * 1024 * 1024, args.files)
+    archive_size = os.path.getsize(archive_path)
+    pages = {style: synthetic_listing(style, args.entries) for style in ('apache', 'nginx')}
+    with open(os.path.join(release_dir, 'index.html'), 'w', encoding='utf-8') as file:
+        file.write(pages['nginx'])
+    
+    server, base_url = start_server(server_root)
+    try:
+        if 'listing_parse' in stages:
+            for style, page in pages.items():
+                seconds, peak, entries = measure(lambda: parse_listing(page), repeat=args.repeat)
+                results[f'listing_parse_{style}'] = record(seconds, peak, len(page.encode('utf-8')), len(entries))
+        
+        if 'listing_fetch' in stages:
+            # 目录页请求延迟：下载并解析一个完整的目录页
+            url = base_url + 'release/'
+            http_client.get(url).close()  # 预先建立连接
+            seconds, peak, entries = measure(lambda: parse_listing(http_client.get(url).text), repeat=args.repeat)
+            results['listing_fetch'] = record(seconds, peak, len(pages['nginx'].encode('utf-8')), len(entries))
+        
+        download_path = os.path.join(work_dir, ARCHIVE_NAME)
+        if 'download' in stages:
+            def remove_download():
+                for path in (download_path, download_path + '.vmtpart'):
+                    if os.path.exists(path):
+                        os.remove(path)
+            
+            seconds, peak, _path = measure(lambda: SegmentedDownloader(base_url + 'release/' + ARCHIVE_NAME, download_path, args.threads).download(),
+                                           remove_download, args.repeat)
+            results['download'] = record(seconds, peak, archive_size)
+        
+        extract_path = os.path.join(work_dir, 'extract')
+        if 'extract' in stages:
+            seconds, peak, _result = measure(lambda: extract_archive(archive_path, extract_path),
+                                             lambda: shutil.rmtree(extract_path, ignore_errors=True), args.repeat)
+            results['extract'] = record(seconds, peak, uncompressed_size, args.files + 5)
+        
+        install_path = os.path.join(work_dir, 'install')
+        if 'streaming_install' in stages:
+            def remove_install():
+                shutil.rmtree(install_path, ignore_errors=True)
+                if os.path.exists(install_path + '.vmtpart'):
+                    os.remove(install_path + '.vmtpart')
+            
+            seconds, peak, _result = measure(lambda: StreamingInstaller(base_url + 'release/' + ARCHIVE_NAME, install_path, args.threads).install(),
+                                             remove_install, args.repeat)
+            results['streaming_install'] = record(seconds, peak, uncompressed_size, args.files + 5)
+        
+        if 'delta_install' in stages:
+            # 以已解压的旧版本为基准增量更新到补丁版本，吞吐按新版本解压后的大小计，fetched 为实际下载的字节数
+            make_archive(os.path.join(release_dir, PATCH_ARCHIVE_NAME), args.size * 1024 * 1024, args.files, patch=True)
+            base_path = os.path.join(work_dir, 'delta_base')
+            extract_archive(archive_path, base_path)
+            delta_path = os.path.join(work_dir, 'delta')
+            installers = []
+            
+            def delta_install():
+                installer = DeltaInstaller(base_url + 'release/' + PATCH_ARCHIVE_NAME, delta_path, base_path, args.threads)
+                installers.append(installer)
+                return installer.install()
+            
+            seconds, peak, _result = measure(delta_install, lambda: shutil.rmtree(delta_path, ignore_errors=True), args.repeat)
+            results['delta_install'] = record(seconds, peak, uncompressed_size, args.files + 5)
+            results['delta_install']['fetched'] = installers[-1].fetched_bytes
+        
+        if 'scan' in stages:
+            versions_path = os.path.join(work_dir, 'versions')
+            make_versions_folder(versions_path, args.versions)
+            seconds, peak, found = measure(lambda: FolderScanner(versions_path).scan(), repeat=args.repeat)
+            results['scan_cold'] = record(seconds, peak, count=len(found))
+            scanner = FolderScanner(versions_path)
+            scanner.scan()
+            seconds, peak, found = measure(scanner.scan, repeat=args.repeat)
+            results['scan_warm'] = record(seconds, peak, count=len(found))
+    finally:
+        server.terminate()
+    return results
+
+def compare(results, baseline, tolerance):
+    # 返回 {阶段: [回归说明, ...]}：耗时或峰值内存增加超过容差即为回归（吞吐由耗时换算，不单独比较），差异很小时忽略
+    regressions = {}
+    for stage, result in results.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        problems = []
+        if base.get('seconds') and result['seconds'] - base['seconds'] > max(base['seconds'] * tolerance, MIN_TIME_DELTA):
+            problems.append(f"time {base['seconds'] * 1000:.1f} -> {result['seconds'] * 1000:.1f} ms")
+        if base.get('peak_memory') is not None and result['peak_memory'] - base['peak_memory'] > max(base['peak_memory'] * tolerance, MIN_MEMORY_DELTA):
+            problems.append(f"peak {base['peak_memory'] / 1024 / 1024:.1f} -> {result['peak_memory'] / 1024 / 1024:.1f} MB")
+        if problems:
+            regressions[stage] = problems
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="下载、解压、目录页和版本扫描基准测试")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--size', type=int, default=64, help="合成安装包解压后的大小（MB）")
+    parser.add_argument('--files', type=int, default=3000, help="安装包中小文件的数量")
+    parser.add_argument('--entries', type=int, default=20000, help="合成目录页的条目数")
+    parser.add_argument('--versions', type=int, default=200, help="版本文件夹中的安装目录数")
+    parser.add_argument('--threads', type=int, default=4, help="下载线程数")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="把结果保存为 JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="用于比较的基线结果")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为新的基线")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="允许的变差比例，默认 0.25")
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='blender_vmt_bench_')
+    try:
+        results = run_benchmarks(args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    parameters = {name: getattr(args, name) for name in ('size', 'files', 'entries', 'versions', 'threads')}
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': parameters,
+        'results': results
+    }
+    
+    baseline = None
+    unchecked = None  # 无法做回归检查的原因
+    if not args.save_baseline:
+        if not os.path.exists(args.baseline):
+            unchecked = f"没有找到基线 {args.baseline}，未做回归检查；先在本机用 --save-baseline 生成基线"
+        else:
+            with open(args.baseline, 'r', encoding='utf-8') as file:
+                baseline = json.load(file)
+            if baseline.get('parameters') != parameters:
+                unchecked = f"基线 {args.baseline} 的参数与本次不同，未做回归检查；用相同的参数运行或用 --save-baseline 重新生成"
+                baseline = None
+    regressions = compare(results, baseline['results'], args.tolerance) if baseline else {}
+    
+    print(f"{'stage':<24}{'time (ms)':>12}{'MB/s':>10}{'peak (MB)':>12}{'count':>8}  baseline")
+    for stage, result in results.items():
+        throughput = f"{result['throughput']:.1f}" if result.get('throughput') is not None else ''
+        status = ''
+        if baseline and stage in baseline['results']:
+            status = 'REGRESSION: ' + '; '.join(regressions[stage]) if stage in regressions else 'ok'
+        print(f"{stage:<24}{result['seconds'] * 1000:>12.1f}{throughput:>10}{result['peak_memory'] / 1024 / 1024:>12.1f}{result.get('count', ''):>8}  {status}")
+    
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"结果已保存到 {path}")
+    if unchecked:
+        print(unchecked, file=sys.stderr)
+        return 2
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,63 +1,112 @@
+import time
+STARTUP_STARTED = time.perf_counter()  # 启动计时起点，在导入其他模块之前记录，计入导入耗时
 import os
 import wx
 import wx.adv
-import configparser
-import requests
-import zipfile
-import io
-from bs4 import BeautifulSoup
+import json
+import shlex
 import threading
-import shutil
-import time
-import subprocess
-import gettext
-from concurrent.futures import ThreadPoolExecutor
+import http_client
+from lazy_import import lazy_import
+from mirrors import DEFAULT_MIRRORS, parse_mirrors
+from mirror_index import DEFAULT_INDEX_TTL, CACHE_DIR, format_size
+from content_store import DEFAULT_STORE_SIZE, LINK_MODES
+from download_manager import (DEFAULT_CONCURRENT_JOBS, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW,
+                              JOB_QUEUED, JOB_RUNNING, JOB_PAUSED, JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+from launch_telemetry import RECORD_FIELDS, SUMMARY_FIELDS
+from file_remover import TreeRemover, RemovalCancelled
+from batch_runner import (default_workers, JOB_PENDING as BATCH_PENDING, JOB_RUNNING as BATCH_RUNNING, JOB_DONE as BATCH_DONE,
+                          JOB_FAILED as BATCH_FAILED, JOB_CANCELLED as BATCH_CANCELLED)
+from progress import subscribe, unsubscribe, format_speed, format_eta
+from core import VersionManagerCore, VersionNotFoundError, set_language, DEFAULT_LANGUAGE, SOURCE_URL
 
 # 设置语言环境
-LOCALE_DIR = './lang'
-DEFAULT_LANGUAGE = 'zh_CN'  # 默认语言
-
-def set_language(language):
-    gettext.bindtextdomain('messages', LOCALE_DIR)
-    gettext.textdomain('messages')
-    lang = gettext.translation('messages', LOCALE_DIR, languages=[language], fallback=True)
-    lang.install()
-    global _
-    _ = lang.gettext
-
-# 获取用户目录路径
-USER_DIR = os.path.expanduser("~")
-CONFIG_FILE = os.path.join(USER_DIR, "blender_version_manager_config.ini")
-
 set_language(DEFAULT_LANGUAGE)
 
+# 延迟加载的模块：第一次联网时才导入
+requests = lazy_import('requests')
+cache_peer = lazy_import('cache_peer')
+
 # 常量定义
 ICON_PATH = "Blender-VMT [256x256].ico"
 ICON_TYPE = wx.BITMAP_TYPE_ICO
 DEFAULT_THEME = 'Light'
-SOURCE_URL = 'https://mirrors.aliyun.com/blender/release/'
-VERSION_MANAGER_NAME = _("Blender 版本管理器")
+ICON_SIZE = 36  # 按钮图标尺寸（与 DPI 无关的逻辑像素）
+ICON_BUTTON_SIZE = 48
+ICON_CACHE_DIR = os.path.join(CACHE_DIR, "icons")  # 按实际像素尺寸缩放好的图标，启动时直接读取，不再高质量缩放
+STARTUP_LOG_ENV = 'BVM_STARTUP_LOG'  # 设置为文件路径时，每次启动把各阶段耗时追加到该文件（每行一个 JSON）
+# 界面文字在使用时才翻译，切换语言后立即生效
+VERSION_MANAGER_NAME = "Blender 版本管理器"
 VERSION_MANAGER_VERSION = "v0.1.45"
-VERSION_MANAGER_DESCRIPTION = _("一个用于管理 Blender 版本的工具。\n\n本软件完全免费开源、禁止在没有许可的情况下商用。")
+VERSION_MANAGER_DESCRIPTION = "一个用于管理 Blender 版本的工具。\n\n本软件完全免费开源、禁止在没有许可的情况下商用。"
 VERSION_MANAGER_COPYRIGHT = "(C) 2024 dhjs0000"
 VERSION_MANAGER_WEBSITE = "https://space.bilibili.com/430218185"
 
+def set_column_labels(list_ctrl, labels):
+    # 改写列表的列标题，保留列宽
+    for index, label in enumerate(labels):
+        column = list_ctrl.GetColumn(index)
+        column.SetText(label)
+        list_ctrl.SetColumn(index, column)
+
+class StartupTimer:
+    # 启动计时：记录从导入模块到主窗口第一次空闲（已显示并可以响应操作）各阶段距启动的秒数
+    def __init__(self, started=STARTUP_STARTED):
+        self.started = started
+        self.marks = []  # (阶段, 秒数)
+    
+    def mark(self, stage):
+        self.marks.append((stage, time.perf_counter() - self.started))
+    
+    def report(self):
+        print(_("启动耗时：{0}").format(', '.join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in self.marks)))  # 调试信息
+        log_path = os.environ.get(STARTUP_LOG_ENV)
+        if log_path:
+            record = dict(self.marks, time=time.time())
+            try:
+                with open(log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                print(_("无法写入启动耗时记录：{0}").format(e))  # 调试信息
+
 class BlenderVersionManager(wx.Frame):
     def __init__(self, parent, title):
         super(BlenderVersionManager, self).__init__(parent, title=title, size=(600, 400))
+        self.startup_timer = StartupTimer()
+        self.startup_timer.mark('imports')
         
-        self.config_file = CONFIG_FILE
-        self.config = configparser.ConfigParser()
-        self.load_config()
+        # 配置、版本目录、安装与启动等逻辑都在不依赖界面的核心模块中，命令行工具共用同一套实现
+        self.core = VersionManagerCore()
+        self.config = self.core.config
+        self.core.watch_folder(lambda added: wx.CallAfter(self.populate_versions))
+        self.download_manager = self.create_download_manager()
+        self.download_panel = None
+        self.batch_panel = None
+        self.launch_stats_dialog = None
+        self.remover = None  # 正在后台删除文件的 TreeRemover
+        if self.config.getboolean('PREFERENCES', 'WarmStart', fallback=False):
+            self.core.prewarm()
+        self.update_cache_server()
+        self.startup_timer.mark('core')
         
         # 设置窗口图标
         self.SetIcon(wx.Icon(ICON_PATH, ICON_TYPE))
         
         self.init_ui()
         self.apply_theme(self.config.get('PREFERENCES', 'Theme', fallback=DEFAULT_THEME))  # 应用主题
+        self.startup_timer.mark('ui')
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+        self.Bind(wx.EVT_IDLE, self.on_first_idle)
         self.Centre()
         self.Show()
     
+    def on_first_idle(self, event):
+        # 窗口显示后第一次空闲时结束启动计时
+        self.Unbind(wx.EVT_IDLE, handler=self.on_first_idle)
+        self.startup_timer.mark('window')
+        self.startup_timer.report()
+        event.Skip()
+    
     def apply_theme(self, theme):
         # 根据主题设置背景和前景颜色
         if theme == 'Dark':
@@ -87,34 +136,29 @@ class BlenderVersionManager(wx.Frame):
         # 垂直排列图标按钮
         vbox_buttons = wx.BoxSizer(wx.VERTICAL)
         
-        # 创建并绑定按钮
-        self.launch_button = wx.BitmapButton(panel, bitmap=self.scale_bitmap("icons/launch.png", 36, 36), size=(48, 48))
-        self.launch_button.SetToolTip(_("启动 Blender"))
+        # 创建并绑定按钮；提示文字在 apply_labels 中设置
+        button_size = self.FromDIP(wx.Size(ICON_BUTTON_SIZE, ICON_BUTTON_SIZE))
+        self.launch_button = wx.BitmapButton(panel, bitmap=self.load_icon("icons/launch.png"), size=button_size)
         self.launch_button.Bind(wx.EVT_BUTTON, self.launch_blender)
         vbox_buttons.Add(self.launch_button, 0, wx.BOTTOM, 5)
         
-        self.add_button = wx.BitmapButton(panel, bitmap=self.scale_bitmap("icons/add.png", 36, 36), size=(48, 48))
-        self.add_button.SetToolTip(_("添加 Blender 版本"))
+        self.add_button = wx.BitmapButton(panel, bitmap=self.load_icon("icons/add.png"), size=button_size)
         self.add_button.Bind(wx.EVT_BUTTON, self.add_blender_version)
         vbox_buttons.Add(self.add_button, 0, wx.BOTTOM, 5)
         
-        self.edit_button = wx.BitmapButton(panel, bitmap=self.scale_bitmap("icons/edit.png", 36, 36), size=(48, 48))
-        self.edit_button.SetToolTip(_("编辑 Blender 版本"))
+        self.edit_button = wx.BitmapButton(panel, bitmap=self.load_icon("icons/edit.png"), size=button_size)
         self.edit_button.Bind(wx.EVT_BUTTON, self.edit_blender_version)
         vbox_buttons.Add(self.edit_button, 0, wx.BOTTOM, 5)
         
-        self.delete_button = wx.BitmapButton(panel, bitmap=self.scale_bitmap("icons/delete.png", 36, 36), size=(48, 48))
-        self.delete_button.SetToolTip(_("删除 Blender 版本"))
+        self.delete_button = wx.BitmapButton(panel, bitmap=self.load_icon("icons/delete.png"), size=button_size)
         self.delete_button.Bind(wx.EVT_BUTTON, self.delete_blender_version)
         vbox_buttons.Add(self.delete_button, 0, wx.BOTTOM, 5)
         
-        self.uninstall_button = wx.BitmapButton(panel, bitmap=self.scale_bitmap("icons/uninstall.png", 36, 36), size=(48, 48))
-        self.uninstall_button.SetToolTip(_("卸载 Blender 版本"))
+        self.uninstall_button = wx.BitmapButton(panel, bitmap=self.load_icon("icons/uninstall.png"), size=button_size)
         self.uninstall_button.Bind(wx.EVT_BUTTON, self.uninstall_blender_version)
         vbox_buttons.Add(self.uninstall_button, 0, wx.BOTTOM, 5)
         
-        self.download_button = wx.BitmapButton(panel, bitmap=self.scale_bitmap("icons/download.png", 36, 36), size=(48, 48))
-        self.download_button.SetToolTip(_("下载 Blender 版本"))
+        self.download_button = wx.BitmapButton(panel, bitmap=self.load_icon("icons/download.png"), size=button_size)
         self.download_button.Bind(wx.EVT_BUTTON, self.download_blender_version)
         vbox_buttons.Add(self.download_button, 0, wx.BOTTOM, 5)
         
@@ -123,17 +167,42 @@ class BlenderVersionManager(wx.Frame):
         hbox_main.Add(vbox_buttons, 0, wx.ALL, 10)
         
         # 创建版本列表
-        self.version_list = wx.ListCtrl(panel, style=wx.LC_REPORT)
-        self.version_list.InsertColumn(0, _('Blender 版本'), width=150)
-        self.version_list.InsertColumn(1, _('路径'), width=400)
+        self.version_list = VersionListCtrl(panel, self.core.metadata)
         self.version_list.Bind(wx.EVT_LIST_ITEM_RIGHT_CLICK, self.on_right_click)
         hbox_main.Add(self.version_list, 1, wx.EXPAND | wx.ALL, 10)
         
-        panel.SetSizer(hbox_main)
+        # 删除文件时显示在窗口底部的进度条和取消按钮，删除期间窗口照常可用
+        self.removal_bar = wx.BoxSizer(wx.HORIZONTAL)
+        self.removal_label = wx.StaticText(panel)
+        self.removal_bar.Add(self.removal_label, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 10)
+        self.removal_gauge = wx.Gauge(panel, range=100)
+        self.removal_bar.Add(self.removal_gauge, 1, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 10)
+        self.removal_cancel_button = wx.Button(panel)
+        self.removal_cancel_button.Bind(wx.EVT_BUTTON, self.cancel_removal)
+        self.removal_bar.Add(self.removal_cancel_button, 0, wx.ALIGN_CENTER_VERTICAL)
         
-        self.create_menu_bar()
+        self.main_sizer = wx.BoxSizer(wx.VERTICAL)
+        self.main_sizer.Add(hbox_main, 1, wx.EXPAND)
+        self.main_sizer.Add(self.removal_bar, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10)
+        self.main_sizer.Hide(self.removal_bar)
+        panel.SetSizer(self.main_sizer)
+        
+        self.apply_labels()
         self.populate_versions()
     
+    def apply_labels(self):
+        # 按当前语言设置标题、按钮提示、菜单和列标题；切换语言时只改写文字，不重建窗口
+        self.SetTitle(_(VERSION_MANAGER_NAME))
+        self.launch_button.SetToolTip(_("启动 Blender"))
+        self.add_button.SetToolTip(_("添加 Blender 版本"))
+        self.edit_button.SetToolTip(_("编辑 Blender 版本"))
+        self.delete_button.SetToolTip(_("删除 Blender 版本"))
+        self.uninstall_button.SetToolTip(_("卸载 Blender 版本"))
+        self.download_button.SetToolTip(_("下载 Blender 版本"))
+        self.removal_cancel_button.SetLabel(_("取消"))
+        self.version_list.apply_labels()
+        self.create_menu_bar()
+    
     def create_menu_bar(self):
         # 创建菜单栏
         menubar = wx.MenuBar()
@@ -142,6 +211,25 @@ class BlenderVersionManager(wx.Frame):
         preferences_item = file_menu.Append(wx.ID_PREFERENCES, _('偏好设置'))
         self.Bind(wx.EVT_MENU, self.open_preferences, preferences_item)
         
+        search_item = file_menu.Append(wx.ID_ANY, _('搜索 Blender 版本'))
+        self.Bind(wx.EVT_MENU, self.search_blender_version, search_item)
+        
+        download_queue_item = file_menu.Append(wx.ID_ANY, _('下载队列'))
+        self.Bind(wx.EVT_MENU, self.show_download_panel, download_queue_item)
+        
+        self.preset_menu = wx.Menu()
+        self.rebuild_preset_menu()
+        file_menu.AppendSubMenu(self.preset_menu, _('启动预设'))
+        
+        batch_item = file_menu.Append(wx.ID_ANY, _('批量渲染...'))
+        self.Bind(wx.EVT_MENU, self.show_batch_panel, batch_item)
+        
+        launch_stats_item = file_menu.Append(wx.ID_ANY, _('启动统计'))
+        self.Bind(wx.EVT_MENU, self.show_launch_stats, launch_stats_item)
+        
+        gc_item = file_menu.Append(wx.ID_ANY, _('清理磁盘空间'))
+        self.Bind(wx.EVT_MENU, self.collect_garbage, gc_item)
+        
         import_config_item = file_menu.Append(wx.ID_ANY, _('导入配置'))
         self.Bind(wx.EVT_MENU, self.import_config, import_config_item)
         
@@ -164,21 +252,41 @@ class BlenderVersionManager(wx.Frame):
         
         self.SetMenuBar(menubar)
     
+    def rebuild_preset_menu(self):
+        # 预设增删后重建“启动预设”子菜单，点击预设名即可启动
+        for item in list(self.preset_menu.GetMenuItems()):
+            self.preset_menu.Delete(item)
+        for name in sorted(self.core.presets()):
+            item = self.preset_menu.Append(wx.ID_ANY, name)
+            self.Bind(wx.EVT_MENU, lambda event, name=name: self.launch_preset(name), item)
+        if self.preset_menu.GetMenuItemCount():
+            self.preset_menu.AppendSeparator()
+        manage_item = self.preset_menu.Append(wx.ID_ANY, _('管理启动预设...'))
+        self.Bind(wx.EVT_MENU, self.manage_presets, manage_item)
+    
+    def manage_presets(self, event):
+        dialog = PresetDialog(self, _("启动预设"), self.core)
+        dialog.ShowModal()
+        dialog.Destroy()
+        self.rebuild_preset_menu()
+    
     def change_language(self, language):
-        # 切换语言
+        # 切换语言：翻译按语言缓存，只改写已有控件的文字；配置、版本列表和下载任务保持不变
         set_language(language)
         self.config['PREFERENCES']['Language'] = language
-        self.save_config()
-        self.Destroy()
-        frame = BlenderVersionManager(None, _("Blender 版本管理器"))
-        frame.Show()
+        self.core.save_config()
+        self.apply_labels()
+        for window in (self.download_panel, self.batch_panel, self.launch_stats_dialog):
+            if window is not None:
+                window.apply_labels()
+        self.Layout()
     
     def show_about_dialog(self, event):
         # 显示关于对话框
         info = wx.adv.AboutDialogInfo()
-        info.SetName(VERSION_MANAGER_NAME)
+        info.SetName(_(VERSION_MANAGER_NAME))
         info.SetVersion(VERSION_MANAGER_VERSION)
-        info.SetDescription(VERSION_MANAGER_DESCRIPTION)
+        info.SetDescription(_(VERSION_MANAGER_DESCRIPTION))
         info.SetCopyright(VERSION_MANAGER_COPYRIGHT)
         info.SetWebSite(VERSION_MANAGER_WEBSITE)
         wx.adv.AboutBox(info)
@@ -188,8 +296,31 @@ class BlenderVersionManager(wx.Frame):
         pref_dialog = PreferencesDialog(self, _(""), self.config)
         pref_dialog.ShowModal()
         pref_dialog.Destroy()
+        self.core.save_config()
+        self.core.reload()
+        self.download_manager.set_concurrency(self.config.getint('PREFERENCES', 'ConcurrentDownloads', fallback=DEFAULT_CONCURRENT_JOBS))
+        self.download_manager.set_bandwidth(self.config.getint('PREFERENCES', 'BandwidthLimit', fallback=0) * 1024)
+        if self.config.getboolean('PREFERENCES', 'WarmStart', fallback=False):
+            self.core.prewarm()
+        self.update_cache_server()
         self.populate_versions()
     
+    def update_cache_server(self):
+        # 按偏好设置启动或停止局域网缓存节点；端口或连接数上限变化时重新启动
+        if not self.config.getboolean('PREFERENCES', 'CacheServe', fallback=False):
+            self.core.stop_cache_server()
+            return
+        server = self.core.cache_server
+        port = self.config.getint('PREFERENCES', 'CachePort', fallback=cache_peer.DEFAULT_PEER_PORT)
+        connections = self.config.getint('PREFERENCES', 'CacheConnections', fallback=cache_peer.DEFAULT_PEER_CONNECTIONS)
+        if server is not None and server.server_address[1] == port and server.max_connections == connections:
+            return
+        try:
+            server = self.core.serve_cache(port=port, max_connections=connections)
+            print(_("缓存节点已启动：{0}").format(server.url))  # 调试信息
+        except OSError as e:
+            wx.MessageBox(_("无法启动局域网缓存共享：{0}").format(e), _("错误"), wx.ICON_ERROR)
+    
     def import_config(self, event):
         # 导入配置文件
         with wx.FileDialog(self, _("选择配置文件"), wildcard=_("Config files (*.ini)|*.ini"),
@@ -197,8 +328,9 @@ class BlenderVersionManager(wx.Frame):
             if fileDialog.ShowModal() == wx.ID_CANCEL:
                 return
             config_path = fileDialog.GetPath()
-            self.config.read(config_path)
-            self.save_config()
+            with self.core.store.lock:
+                self.config.read(config_path)
+            self.core.save_config()
             wx.MessageBox(_("配置文件导入成功。"), _("信息"), wx.ICON_INFORMATION)
             self.populate_versions()
     
@@ -209,51 +341,19 @@ class BlenderVersionManager(wx.Frame):
             if fileDialog.ShowModal() == wx.ID_CANCEL:
                 return
             config_path = fileDialog.GetPath()
-            with open(config_path, 'w') as configfile:
-                self.config.write(configfile)
+            self.core.store.export(config_path)
             wx.MessageBox(_("配置文件导出成功。"), _("信息"), wx.ICON_INFORMATION)
     
-    def load_config(self):
-        # 加载配置文件
-        if os.path.exists(self.config_file):
-            self.config.read(self.config_file)
-        if 'VERSIONS' not in self.config:
-            self.config['VERSIONS'] = {}
-        if 'PREFERENCES' not in self.config:
-            self.config['PREFERENCES'] = {
-                'AutoFetch': 'False',
-                'FolderPath': '',
-                'SourceURL': SOURCE_URL,
-                'ThreadCount': '4',
-                'Language': DEFAULT_LANGUAGE
-            }
-        self.save_config()
-        set_language(self.config.get('PREFERENCES', 'Language', fallback=DEFAULT_LANGUAGE))
-    
-    def save_config(self):
-        # 保存配置文件
-        with open(self.config_file, 'w') as configfile:
-            self.config.write(configfile)
-    
     def populate_versions(self):
-        # 填充版本列表
-        self.version_list.DeleteAllItems()
-        existing_versions = set(self.config['VERSIONS'].keys())
-        
+        # 填充版本列表；版本文件夹在后台增量扫描，发现新版本后再刷新，不阻塞界面
+        self.version_list.set_rows(list(self.core.installed_versions(scan=False).items()))
         if self.config.getboolean('PREFERENCES', 'AutoFetch', fallback=False):
-            folder_path = self.config.get('PREFERENCES', 'FolderPath', fallback='')
-            if os.path.exists(folder_path):
-                for item in os.listdir(folder_path):
-                    item_path = os.path.join(folder_path, item)
-                    if os.path.isdir(item_path) and os.path.exists(os.path.join(item_path, 'blender.exe')):
-                        version_name = item
-                        if version_name not in existing_versions:
-                            self.config['VERSIONS'][version_name] = os.path.join(item_path, 'blender.exe')
-                            self.save_config()
-        
-        for version_name, path in self.config['VERSIONS'].items():
-            index = self.version_list.InsertItem(self.version_list.GetItemCount(), version_name)
-            self.version_list.SetItem(index, 1, path)
+            threading.Thread(target=self.scan_folder, daemon=True).start()
+    
+    def scan_folder(self):
+        # 在后台线程中执行，只重新检查修改时间变化的子目录
+        if self.core.scan_folder():
+            wx.CallAfter(self.populate_versions)
     
     def add_blender_version(self, event):
         # 添加新的 Blender 版本
@@ -264,8 +364,7 @@ class BlenderVersionManager(wx.Frame):
             file_path = fileDialog.GetPath()
             version_name = wx.GetTextFromUser(_("为此 Blender 版本输入一个名称:"), _("输入名称"))
             if version_name:
-                self.config['VERSIONS'][version_name] = file_path
-                self.save_config()
+                self.core.add_version(version_name, file_path)
                 self.populate_versions()
             else:
                 wx.MessageBox(_("名不能为空。"), _("警告"), wx.ICON_WARNING)
@@ -282,9 +381,8 @@ class BlenderVersionManager(wx.Frame):
             if edit_dialog.ShowModal() == wx.ID_OK:
                 new_name, new_path = edit_dialog.get_version_info()
                 if new_name and new_path:
-                    del self.config['VERSIONS'][selected_version]
-                    self.config['VERSIONS'][new_name] = new_path
-                    self.save_config()
+                    self.core.remove_version(selected_version)
+                    self.core.add_version(new_name, new_path)
                     self.populate_versions()
             edit_dialog.Destroy()
         else:
@@ -297,8 +395,7 @@ class BlenderVersionManager(wx.Frame):
             selected_version = self.version_list.GetItemText(selected_item)
             confirm = wx.MessageBox(_("确定要删除 {0} 吗？").format(selected_version), _("确认删除"), wx.YES_NO | wx.ICON_QUESTION)
             if confirm == wx.YES:
-                del self.config['VERSIONS'][selected_version]
-                self.save_config()
+                self.core.remove_version(selected_version)
                 self.populate_versions()
         else:
             wx.MessageBox(_("请选择一个 Blender 版本。"), _("警告"), wx.ICON_WARNING)
@@ -310,7 +407,7 @@ class BlenderVersionManager(wx.Frame):
             wx.MessageBox(_("无法获取可用的 Blender 版本列表。"), _("错误"), wx.ICON_ERROR)
             return
         
-        version_window = wx.SingleChoiceDialog(self, _("选择大版本"), _("选择大版本"), major_versions)
+        version_window = wx.SingleChoiceDialog(self, _("选择大版本"), _("选择大版本"), [entry.name for entry in major_versions])
         if version_window.ShowModal() == wx.ID_OK:
             major_version = version_window.GetStringSelection()
             self.select_minor_version(major_version)
@@ -322,78 +419,116 @@ class BlenderVersionManager(wx.Frame):
             wx.MessageBox(_("无法获取 {0} 的小版本列表。").format(major_version), _("错误"), wx.ICON_ERROR)
             return
         
-        version_window = wx.SingleChoiceDialog(self, _("选择小版本"), _("选择小版本"), minor_versions)
+        # 列表中同时显示文件大小和发布日期
+        choices = []
+        for entry in minor_versions:
+            details = [format_size(entry.size)] if entry.size is not None else []
+            if entry.mtime is not None:
+                details.append(time.strftime('%Y-%m-%d', time.gmtime(entry.mtime)))
+            choices.append(f"{entry.name}  ({', '.join(details)})" if details else entry.name)
+        
+        # 可一次选择多个版本加入下载队列
+        version_window = wx.MultiChoiceDialog(self, _("选择小版本"), _("选择小版本"), choices)
         if version_window.ShowModal() == wx.ID_OK:
-            minor_version = version_window.GetStringSelection()
-            wx.CallAfter(self.download_selected_version, major_version, minor_version)
+            for index in version_window.GetSelections():
+                wx.CallAfter(self.download_selected_version, major_version, minor_versions[index].name)
     
-    def download_selected_version(self, major_version, minor_version):
-        # 下载选定的 Blender 版本
-        folder_path = self.config.get('PREFERENCES', 'FolderPath', fallback='')
-        source_url = self.config.get('PREFERENCES', 'SourceURL', fallback=SOURCE_URL)
-        thread_count = self.config.getint('PREFERENCES', 'ThreadCount', fallback=4)
-        if not os.path.exists(folder_path):
-            wx.MessageBox(_("请先设置有效的 Blender 版本列表文件夹路径。"), _("错误"), wx.ICON_ERROR)
+    def search_blender_version(self, event):
+        # 跨大版本搜索安装包，例如 "3.6 linux-x64" 列出所有 3.6.x 的 Linux 版本（最新在前）
+        query = wx.GetTextFromUser(_("输入版本号和平台（例如 3.6 linux-x64）:"), _("搜索 Blender 版本"))
+        if not query.strip():
             return
+        version_prefix = ''
+        platform = None
+        for part in query.split():
+            if part[0].isdigit():
+                version_prefix = part.rstrip('.x')
+            else:
+                platform = part
         
-        url = f"{source_url}/{major_version}/{minor_version}"
-        print(_("下载 URL: {0}").format(url))  # 调试信息
-        
-        progress_dialog = wx.ProgressDialog(_("下载进度"), _("正在下载..."), maximum=100, parent=self, style=wx.PD_APP_MODAL | wx.PD_ELAPSED_TIME | wx.PD_REMAINING_TIME)
-        
-        def download():
+        with wx.BusyCursor():
             try:
-                response = requests.get(url, stream=True)
-                response.raise_for_status()
-                total_size = int(response.headers.get('content-length', 0))
-                block_size = 1024
-                zip_path = os.path.join(folder_path, minor_version)
-                start_time = time.time()
-                downloaded_size = 0
-                
-                with open(zip_path, 'wb') as file:
-                    for data in response.iter_content(block_size):
-                        file.write(data)
-                        downloaded_size += len(data)
-                        progress = int((downloaded_size / total_size) * 100)  # 确保进度是整数
-                        wx.CallAfter(progress_dialog.Update, progress, _("已下载: {0:.2f} MB").format(downloaded_size / 1024 / 1024))
-                
-                if downloaded_size != total_size:
-                    raise Exception(_("下载不完整，文件大小不匹配。"))
-                
-                with zipfile.ZipFile(zip_path, 'r') as z:
-                    extract_path = os.path.join(folder_path, _("Blender {0}").format(minor_version.split('-')[1]))
-                    z.extractall(extract_path)
-                
-                nested_folder = os.path.join(extract_path, os.listdir(extract_path)[0])
-                if os.path.isdir(nested_folder):
-                    for item in os.listdir(nested_folder):
-                        shutil.move(os.path.join(nested_folder, item), extract_path)
-                    os.rmdir(nested_folder)
-                
-                os.remove(zip_path)
-                wx.CallAfter(wx.MessageBox, _("Blender {0} 下载并解压成功。").format(minor_version.split('-')[1]), _("成功"), wx.ICON_INFORMATION)
-                wx.CallAfter(self.populate_versions)
+                results = self.core.search(version_prefix, platform, installable=False)
             except requests.exceptions.RequestException as e:
-                wx.CallAfter(wx.MessageBox, _("无法下载 Blender {0}：{1}").format(minor_version.split('-')[1], e), _("下载错误"), wx.ICON_ERROR)
-            except zipfile.BadZipFile:
-                wx.CallAfter(wx.MessageBox, _("下载的文件不是有效的 ZIP 文件。"), _("解压错误"), wx.ICON_ERROR)
-            except Exception as e:
-                wx.CallAfter(wx.MessageBox, str(e), _("下载错误"), wx.ICON_ERROR)
-            finally:
-                wx.CallAfter(progress_dialog.Destroy)
+                print(_("获取版本列表失败：{0}").format(e))
+                wx.MessageBox(_("无法获取可用的 Blender 版本列表。"), _("错误"), wx.ICON_ERROR)
+                return
+        if not results:
+            wx.MessageBox(_("未找到匹配的 Blender 版本。"), _("信息"), wx.ICON_INFORMATION)
+            return
         
-        threading.Thread(target=download).start()
+        version_window = wx.MultiChoiceDialog(self, _("选择要下载的版本"), _("搜索结果"), [entry.name for _major, entry in results])
+        if version_window.ShowModal() == wx.ID_OK:
+            for index in version_window.GetSelections():
+                major_version, entry = results[index]
+                wx.CallAfter(self.download_selected_version, major_version, entry.name)
+    
+    def download_selected_version(self, major_version, minor_version):
+        # 把选定的 Blender 版本加入下载队列，在下载面板中查看进度
+        if not os.path.exists(self.core.folder_path):
+            wx.MessageBox(_("请先设置有效的 Blender 版本列表文件夹路径。"), _("错误"), wx.ICON_ERROR)
+            return
+        
+        print(_("加入下载队列: {0}").format(minor_version))  # 调试信息
+        self.download_manager.add(major_version, minor_version)
+        self.show_download_panel()
+    
+    def create_download_manager(self):
+        # 创建下载队列并恢复上次未完成的任务
+        manager = self.core.create_download_manager()
+        manager.add_listener(lambda job: wx.CallAfter(self.on_job_changed, job))
+        manager.load()
+        return manager
+    
+    def on_job_changed(self, job):
+        # 任务完成后刷新版本列表，失败时显示下载面板以便查看原因
+        if job.state == JOB_DONE:
+            self.populate_versions()
+        elif job.state == JOB_FAILED:
+            self.show_download_panel()
+    
+    def show_download_panel(self, event=None):
+        # 显示非模态的下载面板
+        if self.download_panel is None:
+            self.download_panel = DownloadPanel(self, _("下载队列"), self.download_manager)
+            self.download_panel.Bind(wx.EVT_WINDOW_DESTROY, self.on_download_panel_destroyed)
+        self.download_panel.Show()
+        self.download_panel.Raise()
+    
+    def on_download_panel_destroyed(self, event):
+        if event.GetEventObject() is self.download_panel:
+            self.download_panel = None
+        event.Skip()
+    
+    def show_batch_panel(self, event=None):
+        # 显示非模态的批量渲染面板
+        if self.batch_panel is None:
+            self.batch_panel = BatchRenderPanel(self, _("批量渲染"), self.core)
+            self.batch_panel.Bind(wx.EVT_WINDOW_DESTROY, self.on_batch_panel_destroyed)
+        self.batch_panel.Show()
+        self.batch_panel.Raise()
+    
+    def on_batch_panel_destroyed(self, event):
+        if event.GetEventObject() is self.batch_panel:
+            self.batch_panel = None
+        event.Skip()
+    
+    def on_close(self, event):
+        # 关闭窗口时停止正在进行的任务，下次启动时从断点继续；批量渲染的进程直接结束
+        if self.batch_panel is not None:
+            self.batch_panel.cancel()
+        if self.remover is not None:
+            self.remover.cancel()
+        self.download_manager.shutdown()
+        self.core.shutdown()
+        event.Skip()
     
     def get_major_versions(self):
         # 获取大版本列表
-        source_url = self.config.get('PREFERENCES', 'SourceURL', fallback=SOURCE_URL)
         try:
-            response = requests.get(source_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            versions = [a.text.strip('/') for a in soup.find_all('a') if a.text.startswith('Blender')]
-            print(_("获取到的大版本列表: {0}").format(versions))  # 调试信息
+            # 优先使用缓存，过期时在后台重新验证；随后在后台预取所有小版本列表
+            versions = self.core.major_versions()
+            print(_("获取到的大版本列表: {0}").format([entry.name for entry in versions]))  # 调试信息
             return versions
         except requests.exceptions.RequestException as e:
             print(_("获取版本列表失败：{0}").format(e))
@@ -401,13 +536,9 @@ class BlenderVersionManager(wx.Frame):
     
     def get_minor_versions(self, major_version):
         # 获取小版本列表
-        source_url = self.config.get('PREFERENCES', 'SourceURL', fallback=SOURCE_URL)
         try:
-            response = requests.get(f"{source_url}/{major_version}/")
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            versions = [a.text.strip('/') for a in soup.find_all('a') if a.text.startswith(f"blender-{major_version.split('Blender')[-1]}")]
-            print(_("获取到的小版本列表: {0}").format(versions))  # 调试信息
+            versions = self.core.minor_versions(major_version)
+            print(_("获取到的小版本列表: {0}").format([entry.name for entry in versions]))  # 调试信息
             return versions
         except requests.exceptions.RequestException as e:
             print(_("获取小版本列表失败：{0}").format(e))
@@ -418,21 +549,60 @@ class BlenderVersionManager(wx.Frame):
         selected_item = self.version_list.GetFirstSelected()
         if selected_item != -1:
             selected_version = self.version_list.GetItemText(selected_item)
-            blender_exe = self.config['VERSIONS'].get(selected_version)
-            if blender_exe and os.path.exists(blender_exe):
-                threading.Thread(target=self.run_blender_with_logging, args=(blender_exe,)).start()
-            else:
-                wx.MessageBox(_("��不到 {0} 的可执行文件。").format(selected_version), _("错误"), wx.ICON_ERROR)
+            try:
+                monitor = self.core.launch(selected_version)
+            except (VersionNotFoundError, OSError) as e:
+                wx.MessageBox(str(e), _("错误"), wx.ICON_ERROR)
+                return
+            self.version_list.invalidate(selected_item)
+            self.blender_started(monitor)
         else:
             wx.MessageBox(_("请选择一个 Blender 版本。"), _("警告"), wx.ICON_WARNING)
     
-    def run_blender_with_logging(self, blender_exe):
-        # 运行 Blender 并记录日志
-        log_file = os.path.join(os.path.dirname(blender_exe), "blender_log.txt")
-        with open(log_file, "w") as log:
-            process = subprocess.Popen([blender_exe], stdout=log, stderr=log)
-            process.wait()
-        wx.CallAfter(wx.MessageBox, _("Blender 已启动。日志记录在 {0}").format(log_file), _("信息"), wx.ICON_INFORMATION)
+    def launch_preset(self, name):
+        # 按启动预设启动
+        try:
+            monitor = self.core.launch_preset(name)
+        except (VersionNotFoundError, OSError) as e:
+            wx.MessageBox(str(e), _("错误"), wx.ICON_ERROR)
+            return
+        self.blender_started(monitor)
+    
+    def blender_started(self, monitor):
+        # 进程创建成功后立即提示日志位置；由后台守护线程等待 Blender 退出，回收进程并记录启动耗时和资源占用，
+        # 关闭管理器时不需要等待 Blender 退出
+        threading.Thread(target=self.core.wait_launch, args=(monitor,), daemon=True).start()
+        wx.MessageBox(_("Blender 已启动。日志记录在 {0}").format(monitor.log_file), _("信息"), wx.ICON_INFORMATION)
+    
+    def show_launch_stats(self, event):
+        # 比较各版本的启动性能
+        self.launch_stats_dialog = LaunchStatsDialog(self, _("启动统计"), self.core.launch_stats)
+        try:
+            self.launch_stats_dialog.ShowModal()
+        finally:
+            self.launch_stats_dialog.Destroy()
+            self.launch_stats_dialog = None
+    
+    def load_icon(self, image_path):
+        # 按当前 DPI 取按钮图标：缩放好的 PNG 以实际像素尺寸为键缓存在磁盘上，原图更新后重新生成
+        size = self.FromDIP(ICON_SIZE)
+        name = os.path.splitext(os.path.basename(image_path))[0]
+        cache_path = os.path.join(ICON_CACHE_DIR, f"{name}-{size}.png")
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(image_path):
+                return wx.Bitmap(cache_path, wx.BITMAP_TYPE_PNG)
+        except OSError:
+            pass
+        
+        bitmap = self.scale_bitmap(image_path, size, size)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+            if bitmap.SaveFile(temp_path, wx.BITMAP_TYPE_PNG):
+                os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(_("无法写入图标缓存：{0}").format(e))  # 调试信息
+        return bitmap
     
     def scale_bitmap(self, image_path, target_width, target_height):
         # 缩放图标以适应按钮大小
@@ -476,18 +646,104 @@ class BlenderVersionManager(wx.Frame):
             selected_version = self.version_list.GetItemText(selected_item)
             confirm = wx.MessageBox(_("确定要卸载 {0} 吗？").format(selected_version), _("确认卸载"), wx.YES_NO | wx.ICON_QUESTION)
             if confirm == wx.YES:
-                path = self.config['VERSIONS'].get(selected_version)
-                if path and os.path.exists(path):
-                    shutil.rmtree(os.path.dirname(path))
-                    del self.config['VERSIONS'][selected_version]
-                    self.save_config()
-                    self.populate_versions()
-                    wx.MessageBox(_("Blender 版本 {0} 已卸载。").format(selected_version), _("信息"), wx.ICON_INFORMATION)
-                else:
-                    wx.MessageBox(_("找不到 {0} 的安装路径。").format(selected_version), _("错误"), wx.ICON_ERROR)
+                self.run_removal(_("正在卸载 {0}...").format(selected_version),
+                                 lambda remover: self.core.uninstall(selected_version, remover),
+                                 lambda result: self.uninstall_done(selected_version, result))
         else:
             wx.MessageBox(_("请选择一个 Blender 版本。"), _("警告"), wx.ICON_WARNING)
     
+    def run_removal(self, message, action, on_done):
+        # 在后台线程中删除文件，进度显示在窗口底部，窗口照常可用；可以取消，完成后在界面线程调用 on_done(结果或异常)。
+        # 同一时间只进行一次删除
+        if self.remover is not None:
+            wx.MessageBox(_("正在删除文件，请等待完成后再试。"), _("信息"), wx.ICON_INFORMATION)
+            return
+        remover = self.remover = TreeRemover()
+        self.show_removal_progress(message, 0, 0)
+        
+        def update(snapshot):
+            if self.remover is remover:
+                self.show_removal_progress(message, snapshot.done, snapshot.total)
+        
+        def run():
+            subscribe(remover.progress, lambda snapshot: wx.CallAfter(update, snapshot))
+            try:
+                result = action(remover)
+            except (RemovalCancelled, VersionNotFoundError, OSError) as e:
+                result = e
+            finally:
+                unsubscribe(remover.progress)
+            wx.CallAfter(finish, result)
+        
+        def finish(result):
+            self.remover = None
+            self.main_sizer.Hide(self.removal_bar)
+            self.main_sizer.Layout()
+            on_done(result)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def show_removal_progress(self, message, done, total):
+        self.removal_label.SetLabel(_("{0}（{1} / {2} 个文件）").format(message, done, total))
+        self.removal_gauge.SetValue(done * 100 // total if total else 0)
+        if not self.main_sizer.IsShown(self.removal_bar):
+            self.removal_cancel_button.Enable()
+            self.main_sizer.Show(self.removal_bar)
+            self.main_sizer.Layout()
+    
+    def cancel_removal(self, event):
+        # 已删除的文件无法恢复，剩余的部分保留 .removing 标记，之后由“清理磁盘空间”继续删除
+        if self.remover is not None:
+            self.remover.cancel()
+            self.removal_cancel_button.Disable()
+    
+    def uninstall_done(self, name, result):
+        self.populate_versions()
+        if isinstance(result, RemovalCancelled):
+            wx.MessageBox(_("已取消卸载 {0}，剩余的文件可以通过“清理磁盘空间”删除。").format(name), _("信息"), wx.ICON_INFORMATION)
+        elif isinstance(result, Exception):
+            wx.MessageBox(str(result), _("错误"), wx.ICON_ERROR)
+        else:
+            wx.MessageBox(_("Blender 版本 {0} 已卸载，释放了 {1}。").format(name, format_size(result['size'])), _("信息"), wx.ICON_INFORMATION)
+    
+    def collect_garbage(self, event):
+        # 清理未完成的下载、安装和卸载留下的文件以及无用的缓存，按类别汇总释放的空间
+        self.run_removal(_("正在清理磁盘空间..."), self.core.gc, self.collect_garbage_done)
+    
+    def collect_garbage_done(self, result):
+        self.populate_versions()
+        if isinstance(result, RemovalCancelled):
+            wx.MessageBox(_("清理已取消。"), _("信息"), wx.ICON_INFORMATION)
+            return
+        if isinstance(result, Exception):
+            wx.MessageBox(str(result), _("错误"), wx.ICON_ERROR)
+            return
+        kinds = {
+            'download': _("未完成的下载"),
+            'extract': _("未完成的安装"),
+            'uninstall': _("未完成的卸载"),
+            'cache': _("安装缓存"),
+            'index': _("目录缓存")
+        }
+        sizes = {}
+        for item in result['removed']:
+            sizes[item['kind']] = sizes.get(item['kind'], 0) + item['size']
+        lines = [f"{kinds[kind]}: {format_size(size)}" for kind, size in sizes.items()]
+        if result['stale_versions']:
+            lines.append(_("已移除失效版本记录：{0}").format(', '.join(result['stale_versions'])))
+        lines.append(_("共释放 {0}").format(format_size(result['freed'])))
+        lines += result['errors'][:5]
+        wx.MessageBox('\n'.join(lines), _("清理磁盘空间"), wx.ICON_INFORMATION)
+        
+        # 没有断点日志的压缩包可能是用户自己放进来的，逐项列出并确认后才删除
+        candidates = result.get('candidates')
+        if candidates:
+            paths = '\n'.join(f"{item['path']} ({format_size(item['size'])})" for item in candidates)
+            confirm = wx.MessageBox(_("以下文件没有未完成下载的记录，可能是手动放入的，确定要删除吗？\n{0}").format(paths),
+                                    _("确认删除"), wx.YES_NO | wx.ICON_QUESTION)
+            if confirm == wx.YES:
+                self.run_removal(_("正在清理磁盘空间..."), lambda remover: self.core.gc(remover, include_archives=True), self.collect_garbage_done)
+    
     def open_file_location(self, event):
         # 打开文件所在位置
         selected_item = self.version_list.GetFirstSelected()
@@ -501,6 +757,415 @@ class BlenderVersionManager(wx.Frame):
         else:
             wx.MessageBox(_("请选择一个 Blender 版本。"), _("警告"), wx.ICON_WARNING)
 
+class VersionListCtrl(wx.ListCtrl):
+    # 虚拟列表：只为可见行取文本，行数据缓存在 rows 中，更新时只刷新内容变化的行；
+    # 版本号、大小等附加信息在行第一次显示时提交后台探测，完成后只刷新该行
+    COLUMN_WIDTHS = (150, 90, 80, 120, 400)
+    
+    def __init__(self, parent, metadata):
+        super(VersionListCtrl, self).__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL)
+        self.metadata = metadata
+        self.rows = []  # (名称, 可执行文件路径)
+        self.index = {}  # 可执行文件路径 -> 行号
+        self.details = {}  # 可执行文件路径 -> 附加信息，避免每次重绘都读取文件修改时间
+        for index, (label, width) in enumerate(zip(self.column_labels(), self.COLUMN_WIDTHS)):
+            self.InsertColumn(index, label, width=width)
+    
+    def column_labels(self):
+        return [_('Blender 版本'), _('版本号'), _('大小'), _('上次启动'), _('路径')]
+    
+    def apply_labels(self):
+        set_column_labels(self, self.column_labels())
+        self.Refresh()
+    
+    def set_rows(self, rows):
+        # 与当前行比较，只刷新变化的行，并保持选中的版本
+        selected = self.selected_name()
+        old_rows = self.rows
+        self.rows = list(rows)
+        self.index = {path: index for index, (_name, path) in enumerate(self.rows)}
+        self.details = {}
+        if len(old_rows) != len(self.rows):
+            self.SetItemCount(len(self.rows))
+        changed = [index for index, row in enumerate(self.rows) if index >= len(old_rows) or old_rows[index] != row]
+        if changed:
+            self.RefreshItems(changed[0], changed[-1])
+        
+        if selected is not None:
+            old_index = self.GetFirstSelected()
+            new_index = next((index for index, (name, _path) in enumerate(self.rows) if name == selected), -1)
+            if new_index != old_index:
+                if old_index != -1:
+                    self.Select(old_index, False)
+                if new_index != -1:
+                    self.Select(new_index)
+    
+    def selected_name(self):
+        index = self.GetFirstSelected()
+        return self.rows[index][0] if 0 <= index < len(self.rows) else None
+    
+    def GetItemText(self, item, col=0):
+        return self.OnGetItemText(item, col)
+    
+    def OnGetItemText(self, item, column):
+        if item >= len(self.rows):
+            return ''
+        name, path = self.rows[item]
+        if column == 0:
+            return name
+        if column == 4:
+            return path
+        if path not in self.details:
+            self.details[path] = self.metadata.request(path, self.on_probed) or {}
+        entry = self.details[path]
+        if column == 1:
+            return entry.get('version') or ''
+        if column == 2:
+            return format_size(entry['size']) if entry.get('size') is not None else ''
+        last_launched = entry.get('last_launched')
+        return time.strftime('%Y-%m-%d %H:%M', time.localtime(last_launched)) if last_launched else ''
+    
+    def on_probed(self, executable, entry):
+        # 在探测线程中调用
+        wx.CallAfter(self.update_details, executable, entry)
+    
+    def update_details(self, executable, entry):
+        if not self:
+            return
+        self.details[executable] = entry
+        index = self.index.get(executable)
+        if index is not None:
+            self.RefreshItem(index)
+    
+    def invalidate(self, item):
+        # 启动后刷新上次启动时间
+        if 0 <= item < len(self.rows):
+            self.details.pop(self.rows[item][1], None)
+            self.RefreshItem(item)
+
+class DownloadPanel(wx.Frame):
+    # 非模态下载面板：列出所有任务，定时刷新进度，支持暂停、继续、取消和调整优先级
+    REFRESH_INTERVAL = 500  # 毫秒
+    COLUMN_WIDTHS = (220, 60, 70, 60, 90, 70, 200)
+    
+    def __init__(self, parent, title, manager):
+        super(DownloadPanel, self).__init__(parent, title=title, size=(790, 320))
+        
+        self.manager = manager
+        self.init_ui()
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda event: self.refresh(), self.timer)
+        self.timer.Start(self.REFRESH_INTERVAL)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+        self.apply_labels()
+    
+    def init_ui(self):
+        panel = wx.Panel(self)
+        
+        self.job_list = wx.ListCtrl(panel, style=wx.LC_REPORT)
+        for index, (label, width) in enumerate(zip(self.column_labels(), self.COLUMN_WIDTHS)):
+            self.job_list.InsertColumn(index, label, width=width)
+        
+        # 按钮文字在 apply_labels 中设置
+        self.pause_button = wx.Button(panel)
+        self.pause_button.Bind(wx.EVT_BUTTON, lambda event: self.apply_to_selected(self.manager.pause))
+        self.resume_button = wx.Button(panel)
+        self.resume_button.Bind(wx.EVT_BUTTON, lambda event: self.apply_to_selected(self.manager.resume))
+        self.cancel_button = wx.Button(panel)
+        self.cancel_button.Bind(wx.EVT_BUTTON, lambda event: self.apply_to_selected(self.manager.cancel))
+        self.priority_choice = wx.Choice(panel, choices=self.priority_labels())
+        self.priority_choice.SetSelection(PRIORITY_NORMAL)
+        self.priority_button = wx.Button(panel)
+        self.priority_button.Bind(wx.EVT_BUTTON, lambda event: self.apply_to_selected(
+            lambda job_id: self.manager.set_priority(job_id, self.priority_choice.GetSelection())))
+        self.clear_button = wx.Button(panel)
+        self.clear_button.Bind(wx.EVT_BUTTON, self.clear_finished)
+        
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        for control in (self.pause_button, self.resume_button, self.cancel_button, self.priority_choice, self.priority_button, self.clear_button):
+            hbox.Add(control, 0, wx.ALL, 5)
+        
+        vbox = wx.BoxSizer(wx.VERTICAL)
+        vbox.Add(self.job_list, 1, wx.EXPAND | wx.ALL, 10)
+        vbox.Add(hbox, 0, wx.ALIGN_CENTER | wx.BOTTOM, 5)
+        panel.SetSizer(vbox)
+        self.panel = panel
+    
+    def column_labels(self):
+        return [_('Blender 版本'), _('优先级'), _('状态'), _('进度'), _('速度'), _('剩余时间'), _('信息')]
+    
+    def priority_labels(self):
+        return [_("高"), _("普通"), _("低")]
+    
+    def apply_labels(self):
+        # 设置按钮和列标题文字，切换语言后再次调用；状态等单元格在刷新时按当前语言生成
+        self.SetTitle(_("下载队列"))
+        set_column_labels(self.job_list, self.column_labels())
+        for button, label in ((self.pause_button, _("暂停")), (self.resume_button, _("继续")), (self.cancel_button, _("取消")),
+                              (self.priority_button, _("设置优先级")), (self.clear_button, _("清除已完成"))):
+            button.SetLabel(label)
+        for index, label in enumerate(self.priority_labels()):
+            self.priority_choice.SetString(index, label)
+        self.panel.Layout()
+        self.refresh()
+    
+    def selected_job_ids(self):
+        ids = []
+        index = self.job_list.GetFirstSelected()
+        while index != -1:
+            ids.append(self.job_ids[index])
+            index = self.job_list.GetNextSelected(index)
+        return ids
+    
+    def apply_to_selected(self, action):
+        for job_id in self.selected_job_ids():
+            action(job_id)
+        self.refresh()
+    
+    def clear_finished(self, event):
+        self.manager.remove_finished()
+        self.refresh()
+    
+    def refresh(self):
+        # 按任务快照更新列表，行数不变时只改写单元格，避免闪烁和丢失选中状态
+        jobs = self.manager.snapshot()
+        priorities = dict(zip((PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW), self.priority_labels()))
+        states = {JOB_QUEUED: _("排队中"), JOB_RUNNING: _("下载中"), JOB_PAUSED: _("已暂停"),
+                  JOB_DONE: _("已完成"), JOB_FAILED: _("失败"), JOB_CANCELLED: _("已取消")}
+        if self.job_list.GetItemCount() != len(jobs):
+            self.job_list.DeleteAllItems()
+            for job in jobs:
+                self.job_list.InsertItem(self.job_list.GetItemCount(), job.minor_version)
+        self.job_ids = [job.id for job in jobs]
+        
+        for index, job in enumerate(jobs):
+            # 速度和剩余时间由进度发布线程平滑计算
+            running = job.state == JOB_RUNNING
+            speed = format_speed(job.speed, job.progress.unit) if running else ''
+            eta = format_eta(job.eta) if running else ''
+            progress = f"{int(job.done * 100 / job.total)}%" if job.total else ''
+            if job.state == JOB_DONE:
+                progress = '100%'
+            values = [job.minor_version, priorities.get(job.priority, ''), states.get(job.state, job.state), progress, speed, eta,
+                      job.error or (job.message if running else '')]
+            for column, value in enumerate(values):
+                if self.job_list.GetItemText(index, column) != value:
+                    self.job_list.SetItem(index, column, value)
+    
+    def on_close(self, event):
+        # 关闭面板不影响正在进行的下载
+        self.timer.Stop()
+        event.Skip()
+
+class BatchRenderPanel(wx.Frame):
+    # 非模态批量渲染面板：选择版本和 .blend 文件，在各版本上并行后台渲染一帧或执行脚本；
+    # 定时刷新各版本的状态、退出码和耗时，下方显示选中版本最近的输出
+    REFRESH_INTERVAL = 500  # 毫秒
+    COLUMN_WIDTHS = (260, 90, 70, 90)
+    
+    def __init__(self, parent, title, core):
+        super(BatchRenderPanel, self).__init__(parent, title=title, size=(760, 620))
+        
+        self.core = core
+        self.runner = None
+        self.init_ui()
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda event: self.refresh(), self.timer)
+        self.timer.Start(self.REFRESH_INTERVAL)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+        self.apply_labels()
+    
+    def init_ui(self):
+        panel = wx.Panel(self)
+        
+        self.version_list = wx.CheckListBox(panel, choices=list(self.core.installed_versions(scan=False)))
+        self.blend_file_picker = wx.FilePickerCtrl(panel, wildcard=_("Blender files (*.blend)|*.blend"))
+        self.frame_text = wx.TextCtrl(panel, value='1')
+        self.script_picker = wx.FilePickerCtrl(panel, wildcard=_("Python 脚本 (*.py)|*.py"))
+        self.output_dir_picker = wx.DirPickerCtrl(panel)
+        self.args_text = wx.TextCtrl(panel)
+        self.workers_spin = wx.SpinCtrl(panel, value=str(default_workers()), min=1, max=64)
+        
+        # 标签和按钮文字在 apply_labels 中设置
+        form = wx.BoxSizer(wx.VERTICAL)
+        self.form_labels = []
+        for control in (self.blend_file_picker, self.frame_text, self.script_picker, self.output_dir_picker, self.args_text, self.workers_spin):
+            label = wx.StaticText(panel)
+            self.form_labels.append(label)
+            form.Add(label, 0, wx.LEFT | wx.TOP, 5)
+            form.Add(control, 0, wx.EXPAND | wx.ALL, 5)
+        
+        hbox_main = wx.BoxSizer(wx.HORIZONTAL)
+        hbox_main.Add(self.version_list, 1, wx.EXPAND | wx.ALL, 5)
+        hbox_main.Add(form, 2, wx.EXPAND | wx.ALL, 5)
+        
+        self.job_list = wx.ListCtrl(panel, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        for index, (label, width) in enumerate(zip(self.column_labels(), self.COLUMN_WIDTHS)):
+            self.job_list.InsertColumn(index, label, width=width)
+        self.log_text = wx.TextCtrl(panel, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.HSCROLL, size=(-1, 150))
+        
+        self.start_button = wx.Button(panel)
+        self.start_button.Bind(wx.EVT_BUTTON, self.start)
+        self.cancel_button = wx.Button(panel)
+        self.cancel_button.Bind(wx.EVT_BUTTON, lambda event: self.cancel())
+        
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        for control in (self.start_button, self.cancel_button):
+            hbox.Add(control, 0, wx.ALL, 5)
+        
+        vbox = wx.BoxSizer(wx.VERTICAL)
+        vbox.Add(hbox_main, 0, wx.EXPAND | wx.ALL, 5)
+        vbox.Add(self.job_list, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
+        vbox.Add(self.log_text, 0, wx.EXPAND | wx.ALL, 10)
+        vbox.Add(hbox, 0, wx.ALIGN_CENTER | wx.BOTTOM, 5)
+        panel.SetSizer(vbox)
+        self.panel = panel
+    
+    def column_labels(self):
+        return [_('Blender 版本'), _('状态'), _('退出码'), _('耗时')]
+    
+    def form_label_texts(self):
+        return [_(".blend 文件:"), _("渲染帧（留空则只执行脚本）:"), _("Python 脚本（可选）:"), _("输出目录（每个版本一个子目录）:"),
+                _("附加参数:"), _("同时运行的进程数:")]
+    
+    def apply_labels(self):
+        # 设置标题、表单标签、按钮和列标题文字，切换语言后再次调用；状态单元格在刷新时按当前语言生成
+        self.SetTitle(_("批量渲染"))
+        for label, text in zip(self.form_labels, self.form_label_texts()):
+            label.SetLabel(text)
+        set_column_labels(self.job_list, self.column_labels())
+        self.start_button.SetLabel(_("开始"))
+        self.cancel_button.SetLabel(_("取消"))
+        self.panel.Layout()
+        self.refresh()
+    
+    def start(self, event):
+        if self.runner is not None and any(job.state in (BATCH_PENDING, BATCH_RUNNING) for job in self.runner.jobs):
+            wx.MessageBox(_("上一批任务仍在运行。"), _("警告"), wx.ICON_WARNING)
+            return
+        names = list(self.version_list.GetCheckedStrings())
+        blend_file = self.blend_file_picker.GetPath()
+        frame = self.frame_text.GetValue().strip()
+        if not names or not blend_file:
+            wx.MessageBox(_("请选择至少一个版本和一个 .blend 文件。"), _("警告"), wx.ICON_WARNING)
+            return
+        if frame and not frame.lstrip('-').isdigit():
+            wx.MessageBox(_("帧号必须是整数。"), _("警告"), wx.ICON_WARNING)
+            return
+        try:
+            args = shlex.split(self.args_text.GetValue(), posix=os.name != 'nt')
+            self.runner = self.core.create_batch(names, blend_file, int(frame) if frame else None, self.script_picker.GetPath() or None,
+                                                 args, self.output_dir_picker.GetPath() or None, self.workers_spin.GetValue())
+        except (VersionNotFoundError, ValueError) as e:
+            wx.MessageBox(str(e), _("错误"), wx.ICON_ERROR)
+            return
+        self.job_list.DeleteAllItems()
+        for job in self.runner.jobs:
+            self.job_list.InsertItem(self.job_list.GetItemCount(), job.name)
+        self.runner.start()
+        self.refresh()
+    
+    def cancel(self):
+        if self.runner is not None:
+            self.runner.cancel()
+    
+    def refresh(self):
+        # 只改写变化的单元格；选中版本的输出有变化时才重写日志框
+        if self.runner is None:
+            return
+        states = {BATCH_PENDING: _("等待中"), BATCH_RUNNING: _("运行中"), BATCH_DONE: _("已完成"),
+                  BATCH_FAILED: _("失败"), BATCH_CANCELLED: _("已取消")}
+        for index, job in enumerate(self.runner.jobs):
+            elapsed = job.elapsed()
+            values = [job.name, states.get(job.state, job.state), '' if job.exit_code is None else str(job.exit_code),
+                      f"{elapsed:.1f} s" if elapsed is not None else '']
+            for column, value in enumerate(values):
+                if self.job_list.GetItemText(index, column) != value:
+                    self.job_list.SetItem(index, column, value)
+        
+        selected = self.job_list.GetFirstSelected()
+        if selected != -1:
+            job = self.runner.jobs[selected]
+            text = '\n'.join(job.log_lines() + ([job.error] if job.error else []))
+            if text != self.log_text.GetValue():
+                self.log_text.SetValue(text)
+                self.log_text.ShowPosition(self.log_text.GetLastPosition())
+    
+    def on_close(self, event):
+        # 关闭面板时结束仍在运行的渲染进程
+        self.timer.Stop()
+        self.cancel()
+        event.Skip()
+
+class LaunchStatsDialog(wx.Dialog):
+    # 按版本汇总启动耗时（到界面就绪）、峰值内存和 CPU 时间，可导出为 CSV 或 JSON
+    COLUMN_WIDTHS = (150, 90, 70, 50, 110, 80, 110, 110)
+    
+    def __init__(self, parent, title, stats):
+        super(LaunchStatsDialog, self).__init__(parent, title=title, size=(760, 360), style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        
+        self.stats = stats
+        self.rows = stats.summary()
+        self.init_ui()
+        self.apply_labels()
+    
+    def init_ui(self):
+        self.stats_list = wx.ListCtrl(self, style=wx.LC_REPORT)
+        for index, (label, width) in enumerate(zip(self.column_labels(), self.COLUMN_WIDTHS)):
+            self.stats_list.InsertColumn(index, label, width=width)
+        
+        def seconds(value):
+            return f"{value:.2f} s" if value is not None else ''
+        
+        for row in self.rows:
+            index = self.stats_list.InsertItem(self.stats_list.GetItemCount(), row['name'] or '')
+            self.stats_list.SetItem(index, 1, row['version'] or '')
+            self.stats_list.SetItem(index, 2, str(row['launches']))
+            self.stats_list.SetItem(index, 3, str(row['failures']))
+            self.stats_list.SetItem(index, 4, seconds(row['ready_median']))
+            self.stats_list.SetItem(index, 5, seconds(row['ready_min']))
+            self.stats_list.SetItem(index, 6, format_size(row['peak_rss_median']) if row['peak_rss_median'] is not None else '')
+            self.stats_list.SetItem(index, 7, seconds(row['cpu_median']))
+        
+        # 按钮文字在 apply_labels 中设置
+        self.export_summary_button = wx.Button(self)
+        self.export_summary_button.Bind(wx.EVT_BUTTON, lambda event: self.export(self.rows, SUMMARY_FIELDS))
+        self.export_records_button = wx.Button(self)
+        self.export_records_button.Bind(wx.EVT_BUTTON, lambda event: self.export(None, RECORD_FIELDS))
+        self.close_button = wx.Button(self, wx.ID_CANCEL)
+        
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        for control in (self.export_summary_button, self.export_records_button, self.close_button):
+            hbox.Add(control, 0, wx.ALL, 5)
+        
+        vbox = wx.BoxSizer(wx.VERTICAL)
+        vbox.Add(self.stats_list, 1, wx.EXPAND | wx.ALL, 10)
+        vbox.Add(hbox, 0, wx.ALIGN_CENTER | wx.BOTTOM, 5)
+        self.SetSizer(vbox)
+    
+    def column_labels(self):
+        return [_('Blender 版本'), _('版本号'), _('启动次数'), _('失败'), _('就绪时间（中位）'), _('最快就绪'), _('峰值内存（中位）'), _('CPU 时间（中位）')]
+    
+    def apply_labels(self):
+        # 设置标题、列标题和按钮文字，切换语言后再次调用
+        self.SetTitle(_("启动统计"))
+        set_column_labels(self.stats_list, self.column_labels())
+        self.export_summary_button.SetLabel(_("导出汇总"))
+        self.export_records_button.SetLabel(_("导出全部记录"))
+        self.close_button.SetLabel(_("关闭"))
+        self.Layout()
+    
+    def export(self, rows, fields):
+        with wx.FileDialog(self, _("导出启动统计"), wildcard="CSV (*.csv)|*.csv|JSON (*.json)|*.json",
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as fileDialog:
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+            path = fileDialog.GetPath()
+            if not path.lower().endswith(('.csv', '.json')):
+                path += '.json' if fileDialog.GetFilterIndex() == 1 else '.csv'
+            self.stats.export(path, rows, fields)
+            wx.MessageBox(_("启动统计已导出到 {0}").format(path), _("信息"), wx.ICON_INFORMATION)
+
 class PreferencesDialog(wx.Dialog):
     def __init__(self, parent, title, config):
         super(PreferencesDialog, self).__init__(parent, title=title, size=(500, 400))
@@ -521,26 +1186,78 @@ class PreferencesDialog(wx.Dialog):
         theme_choice = wx.Choice(general_panel, choices=[_("Light"), _("Dark")])
         theme_choice.SetStringSelection(self.config.get('PREFERENCES', 'Theme', fallback='Light'))
         
+        warm_start_var = wx.CheckBox(general_panel, label=_("启动加速（在后台预读最近和最常使用的版本）"))
+        warm_start_var.SetValue(self.config.getboolean('PREFERENCES', 'WarmStart', fallback=False))
+        
         general_sizer = wx.BoxSizer(wx.VERTICAL)
         general_sizer.Add(auto_fetch_var, 0, wx.ALL, 10)
+        general_sizer.Add(warm_start_var, 0, wx.ALL, 10)
         general_sizer.Add(wx.StaticText(general_panel, label=_("主题选择(实验性):")), 0, wx.ALL, 10)
         general_sizer.Add(theme_choice, 0, wx.ALL, 10)
         general_panel.SetSizer(general_sizer)
         
         # 下载选项卡
-        download_panel = wx.Panel(notebook)
+        download_panel = wx.ScrolledWindow(notebook)  # 选项较多，允许滚动
+        download_panel.SetScrollRate(0, 10)
         notebook.AddPage(download_panel, _("下载"))
         
         source_url_var = wx.TextCtrl(download_panel, value=self.config.get('PREFERENCES', 'SourceURL', fallback=SOURCE_URL))
         thread_count_var = wx.SpinCtrl(download_panel, value=str(self.config.getint('PREFERENCES', 'ThreadCount', fallback=4)), min=1, max=10)
+        connect_timeout_var = wx.SpinCtrl(download_panel, value=str(self.config.getint('PREFERENCES', 'ConnectTimeout', fallback=http_client.DEFAULT_CONNECT_TIMEOUT)), min=1, max=300)
+        read_timeout_var = wx.SpinCtrl(download_panel, value=str(self.config.getint('PREFERENCES', 'ReadTimeout', fallback=http_client.DEFAULT_READ_TIMEOUT)), min=1, max=600)
+        retries_var = wx.SpinCtrl(download_panel, value=str(self.config.getint('PREFERENCES', 'Retries', fallback=http_client.DEFAULT_RETRIES)), min=0, max=10)
+        index_cache_ttl_var = wx.SpinCtrl(download_panel, value=str(self.config.getint('PREFERENCES', 'IndexCacheTTL', fallback=DEFAULT_INDEX_TTL // 60)), min=0, max=10080)
+        mirrors_var = wx.TextCtrl(download_panel, value='\n'.join(parse_mirrors(self.config.get('PREFERENCES', 'Mirrors', fallback='\n'.join(DEFAULT_MIRRORS)))), style=wx.TE_MULTILINE, size=(-1, 60))
+        concurrent_downloads_var = wx.SpinCtrl(download_panel, value=str(self.config.getint('PREFERENCES', 'ConcurrentDownloads', fallback=DEFAULT_CONCURRENT_JOBS)), min=1, max=8)
+        bandwidth_limit_var = wx.SpinCtrl(download_panel, value=str(self.config.getint('PREFERENCES', 'BandwidthLimit', fallback=0)), min=0, max=10 ** 7)
+        streaming_install_var = wx.CheckBox(download_panel, label=_("边下载边解压（不保留压缩包）"))
+        streaming_install_var.SetValue(self.config.getboolean('PREFERENCES', 'StreamingInstall', fallback=True))
+        delta_update_var = wx.CheckBox(download_panel, label=_("增量更新（已安装同系列版本时只下载变化的文件）"))
+        delta_update_var.SetValue(self.config.getboolean('PREFERENCES', 'DeltaUpdate', fallback=True))
         
         download_sizer = wx.BoxSizer(wx.VERTICAL)
         download_sizer.Add(wx.StaticText(download_panel, label=_("Blender 版本源 URL:")), 0, wx.ALL, 10)
         download_sizer.Add(source_url_var, 0, wx.ALL | wx.EXPAND, 10)
+        download_sizer.Add(wx.StaticText(download_panel, label=_("其他镜像（每行一个，下载时自动选择最快的镜像）:")), 0, wx.ALL, 10)
+        download_sizer.Add(mirrors_var, 0, wx.ALL | wx.EXPAND, 10)
         download_sizer.Add(wx.StaticText(download_panel, label=_("下载线程数(实验性 概率卡死):")), 0, wx.ALL, 10)
         download_sizer.Add(thread_count_var, 0, wx.ALL, 10)
+        download_sizer.Add(wx.StaticText(download_panel, label=_("同时下载的版本数:")), 0, wx.ALL, 10)
+        download_sizer.Add(concurrent_downloads_var, 0, wx.ALL, 10)
+        download_sizer.Add(wx.StaticText(download_panel, label=_("总下载速度上限(KB/s，0 为不限速):")), 0, wx.ALL, 10)
+        download_sizer.Add(bandwidth_limit_var, 0, wx.ALL, 10)
+        download_sizer.Add(wx.StaticText(download_panel, label=_("连接超时(秒):")), 0, wx.ALL, 10)
+        download_sizer.Add(connect_timeout_var, 0, wx.ALL, 10)
+        download_sizer.Add(wx.StaticText(download_panel, label=_("读取超时(秒):")), 0, wx.ALL, 10)
+        download_sizer.Add(read_timeout_var, 0, wx.ALL, 10)
+        download_sizer.Add(wx.StaticText(download_panel, label=_("失败重试次数:")), 0, wx.ALL, 10)
+        download_sizer.Add(retries_var, 0, wx.ALL, 10)
+        download_sizer.Add(wx.StaticText(download_panel, label=_("版本列表缓存有效期(分钟):")), 0, wx.ALL, 10)
+        download_sizer.Add(index_cache_ttl_var, 0, wx.ALL, 10)
+        download_sizer.Add(streaming_install_var, 0, wx.ALL, 10)
+        download_sizer.Add(delta_update_var, 0, wx.ALL, 10)
         download_panel.SetSizer(download_sizer)
         
+        # 局域网共享选项卡
+        sharing_panel = wx.Panel(notebook)
+        notebook.AddPage(sharing_panel, _("局域网共享"))
+        
+        cache_peers_var = wx.TextCtrl(sharing_panel, value='\n'.join(parse_mirrors(self.config.get('PREFERENCES', 'CachePeers', fallback=''))), style=wx.TE_MULTILINE, size=(-1, 60))
+        cache_serve_var = wx.CheckBox(sharing_panel, label=_("作为缓存节点，向局域网中的其他实例提供已下载的安装包（保留完整压缩包）"))
+        cache_serve_var.SetValue(self.config.getboolean('PREFERENCES', 'CacheServe', fallback=False))
+        cache_port_var = wx.SpinCtrl(sharing_panel, value=str(self.config.getint('PREFERENCES', 'CachePort', fallback=cache_peer.DEFAULT_PEER_PORT)), min=1, max=65535)
+        cache_connections_var = wx.SpinCtrl(sharing_panel, value=str(self.config.getint('PREFERENCES', 'CacheConnections', fallback=cache_peer.DEFAULT_PEER_CONNECTIONS)), min=1, max=256)
+        
+        sharing_sizer = wx.BoxSizer(wx.VERTICAL)
+        sharing_sizer.Add(wx.StaticText(sharing_panel, label=_("缓存节点（每行一个地址，例如 http://192.168.1.10:8765/，优先于公共镜像）:")), 0, wx.ALL, 10)
+        sharing_sizer.Add(cache_peers_var, 0, wx.ALL | wx.EXPAND, 10)
+        sharing_sizer.Add(cache_serve_var, 0, wx.ALL, 10)
+        sharing_sizer.Add(wx.StaticText(sharing_panel, label=_("监听端口:")), 0, wx.ALL, 10)
+        sharing_sizer.Add(cache_port_var, 0, wx.ALL, 10)
+        sharing_sizer.Add(wx.StaticText(sharing_panel, label=_("同时传输的连接数上限:")), 0, wx.ALL, 10)
+        sharing_sizer.Add(cache_connections_var, 0, wx.ALL, 10)
+        sharing_panel.SetSizer(sharing_sizer)
+        
         # 文件管理选项卡
         file_management_panel = wx.Panel(notebook)
         notebook.AddPage(file_management_panel, _("文件管理"))
@@ -548,16 +1265,24 @@ class PreferencesDialog(wx.Dialog):
         folder_path_var = wx.TextCtrl(file_management_panel, value=self.config.get('PREFERENCES', 'FolderPath', fallback=''))
         browse_button = wx.Button(file_management_panel, label=_("浏览"))
         browse_button.Bind(wx.EVT_BUTTON, lambda event: self.browse_folder(folder_path_var))
+        install_cache_size_var = wx.SpinCtrl(file_management_panel, value=str(self.config.getint('PREFERENCES', 'InstallCacheSize', fallback=DEFAULT_STORE_SIZE // 1024 // 1024)), min=0, max=10 ** 7)
+        link_mode_choice = wx.Choice(file_management_panel, choices=[_("硬链接"), _("写时复制"), _("复制")])
+        link_mode = self.config.get('PREFERENCES', 'InstallCacheLinkMode', fallback='hardlink')
+        link_mode_choice.SetSelection(LINK_MODES.index(link_mode) if link_mode in LINK_MODES else 0)
         
         file_management_sizer = wx.BoxSizer(wx.VERTICAL)
         file_management_sizer.Add(wx.StaticText(file_management_panel, label=_("Blender 版本列表文件夹路径:")), 0, wx.ALL, 10)
         file_management_sizer.Add(folder_path_var, 0, wx.ALL | wx.EXPAND, 10)
         file_management_sizer.Add(browse_button, 0, wx.ALL, 10)
+        file_management_sizer.Add(wx.StaticText(file_management_panel, label=_("安装缓存上限(MB，0 为不使用缓存):")), 0, wx.ALL, 10)
+        file_management_sizer.Add(install_cache_size_var, 0, wx.ALL, 10)
+        file_management_sizer.Add(wx.StaticText(file_management_panel, label=_("相同文件的安装方式:")), 0, wx.ALL, 10)
+        file_management_sizer.Add(link_mode_choice, 0, wx.ALL, 10)
         file_management_panel.SetSizer(file_management_sizer)
         
         # 确认按钮
         save_button = wx.Button(self, label=_("保存"))
-        save_button.Bind(wx.EVT_BUTTON, lambda event: self.save_preferences(auto_fetch_var, source_url_var, thread_count_var, folder_path_var, theme_choice))
+        save_button.Bind(wx.EVT_BUTTON, lambda event: self.save_preferences(auto_fetch_var, source_url_var, thread_count_var, folder_path_var, theme_choice, streaming_install_var, index_cache_ttl_var, connect_timeout_var, read_timeout_var, retries_var, mirrors_var, install_cache_size_var, link_mode_choice, concurrent_downloads_var, bandwidth_limit_var, warm_start_var, delta_update_var, cache_peers_var, cache_serve_var, cache_port_var, cache_connections_var))
         
         main_sizer = wx.BoxSizer(wx.VERTICAL)
         main_sizer.Add(notebook, 1, wx.EXPAND | wx.ALL, 10)
@@ -572,19 +1297,128 @@ class PreferencesDialog(wx.Dialog):
                 return
             folder_path_var.SetValue(dirDialog.GetPath())
     
-    def save_preferences(self, auto_fetch_var, source_url_var, thread_count_var, folder_path_var, theme_choice):
+    def save_preferences(self, auto_fetch_var, source_url_var, thread_count_var, folder_path_var, theme_choice, streaming_install_var, index_cache_ttl_var, connect_timeout_var, read_timeout_var, retries_var, mirrors_var, install_cache_size_var, link_mode_choice, concurrent_downloads_var, bandwidth_limit_var, warm_start_var, delta_update_var, cache_peers_var, cache_serve_var, cache_port_var, cache_connections_var):
         # 保存偏好设置
         self.config['PREFERENCES']['AutoFetch'] = str(auto_fetch_var.GetValue())
         self.config['PREFERENCES']['SourceURL'] = source_url_var.GetValue()
         self.config['PREFERENCES']['ThreadCount'] = str(thread_count_var.GetValue())
         self.config['PREFERENCES']['FolderPath'] = folder_path_var.GetValue()
         self.config['PREFERENCES']['Theme'] = theme_choice.GetStringSelection()
+        self.config['PREFERENCES']['StreamingInstall'] = str(streaming_install_var.GetValue())
+        self.config['PREFERENCES']['IndexCacheTTL'] = str(index_cache_ttl_var.GetValue())
+        self.config['PREFERENCES']['ConnectTimeout'] = str(connect_timeout_var.GetValue())
+        self.config['PREFERENCES']['ReadTimeout'] = str(read_timeout_var.GetValue())
+        self.config['PREFERENCES']['Retries'] = str(retries_var.GetValue())
+        self.config['PREFERENCES']['Mirrors'] = '\n'.join(parse_mirrors(mirrors_var.GetValue()))
+        self.config['PREFERENCES']['InstallCacheSize'] = str(install_cache_size_var.GetValue())
+        self.config['PREFERENCES']['InstallCacheLinkMode'] = LINK_MODES[link_mode_choice.GetSelection()]
+        self.config['PREFERENCES']['ConcurrentDownloads'] = str(concurrent_downloads_var.GetValue())
+        self.config['PREFERENCES']['BandwidthLimit'] = str(bandwidth_limit_var.GetValue())
+        self.config['PREFERENCES']['WarmStart'] = str(warm_start_var.GetValue())
+        self.config['PREFERENCES']['DeltaUpdate'] = str(delta_update_var.GetValue())
+        self.config['PREFERENCES']['CachePeers'] = '\n'.join(parse_mirrors(cache_peers_var.GetValue()))
+        self.config['PREFERENCES']['CacheServe'] = str(cache_serve_var.GetValue())
+        self.config['PREFERENCES']['CachePort'] = str(cache_port_var.GetValue())
+        self.config['PREFERENCES']['CacheConnections'] = str(cache_connections_var.GetValue())
         
         # 立即应用主题
         self.GetParent().apply_theme(theme_choice.GetStringSelection())
         
         self.EndModal(wx.ID_OK)
 
+class PresetDialog(wx.Dialog):
+    # 管理启动预设：Blender 版本、附加参数、环境变量、是否以出厂设置启动以及要打开的 .blend 文件
+    def __init__(self, parent, title, core):
+        super(PresetDialog, self).__init__(parent, title=title, size=(640, 460), style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        
+        self.core = core
+        self.init_ui()
+        self.refresh_presets()
+    
+    def init_ui(self):
+        self.preset_list = wx.ListBox(self)
+        self.preset_list.Bind(wx.EVT_LISTBOX, self.on_select)
+        
+        self.name_text = wx.TextCtrl(self)
+        self.version_choice = wx.Choice(self, choices=list(self.core.installed_versions(scan=False)))
+        self.args_text = wx.TextCtrl(self)
+        self.env_text = wx.TextCtrl(self, style=wx.TE_MULTILINE, size=(-1, 60))
+        self.factory_startup_var = wx.CheckBox(self, label=_("以出厂设置启动（--factory-startup）"))
+        self.blend_file_picker = wx.FilePickerCtrl(self, wildcard=_("Blender files (*.blend)|*.blend"))
+        
+        form = wx.BoxSizer(wx.VERTICAL)
+        for label, control in ((_("预设名称:"), self.name_text), (_("Blender 版本:"), self.version_choice),
+                               (_("附加参数:"), self.args_text), (_("环境变量（每行一个 KEY=VALUE）:"), self.env_text),
+                               (None, self.factory_startup_var), (_("打开的 .blend 文件:"), self.blend_file_picker)):
+            if label:
+                form.Add(wx.StaticText(self, label=label), 0, wx.LEFT | wx.TOP, 5)
+            form.Add(control, 0, wx.EXPAND | wx.ALL, 5)
+        
+        hbox_main = wx.BoxSizer(wx.HORIZONTAL)
+        hbox_main.Add(self.preset_list, 1, wx.EXPAND | wx.ALL, 5)
+        hbox_main.Add(form, 2, wx.EXPAND | wx.ALL, 5)
+        
+        new_button = wx.Button(self, label=_("新建"))
+        new_button.Bind(wx.EVT_BUTTON, lambda event: self.show_preset('', {}))
+        save_button = wx.Button(self, label=_("保存"))
+        save_button.Bind(wx.EVT_BUTTON, self.save_preset)
+        delete_button = wx.Button(self, label=_("删除"))
+        delete_button.Bind(wx.EVT_BUTTON, self.delete_preset)
+        launch_button = wx.Button(self, label=_("启动"))
+        launch_button.Bind(wx.EVT_BUTTON, self.launch_preset)
+        close_button = wx.Button(self, wx.ID_CANCEL, label=_("关闭"))
+        
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        for control in (new_button, save_button, delete_button, launch_button, close_button):
+            hbox.Add(control, 0, wx.ALL, 5)
+        
+        vbox = wx.BoxSizer(wx.VERTICAL)
+        vbox.Add(hbox_main, 1, wx.EXPAND | wx.ALL, 5)
+        vbox.Add(hbox, 0, wx.ALIGN_CENTER | wx.BOTTOM, 5)
+        self.SetSizer(vbox)
+    
+    def refresh_presets(self, selected=None):
+        self.presets = self.core.presets()
+        self.preset_list.Set(sorted(self.presets))
+        if selected in self.presets:
+            self.preset_list.SetStringSelection(selected)
+    
+    def on_select(self, event):
+        name = self.preset_list.GetStringSelection()
+        self.show_preset(name, self.presets.get(name, {}))
+    
+    def show_preset(self, name, preset):
+        self.name_text.SetValue(name)
+        self.version_choice.SetStringSelection(preset.get('version', ''))
+        self.args_text.SetValue(preset.get('args', ''))
+        self.env_text.SetValue(preset.get('env', ''))
+        self.factory_startup_var.SetValue(preset.get('factory_startup', False))
+        self.blend_file_picker.SetPath(preset.get('blend_file', ''))
+    
+    def save_preset(self, event):
+        name = self.name_text.GetValue().strip()
+        version = self.version_choice.GetStringSelection()
+        if not name or not version:
+            wx.MessageBox(_("请输入预设名称并选择 Blender 版本。"), _("警告"), wx.ICON_WARNING)
+            return
+        self.core.save_preset(name, version, self.args_text.GetValue(), self.env_text.GetValue(),
+                              self.factory_startup_var.GetValue(), self.blend_file_picker.GetPath())
+        self.refresh_presets(name)
+    
+    def delete_preset(self, event):
+        name = self.preset_list.GetStringSelection()
+        if name:
+            self.core.delete_preset(name)
+            self.refresh_presets()
+            self.show_preset('', {})
+    
+    def launch_preset(self, event):
+        name = self.preset_list.GetStringSelection()
+        if not name:
+            wx.MessageBox(_("请选择一个启动预设。"), _("警告"), wx.ICON_WARNING)
+            return
+        self.GetParent().launch_preset(name)
+
 class EditVersionDialog(wx.Dialog):
     def __init__(self, parent, title, version_name, version_path):
         super(EditVersionDialog, self).__init__(parent, title=title, size=(400, 200))
@@ -0,0 +1,203 @@
+import os
+import re
+import socket
+import hashlib
+import threading
+import http.server
+import urllib.parse
+from content_store import file_digest
+from mirror_index import parse_archive_name
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+requests = lazy_import('requests')
+
+# 常量定义
+DEFAULT_PEER_PORT = 8765
+DEFAULT_PEER_CONNECTIONS = 16  # 同时传输压缩包的连接数上限，超出时返回 503，客户端按 Retry-After 稍后重试
+RETRY_AFTER = 2  # 503 响应建议的重试间隔（秒）
+MAJOR_PATTERN = re.compile(r'^Blender\d+\.\d+$')
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def parse_range(header, size):
+    # 解析单个 "bytes=a-b"、"bytes=a-"、"bytes=-n" 区间，返回 [start, end)；没有 Range 或包含多个区间时返回 None（发送完整文件），
+    # 区间无法满足时返回 False
+    match = RANGE_PATTERN.match((header or '').strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(0, size - int(last)), size
+    else:
+        start, end = int(first), min(size, int(last) + 1) if last else size
+    if start >= end:
+        return False
+    return start, end
+
+class CachePeerHandler(http.server.BaseHTTPRequestHandler):
+    # 按公共镜像的目录结构提供服务：/ 和 /BlenderX.Y/ 返回目录页，/BlenderX.Y/<安装包> 返回安装缓存中的压缩包（支持 Range），
+    # /BlenderX.Y/<安装包>.sha256 返回其 SHA-256。请求路径只用于查询缓存清单，不会拼接成本地文件路径
+    protocol_version = 'HTTP/1.1'
+    server_version = 'BlenderVMT-CachePeer'
+    
+    def do_GET(self):
+        self.handle_request(True)
+    
+    def do_HEAD(self):
+        self.handle_request(False)
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def handle_request(self, send_body):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        parts = [part for part in path.split('/') if part]
+        if not parts:
+            return self.send_listing(None, send_body)
+        if len(parts) > 2 or not MAJOR_PATTERN.match(parts[0]):
+            return self.send_error(404)
+        if len(parts) == 1:
+            if not path.endswith('/'):
+                # 目录页中的链接是相对地址，目录必须以 "/" 结尾
+                self.send_response(301)
+                self.send_header('Location', f"/{parts[0]}/")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            return self.send_listing(parts[0], send_body)
+        name = parts[1]
+        if name.endswith('.sha256') and parse_archive_name(name[:-len('.sha256')]):
+            return self.send_checksum(name[:-len('.sha256')], send_body)
+        if parse_archive_name(name):
+            return self.send_archive(name, send_body)
+        self.send_error(404)
+    
+    def send_content(self, body, content_type, send_body):
+        # 发送小文本响应，支持 If-None-Match 条件请求
+        data = body.encode('utf-8')
+        etag = '"{0}"'.format(hashlib.sha1(data).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+    
+    def send_listing(self, major_version, send_body):
+        # 目录页来自本机的目录缓存，过期时由缓存向公共镜像重新验证；全部客户端因此只产生一份外网目录请求
+        catalogue = self.server.catalogue
+        try:
+            page = catalogue.index_cache.fetch(catalogue.major_url(major_version) if major_version else catalogue.source_url)
+        except requests.exceptions.RequestException:
+            return self.send_error(502)
+        self.send_content(page, 'text/html; charset=utf-8', send_body)
+    
+    def send_checksum(self, archive_name, send_body):
+        path = self.server.verified_archive(archive_name)
+        if path is None:
+            return self.send_error(404)
+        self.send_content(f"{os.path.basename(path)}  {archive_name}\n", 'text/plain; charset=utf-8', send_body)
+    
+    def send_archive(self, archive_name, send_body):
+        path = self.server.verified_archive(archive_name)
+        if path is None:
+            return self.send_error(404)
+        size = os.path.getsize(path)
+        byte_range = parse_range(self.headers.get('Range'), size)
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f"bytes */{size}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        # HEAD 请求不占用传输名额；名额用完时让客户端稍后重试，而不是排队占住线程
+        if send_body and not self.server.transfers.acquire(blocking=False):
+            self.send_response(503)
+            self.send_header('Retry-After', str(RETRY_AFTER))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        try:
+            start, end = byte_range or (0, size)
+            self.send_response(206 if byte_range else 200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(end - start))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', f'"{os.path.basename(path)}"')  # 对象文件名即内容的 SHA-256
+            if byte_range:
+                self.send_header('Content-Range', f"bytes {start}-{end - 1}/{size}")
+            self.end_headers()
+            if send_body:
+                with open(path, 'rb') as file:
+                    # 由操作系统直接把文件内容发送到套接字（不支持时 socket.sendfile 自动退回普通读写）
+                    self.connection.sendfile(file, start, end - start)
+        except OSError:
+            self.close_connection = True
+        finally:
+            if send_body:
+                self.server.transfers.release()
+
+class CachePeerServer(http.server.ThreadingHTTPServer):
+    # 局域网缓存节点：把本机已下载的安装包和镜像目录页提供给其他实例，每个连接一个线程，压缩包传输数受 max_connections 限制
+    daemon_threads = True
+    
+    def __init__(self, address, catalogue, store=None, max_connections=DEFAULT_PEER_CONNECTIONS):
+        super(CachePeerServer, self).__init__(address, CachePeerHandler)
+        self.catalogue = catalogue
+        self.store = store  # 安装缓存，为 None 时只提供目录页
+        self.max_connections = max_connections
+        self.transfers = threading.BoundedSemaphore(max_connections)
+        self._verified = {}  # 对象路径 -> (大小, inode)，内容已核对过的对象
+        self._verify_locks = {}  # 对象路径 -> 锁，同一个对象只核对一次，不同对象和已核对过的对象的请求互不等待
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        if host in ('0.0.0.0', '::'):
+            host = socket.gethostname()  # 监听所有网卡时显示本机名，其他机器用它访问
+        return f"http://{host}:{port}/"
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+    
+    def verified_archive(self, archive_name):
+        # 返回缓存中的压缩包路径；对象第一次被请求时核对内容与文件名中的 SHA-256，损坏的对象删除后按未命中处理。
+        # 核对期间只有请求同一个对象的连接等待
+        store = self.store
+        path = store.find_archive(archive_name) if store is not None else None
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+            with self._lock:
+                if self._verified.get(path) == (stat.st_size, stat.st_ino):
+                    return path
+                verify_lock = self._verify_locks.setdefault(path, threading.Lock())
+            with verify_lock:
+                with self._lock:
+                    if self._verified.get(path) == (stat.st_size, stat.st_ino):
+                        return path
+                if file_digest(path) != os.path.basename(path):
+                    print(_("缓存中的 {0} 已损坏，已删除").format(archive_name))  # 调试信息
+                    os.remove(path)
+                    return None
+                with self._lock:
+                    self._verified[path] = (stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+        return path
@@ -0,0 +1,181 @@
+import os
+import re
+import zlib
+import hashlib
+import threading
+import http_client
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+zipfile = lazy_import('zipfile')
+requests = lazy_import('requests')
+
+# 常量定义
+CHECKSUM_ALGORITHMS = (('.sha256', 'sha256'), ('.md5', 'md5'))  # 镜像发布的校验文件，按优先级排列
+CHECKSUM_LINE_PATTERN = re.compile(r'^\s*(?:([0-9a-fA-F]{32,64})\s+\*?(\S.*?)|(?:SHA256|MD5)\s*\((.+?)\)\s*=\s*([0-9a-fA-F]{32,64}))\s*$')
+READ_CHUNK_SIZE = 1024 * 1024
+
+def checksum_names(archive_name, available=None):
+    # 返回可能包含该压缩包校验值的文件名：Blender 按版本发布 blender-x.y.z.sha256，也兼容逐文件的 <压缩包名>.sha256
+    match = re.match(r'(blender-\d+\.\d+(?:\.\d+)?[a-z]?)', archive_name)
+    stems = [match.group(1)] if match else []
+    stems.append(archive_name)
+    names = [(stem + suffix, algorithm) for suffix, algorithm in CHECKSUM_ALGORITHMS for stem in stems]
+    if available is not None:
+        available = set(available)
+        names = [(name, algorithm) for name, algorithm in names if name in available]
+    return names
+
+def parse_checksum_file(text):
+    # 解析 "<摘要>  <文件名>" 与 BSD 风格 "SHA256 (<文件名>) = <摘要>" 两种格式，返回 {文件名: 摘要}
+    checksums = {}
+    for line in text.splitlines():
+        match = CHECKSUM_LINE_PATTERN.match(line)
+        if not match:
+            continue
+        if match.group(1):
+            checksums[os.path.basename(match.group(2))] = match.group(1).lower()
+        else:
+            checksums[os.path.basename(match.group(3))] = match.group(4).lower()
+    return checksums
+
+def fetch_checksum(archive_url, archive_name, available=None):
+    # 从压缩包所在目录下载校验文件，返回 (算法, 摘要)；镜像未发布校验值时返回 None
+    base_url = archive_url.rsplit('/', 1)[0]
+    for name, algorithm in checksum_names(archive_name, available):
+        try:
+            response = http_client.get(f"{base_url}/{name}")
+            if response.status_code != 200:
+                continue
+        except requests.exceptions.RequestException:
+            continue
+        checksums = parse_checksum_file(response.text)
+        digest = checksums.get(archive_name)
+        if digest is None and len(checksums) == 1 and name.startswith(archive_name):
+            digest = next(iter(checksums.values()))
+        if digest:
+            return algorithm, digest
+    return None
+
+class IncrementalHasher:
+    # 按文件顺序增量计算摘要：写入的数据恰好接在已哈希位置之后时直接计算，
+    # 乱序到达的分段先记下区间，等前面的数据到齐后再从刚写入的文件（页缓存）补读，不需要下载完成后再完整读一遍。
+    # 同一时间只有一个线程持有计算权并在锁外计算和补读，其他写入线程只登记区间，不会等待
+    def __init__(self, file_path, algorithm):
+        self.file_path = file_path
+        self.algorithm = algorithm
+        self.hasher = hashlib.new(algorithm)
+        self.offset = 0
+        self.written = []  # 已写入但尚未计算的 [start, end) 区间
+        self._busy = False  # 是否有线程持有计算权
+        self._lock = threading.Lock()
+    
+    def update(self, position, data):
+        # 数据已写入文件的 position 处后调用
+        with self._lock:
+            if not self._busy and position == self.offset:
+                self._busy = True
+            else:
+                self.add_written(position, position + len(data))
+                if not self.claim():
+                    return
+                data = None
+        try:
+            if data is not None:
+                self.hasher.update(data)
+                with self._lock:
+                    self.offset += len(data)
+        except BaseException:
+            with self._lock:
+                self._busy = False
+            raise
+        self.catch_up()
+    
+    def add_written(self, start, end):
+        merged = []
+        for current in sorted(self.written + [[start, end]]):
+            if merged and current[0] <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], current[1])
+            else:
+                merged.append(list(current))
+        self.written = merged
+    
+    def mark_written(self, start, end):
+        # 登记续传前已在磁盘上的区间
+        with self._lock:
+            self.add_written(start, end)
+            if not self.claim():
+                return
+        self.catch_up()
+    
+    def claim(self):
+        # 在锁内调用：没有线程在计算且下一段数据已经写入时取得计算权
+        if self._busy or not self.written or self.written[0][0] > self.offset:
+            return False
+        self._busy = True
+        return True
+    
+    def catch_up(self):
+        # 由持有计算权的线程调用：锁内只查看和更新区间表，读文件和计算在锁外进行；
+        # 区间读完后才从表中移除，读到文件末尾（数据尚未落盘）时区间保留，下次写入或取摘要时再补读
+        try:
+            while True:
+                with self._lock:
+                    while self.written and self.written[0][1] <= self.offset:
+                        self.written.pop(0)
+                    if not self.written or self.written[0][0] > self.offset:
+                        self._busy = False
+                        return
+                    offset, end = self.offset, self.written[0][1]
+                with open(self.file_path, 'rb') as file:
+                    file.seek(offset)
+                    while offset < end:
+                        data = file.read(min(READ_CHUNK_SIZE, end - offset))
+                        if not data:
+                            with self._lock:
+                                self._busy = False
+                            return
+                        self.hasher.update(data)
+                        offset += len(data)
+                        with self._lock:
+                            self.offset = offset
+        except BaseException:
+            with self._lock:
+                self._busy = False
+            raise
+    
+    def hexdigest(self):
+        # 先补读仍在区间表中的数据
+        with self._lock:
+            claimed = self.claim()
+        if claimed:
+            self.catch_up()
+        return self.hasher.hexdigest()
+
+def file_checksum(path, algorithm):
+    # 完整读取文件计算摘要，仅在修复损坏分段后使用
+    hasher = hashlib.new(algorithm)
+    with open(path, 'rb') as file:
+        for data in iter(lambda: file.read(READ_CHUNK_SIZE), b''):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+def corrupt_zip_ranges(path):
+    # 逐个校验 ZIP 成员的 CRC，返回损坏成员所在的 [start, end) 字节区间；中央目录本身损坏时返回 None
+    try:
+        with zipfile.ZipFile(path, 'r') as z:
+            infos = sorted(z.infolist(), key=lambda info: info.header_offset)
+            cd_offset = z.start_dir
+            ranges = []
+            for index, info in enumerate(infos):
+                end = infos[index + 1].header_offset if index + 1 < len(infos) else cd_offset
+                try:
+                    with z.open(info) as source:
+                        while source.read(READ_CHUNK_SIZE):
+                            pass
+                except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError):
+                    ranges.append((info.header_offset, end))
+            # 所有成员都完好时损坏只可能位于中央目录
+            return ranges or [(cd_offset, os.path.getsize(path))]
+    except (zipfile.BadZipFile, OSError):
+        return None
@@ -0,0 +1,283 @@
+import os
+import sys
+import json
+import argparse
+import threading
+import builtins
+import contextlib
+import progress
+from core import VersionManagerCore, VersionNotFoundError, CONFIG_FILE, default_platform
+from installer import install_dir_name
+from downloader import DownloadError, ChecksumError
+from download_manager import JOB_DONE
+from mirror_index import format_size
+from launch_telemetry import RECORD_FIELDS, SUMMARY_FIELDS
+from file_remover import TreeRemover
+from batch_runner import JOB_PENDING, JOB_RUNNING, JOB_DONE as BATCH_DONE, JOB_FAILED, JOB_CANCELLED
+from progress import format_speed, format_eta
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+requests = lazy_import('requests')
+
+# 常量定义
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2  # argparse 参数错误时也使用此退出码
+EXIT_NOT_FOUND = 3
+EXIT_NETWORK = 4
+EXIT_INTEGRITY = 5
+LOG_TAIL_LINES = 20  # 批量运行失败时输出的最后几行日志
+
+def exit_code(exception):
+    # 按异常类型返回退出码，供批量部署脚本区分失败原因
+    if isinstance(exception, VersionNotFoundError):
+        return EXIT_NOT_FOUND
+    if isinstance(exception, ChecksumError):
+        return EXIT_INTEGRITY
+    if isinstance(exception, (DownloadError, requests.exceptions.RequestException)):
+        return EXIT_NETWORK
+    return EXIT_ERROR
+
+def output(args, data, text_lines):
+    # 结果写到原始标准输出：--json 时输出一个 JSON 文档，否则逐行输出文本
+    if args.json:
+        json.dump(data, args.stdout, ensure_ascii=False, indent=2)
+        args.stdout.write('\n')
+    else:
+        for line in text_lines:
+            print(line, file=args.stdout)
+
+def command_list(core, args):
+    versions = core.installed_versions()
+    output(args, [{'name': name, 'executable': path} for name, path in versions.items()],
+           [f"{name}\t{path}" for name, path in versions.items()])
+    return EXIT_OK
+
+def command_list_remote(core, args):
+    results = core.search(args.version or '', args.platform)
+    data = [{'major_version': major_version, 'name': entry.name, 'size': entry.size, 'mtime': entry.mtime} for major_version, entry in results]
+    output(args, data, [f"{entry.name}\t{format_size(entry.size)}" for _major_version, entry in results])
+    return EXIT_OK
+
+def command_install(core, args):
+    def on_progress(jobs):
+        if args.json:
+            return
+        for job in jobs:
+            details = [job.message]
+            if job.total:
+                details.append(f"{job.done * 100 // job.total}%")
+            details.append(format_speed(job.speed, job.progress.unit))
+            if job.eta is not None:
+                details.append(_("剩余 {0}").format(format_eta(job.eta)))
+            print(f"{job.minor_version}: {' '.join(filter(None, details))}", file=sys.stderr)
+    
+    jobs = core.install(args.versions, args.platform, args.jobs, args.concurrent, False if args.no_streaming else None, on_progress,
+                        False if args.no_delta else None)
+    data = [{
+        'name': job.minor_version,
+        'state': job.state,
+        'error': job.error,
+        'path': os.path.join(core.folder_path, install_dir_name(job.minor_version)) if job.state == JOB_DONE else None
+    } for job in jobs]
+    output(args, data, [f"{item['name']}\t{item['state']}\t{item['error'] or item['path']}" for item in data])
+    failed = [job for job in jobs if job.state != JOB_DONE]
+    if failed:
+        return max(exit_code(job.exception) for job in failed)
+    return EXIT_OK
+
+def command_launch(core, args):
+    if args.command == 'launch-preset':
+        monitor = core.launch_preset(args.name, telemetry=None if args.wait else False)
+    else:
+        monitor = core.launch(args.name, args.args, telemetry=None if args.wait else False)
+    result = {'name': args.name, 'pid': monitor.process.pid, 'log_file': monitor.log_file}
+    if args.wait:
+        result = core.wait_launch(monitor)
+    output(args, result, [f"{key}: {value}" for key, value in result.items()])
+    return EXIT_OK if not args.wait or result['exit_code'] == 0 else EXIT_ERROR
+
+def command_presets(core, args):
+    presets = core.presets()
+    output(args, presets, [f"{name}\t{preset['version']}\t{preset['args']}\t{preset['blend_file']}" for name, preset in presets.items()])
+    return EXIT_OK
+
+def command_warm(core, args):
+    install_dirs = core.prewarm(args.versions, wait=True)
+    output(args, install_dirs, install_dirs)
+    return EXIT_OK
+
+def command_stats(core, args):
+    rows = core.launch_stats.records() if args.records else core.launch_stats.summary()
+    fields = RECORD_FIELDS if args.records else SUMMARY_FIELDS
+    if args.export:
+        core.launch_stats.export(args.export, rows, fields)
+    output(args, rows, ['\t'.join(fields)] + ['\t'.join('' if row.get(field) is None else str(row[field]) for field in fields) for row in rows])
+    return EXIT_OK
+
+@contextlib.contextmanager
+def report_removal(args):
+    # 删除进度由发布线程定时写到标准错误
+    remover = TreeRemover()
+    if not args.json:
+        progress.subscribe(remover.progress, lambda snapshot: print(
+            _("已删除 {0} / {1} 个文件").format(snapshot.done, snapshot.total), file=sys.stderr))
+    try:
+        yield remover
+    finally:
+        progress.unsubscribe(remover.progress)
+
+def command_uninstall(core, args):
+    removed = []
+    for name in args.names:
+        with report_removal(args) as remover:
+            removed.append(core.uninstall(name, remover))
+    output(args, {'removed': removed}, [f"{item['path']}\t{format_size(item['size'])}" for item in removed])
+    return EXIT_OK
+
+def command_gc(core, args):
+    with report_removal(args) as remover:
+        result = core.gc(remover, args.include_archives)
+    kinds = {
+        'download': _("未完成的下载"),
+        'extract': _("未完成的安装"),
+        'uninstall': _("未完成的卸载"),
+        'cache': _("安装缓存"),
+        'index': _("目录缓存")
+    }
+    output(args, result, [f"{format_size(item['size'])}\t{kinds[item['kind']]}\t{item['path']}" for item in result['removed']]
+           + [_("已移除失效版本记录：{0}").format(name) for name in result['stale_versions']]
+           + [_("共释放 {0}").format(format_size(result['freed']))]
+           + [_("未删除（没有断点日志，可能是手动放入的，加 --include-archives 删除）：{0}\t{1}").format(format_size(item['size']), item['path'])
+              for item in result['candidates']])
+    for error in result['errors']:
+        print(error, file=sys.stderr)
+    return EXIT_OK
+
+def command_batch(core, args):
+    names = list(core.installed_versions()) if args.all else args.versions
+    states = {JOB_PENDING: _("等待中"), JOB_RUNNING: _("运行中"), BATCH_DONE: _("已完成"), JOB_FAILED: _("失败"), JOB_CANCELLED: _("已取消")}
+    runner = core.create_batch(names, args.blend_file, args.frame, args.script, args.args, args.output_dir, args.workers)
+    if not args.json:
+        # 各版本开始和结束时把状态写到标准错误
+        runner.on_change = lambda job: print(f"{job.name}: {states[job.state]}" + (
+            "" if job.state == JOB_RUNNING else f" ({job.exit_code}, {job.duration:.1f} s)"), file=sys.stderr)
+    print(_("并行数：{0}").format(runner.workers))  # 调试信息
+    results = runner.run()
+    for job in runner.jobs:
+        if job.state != BATCH_DONE:
+            print(_("{0} 的最后 {1} 行输出：").format(job.name, LOG_TAIL_LINES), file=sys.stderr)
+            for line in job.log_lines()[-LOG_TAIL_LINES:] + ([job.error] if job.error else []):
+                print(f"  {line}", file=sys.stderr)
+    output(args, results, [f"{item['name']}\t{states[item['state']]}\t{item['exit_code']}\t{item['duration']}" for item in results])
+    return EXIT_OK if all(item['state'] == BATCH_DONE for item in results) else EXIT_ERROR
+
+def command_serve(core, args):
+    # 前台运行缓存节点，按 Ctrl+C 停止
+    server = core.serve_cache(args.host, args.port, args.connections)
+    print(_("缓存节点已启动：{0}（按 Ctrl+C 停止）").format(server.url), file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='blender-vmt', description=_("Blender 版本管理器命令行"))
+    parser.add_argument('--config', default=CONFIG_FILE, help=_("配置文件路径"))
+    parser.add_argument('--json', action='store_true', help=_("以 JSON 格式输出"))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    subparsers.add_parser('list', help=_("列出已安装的版本")).set_defaults(handler=command_list)
+    
+    list_remote = subparsers.add_parser('list-remote', help=_("列出镜像上可安装的版本"))
+    list_remote.add_argument('version', nargs='?', help=_("版本号前缀，例如 4.2"))
+    list_remote.add_argument('--platform', default=default_platform(), help=_("平台，例如 windows-x64、linux-x64"))
+    list_remote.set_defaults(handler=command_list_remote)
+    
+    install = subparsers.add_parser('install', help=_("安装一个或多个版本"))
+    install.add_argument('versions', nargs='+', help=_("版本号（例如 4.2.3、4.2）或完整的安装包文件名"))
+    install.add_argument('--platform', default=default_platform(), help=_("平台，例如 windows-x64、linux-x64"))
+    install.add_argument('--jobs', type=int, help=_("每个安装任务的下载线程数"))
+    install.add_argument('--concurrent', type=int, help=_("同时进行的安装任务数"))
+    install.add_argument('--no-streaming', action='store_true', help=_("先下载完整压缩包再解压"))
+    install.add_argument('--no-delta', action='store_true', help=_("不以已安装的同系列版本为基准增量更新"))
+    install.set_defaults(handler=command_install)
+    
+    launch = subparsers.add_parser('launch', help=_("启动已安装的版本"), epilog=_("-- 之后的参数原样传给 Blender，例如 launch \"Blender 4.2.3\" -- -b scene.blend"))
+    launch.add_argument('name', help=_("版本名称"))
+    launch.add_argument('--wait', action='store_true', help=_("等待 Blender 退出并输出其退出码"))
+    launch.set_defaults(handler=command_launch)
+    
+    launch_preset = subparsers.add_parser('launch-preset', help=_("按启动预设启动"))
+    launch_preset.add_argument('name', help=_("预设名称"))
+    launch_preset.add_argument('--wait', action='store_true', help=_("等待 Blender 退出并输出其退出码"))
+    launch_preset.set_defaults(handler=command_launch)
+    
+    subparsers.add_parser('presets', help=_("列出启动预设")).set_defaults(handler=command_presets)
+    
+    warm = subparsers.add_parser('warm', help=_("预读最近和最常启动的版本，加快下次启动"))
+    warm.add_argument('--versions', type=int, help=_("预读的版本数"))
+    warm.set_defaults(handler=command_warm)
+    
+    batch = subparsers.add_parser('batch', help=_("在多个版本上并行后台渲染同一个 .blend 文件"),
+                                  epilog=_("-- 之后的参数加在每个版本的命令行中，例如 batch scene.blend --all --frame 1 -- -E CYCLES"))
+    batch.add_argument('blend_file', help=_(".blend 文件路径"))
+    targets = batch.add_mutually_exclusive_group(required=True)
+    targets.add_argument('--versions', nargs='+', help=_("版本名称"))
+    targets.add_argument('--all', action='store_true', help=_("所有已安装的版本"))
+    batch.add_argument('--frame', type=int, help=_("渲染的帧号"))
+    batch.add_argument('--script', help=_("在后台执行的 Python 脚本"))
+    batch.add_argument('--output-dir', help=_("渲染输出目录，每个版本一个子目录"))
+    batch.add_argument('--workers', type=int, help=_("同时运行的进程数，默认按 CPU 核心数和可用内存计算"))
+    batch.set_defaults(handler=command_batch)
+    
+    serve = subparsers.add_parser('serve', help=_("作为局域网缓存节点，向其他实例提供已下载的安装包和镜像目录页"))
+    serve.add_argument('--host', default='', help=_("监听地址，默认为所有网卡"))
+    serve.add_argument('--port', type=int, help=_("监听端口"))
+    serve.add_argument('--connections', type=int, help=_("同时传输安装包的连接数上限"))
+    serve.set_defaults(handler=command_serve)
+    
+    uninstall = subparsers.add_parser('uninstall', help=_("卸载版本"))
+    uninstall.add_argument('names', nargs='+', help=_("版本名称"))
+    uninstall.set_defaults(handler=command_uninstall)
+    
+    stats = subparsers.add_parser('stats', help=_("比较各版本的启动耗时、峰值内存和 CPU 时间"))
+    stats.add_argument('--records', action='store_true', help=_("列出每次启动的记录而不是按版本汇总"))
+    stats.add_argument('--export', metavar='FILE', help=_("导出到 CSV 或 JSON 文件（按扩展名）"))
+    stats.set_defaults(handler=command_stats)
+    
+    gc = subparsers.add_parser('gc', help=_("清理未完成的下载、安装和卸载留下的文件并淘汰缓存，报告释放的空间"))
+    gc.add_argument('--include-archives', action='store_true', help=_("同时删除没有断点日志的压缩包及其未登记的同名安装目录"))
+    gc.set_defaults(handler=command_gc)
+    return parser
+
+def main(argv=None):
+    # 核心模块加载配置时才安装翻译，解析参数前先装一个直通的 _
+    if not hasattr(builtins, '_'):
+        builtins._ = lambda message: message
+    # "--" 之后的参数原样传给 Blender
+    argv = list(sys.argv[1:] if argv is None else argv)
+    blender_args = []
+    if '--' in argv:
+        index = argv.index('--')
+        argv, blender_args = argv[:index], argv[index + 1:]
+    args = build_parser().parse_args(argv)
+    args.args = blender_args
+    args.stdout = sys.stdout
+    # 调试信息（包括工作线程中的）改写到标准错误，标准输出只保留命令结果
+    with contextlib.redirect_stdout(sys.stderr):
+        core = None
+        try:
+            core = VersionManagerCore(args.config)
+            return args.handler(core, args)
+        except (VersionNotFoundError, DownloadError, requests.exceptions.RequestException, OSError) as e:
+            print(e)
+            return exit_code(e)
+        finally:
+            if core is not None:
+                core.shutdown()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import io
+import os
+import atexit
+import threading
+import configparser
+
+# 常量定义
+SAVE_DELAY = 1.0  # 修改后延迟写盘的时间（秒），期间的多次修改合并为一次写入
+
+def write_atomic(path, text):
+    # 先写同目录下的临时文件并刷到磁盘，再替换原文件；写入中途崩溃时原文件保持完整
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except OSError:
+        # 磁盘已满等写入失败时不在配置文件旁留下半截的临时文件
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class ConfigStore:
+    # INI 配置的持久化层：修改保存在内存中，save() 只安排一次延迟写入，内容与磁盘一致时不写文件；
+    # 所有线程通过 lock 访问 config
+    def __init__(self, path, delay=SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        self.config = configparser.ConfigParser()
+        self.lock = threading.RLock()
+        self._saved_text = None  # 上次读取或写入的内容
+        self._timer = None
+        atexit.register(self.flush)
+    
+    def load(self):
+        with self.lock:
+            try:
+                self.config.read(self.path)
+            except configparser.Error as e:
+                # 旧版本非原子写入可能留下截断的文件，保留能解析的部分
+                print(_("配置文件已损坏，部分设置可能丢失：{0}").format(e))  # 调试信息
+            self._saved_text = self.render() if os.path.exists(self.path) else None
+    
+    def render(self):
+        buffer = io.StringIO()
+        with self.lock:
+            self.config.write(buffer)
+        return buffer.getvalue()
+    
+    def save(self):
+        # 安排延迟写入，已有待写入时不重复安排
+        with self.lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self):
+        # 立即写入待保存的修改，内容未变化时跳过；返回是否写了文件
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            text = self.render()
+            if text == self._saved_text:
+                return False
+            write_atomic(self.path, text)
+            self._saved_text = text
+            return True
+    
+    def export(self, path):
+        # 导出当前配置到其他文件
+        write_atomic(path, self.render())
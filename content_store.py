@@ -0,0 +1,322 @@
+import os
+import json
+import errno
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from progress import ProgressCounter, UNIT_FILES
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 常量定义
+STORE_DIR_NAME = '.blender_store'  # 默认放在 Blender 版本文件夹内，与安装目录位于同一文件系统才能建立硬链接
+DEFAULT_STORE_SIZE = 10 * 1024 * 1024 * 1024  # 缓存独占空间上限（字节）
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = 4  # 计算文件摘要的并发数，hashlib 处理大块数据时会释放 GIL
+LINK_MODES = ('hardlink', 'reflink', 'copy')
+STALE_AGE = 3600  # 清理时跳过最近一小时内改动过的缓存文件，它们可能正被安装任务使用
+FICLONE = 0x40049409  # Linux ioctl：在 btrfs/XFS 等文件系统上以写时复制方式克隆文件
+
+def file_digest(path):
+    # 计算文件的 SHA-256
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for data in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            sha.update(data)
+    return sha.hexdigest()
+
+def reflink_file(source, target):
+    # 写时复制克隆文件，平台或文件系统不支持时抛出 OSError
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(target)
+            raise
+    shutil.copymode(source, target)
+
+def link_file(source, target, mode, allow_copy=True):
+    # 按链接方式把 source 放到 target：硬链接 → 写时复制 → 普通复制逐级回退，返回实际使用的方式
+    if mode == 'hardlink':
+        try:
+            os.link(source, target)
+            return 'hardlink'
+        except OSError:
+            pass
+    if mode in ('hardlink', 'reflink'):
+        try:
+            reflink_file(source, target)
+            return 'reflink'
+        except OSError:
+            pass
+    if not allow_copy:
+        return None
+    shutil.copy2(source, target)
+    return 'copy'
+
+class ContentStore:
+    # 按 SHA-256 寻址的安装缓存：objects/ 保存压缩包和解压出的文件，manifests/ 记录每个压缩包对应的文件清单
+    def __init__(self, store_dir, max_size=DEFAULT_STORE_SIZE, link_mode='hardlink', workers=HASH_WORKERS):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.manifests_dir = os.path.join(store_dir, 'manifests')
+        self.max_size = max_size
+        self.link_mode = link_mode if link_mode in LINK_MODES else 'hardlink'
+        self.workers = workers
+        self._lock = threading.Lock()
+    
+    def object_path(self, digest, executable=False):
+        # 硬链接共享同一个 inode，权限也随之共享，因此可执行与不可执行的相同内容分开存放
+        name = digest + '.x' if executable else digest
+        return os.path.join(self.objects_dir, digest[:2], name)
+    
+    def manifest_path(self, archive_name):
+        return os.path.join(self.manifests_dir, os.path.basename(archive_name) + '.json')
+    
+    def load_manifest(self, archive_name):
+        try:
+            with open(self.manifest_path(archive_name), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+    
+    def update_manifest(self, archive_name, **fields):
+        # 合并字段后先写临时文件再替换，避免并发读到半截内容
+        with self._lock:
+            manifest = self.load_manifest(archive_name) or {'archive_name': archive_name}
+            manifest.update(fields)
+            os.makedirs(self.manifests_dir, exist_ok=True)
+            path = self.manifest_path(archive_name)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file)
+            os.replace(temp_path, path)
+        return manifest
+    
+    def add_object(self, path, executable=None):
+        # 把文件纳入缓存：没有相同内容时 path 本身成为缓存对象，已有时改用缓存对象替换 path 以共享磁盘空间
+        digest = file_digest(path)
+        if executable is None:
+            executable = bool(os.stat(path).st_mode & 0o111)
+        object_path = self.object_path(digest, executable)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temp_path = f"{object_path}.{threading.get_ident()}.tmp"
+            link_file(path, temp_path, self.link_mode)
+            os.replace(temp_path, object_path)
+            return digest, executable
+        
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            if link_file(object_path, temp_path, self.link_mode, allow_copy=False):
+                os.replace(temp_path, path)
+        except OSError:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+        return digest, executable
+    
+    def add_archive(self, archive_path, archive_name):
+        # 把下载好的压缩包移入缓存（代替删除），重装同一版本时无需再次下载
+        digest = file_digest(archive_path)
+        object_path = self.object_path(digest)
+        if os.path.exists(object_path):
+            os.remove(archive_path)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            shutil.move(archive_path, object_path)
+        self.update_manifest(archive_name, archive=digest)
+        self.evict()
+        return object_path
+    
+    def find_archive(self, archive_name):
+        # 返回缓存中的压缩包路径，没有或已被淘汰时返回 None
+        manifest = self.load_manifest(archive_name)
+        if not manifest or not manifest.get('archive'):
+            return None
+        object_path = self.object_path(manifest['archive'])
+        if not os.path.exists(object_path):
+            return None
+        self.touch_manifest(archive_name)
+        return object_path
+    
+    def touch_manifest(self, archive_name):
+        # 最近使用时间记在清单文件的修改时间上；硬链接模式下对象与安装目录中的文件是同一个 inode，修改对象的时间会改动用户安装中的文件
+        try:
+            os.utime(self.manifest_path(archive_name))
+        except OSError:
+            pass
+    
+    def add_tree(self, archive_name, dest, progress=None):
+        # 把解压好的安装目录纳入缓存并记录文件清单，相同文件与其他版本共享同一份数据
+        files = []
+        symlinks = []
+        directories = []
+        for root, dirnames, filenames in os.walk(dest):
+            relative_root = os.path.relpath(root, dest)
+            for name in dirnames:
+                path = os.path.join(root, name)
+                if os.path.islink(path):
+                    symlinks.append((path, os.path.normpath(os.path.join(relative_root, name))))
+                else:
+                    directories.append(os.path.normpath(os.path.join(relative_root, name)).replace(os.sep, '/'))
+            for name in filenames:
+                path = os.path.join(root, name)
+                relative_path = os.path.normpath(os.path.join(relative_root, name))
+                if os.path.islink(path):
+                    symlinks.append((path, relative_path))
+                elif os.path.isfile(path):
+                    files.append((path, relative_path))
+        
+        progress = progress or ProgressCounter()
+        progress.start(len(files), unit=UNIT_FILES)
+        entries = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for (path, relative_path), (digest, executable) in zip(files, executor.map(lambda item: self.add_object(item[0]), files)):
+                entries.append([relative_path.replace(os.sep, '/'), digest, executable])
+                progress.add(1)
+        
+        manifest = self.update_manifest(
+            archive_name,
+            files=entries,
+            directories=directories,
+            symlinks=[[relative_path.replace(os.sep, '/'), os.readlink(path)] for path, relative_path in symlinks]
+        )
+        self.evict()
+        return manifest
+    
+    def has_tree(self, archive_name):
+        # 清单存在且其中的文件都还在缓存中
+        manifest = self.load_manifest(archive_name)
+        if not manifest or not manifest.get('files'):
+            return False
+        return all(os.path.exists(self.object_path(digest, executable)) for _path, digest, executable in manifest['files'])
+    
+    def materialize(self, archive_name, dest, progress=None):
+        # 用缓存对象链接出完整的安装目录，不需要下载和解压；缓存不完整时返回 False
+        if not self.has_tree(archive_name):
+            return False
+        manifest = self.load_manifest(archive_name)
+        os.makedirs(dest, exist_ok=True)
+        for directory in manifest.get('directories', []):
+            os.makedirs(os.path.join(dest, directory), exist_ok=True)
+        
+        files = manifest['files']
+        progress = progress or ProgressCounter()
+        progress.start(len(files), unit=UNIT_FILES)
+        for relative_path, digest, executable in files:
+            object_path = self.object_path(digest, executable)
+            target = os.path.join(dest, relative_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.lexists(target):
+                os.remove(target)
+            try:
+                link_file(object_path, target, self.link_mode)
+            except FileNotFoundError:
+                # 链接过程中对象被并发淘汰
+                return False
+            progress.add(1)
+        
+        for relative_path, link_target in manifest.get('symlinks', []):
+            target = os.path.join(dest, relative_path)
+            if os.path.lexists(target):
+                os.remove(target)
+            os.symlink(link_target, target)
+        self.touch_manifest(archive_name)
+        return True
+    
+    def manifest_objects(self):
+        # 返回 [(清单路径, 清单修改时间, 引用的对象路径集合)]
+        manifests = []
+        try:
+            names = os.listdir(self.manifests_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.manifests_dir, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            manifest = self.load_manifest(name[:-len('.json')]) or {}
+            objects = {self.object_path(digest, executable) for _path, digest, executable in manifest.get('files', [])}
+            if manifest.get('archive'):
+                objects.add(self.object_path(manifest['archive']))
+            manifests.append((path, mtime, objects))
+        return manifests
+    
+    def orphans(self, min_age=STALE_AGE):
+        # 找出可以删除的缓存文件：没有清单引用且未被安装目录链接的对象、引用的对象都已不在的清单、残留的临时文件
+        now = time.time()
+        try:
+            candidates = [os.path.join(self.manifests_dir, name) for name in os.listdir(self.manifests_dir) if name.endswith('.tmp')]
+        except OSError:
+            candidates = []
+        manifests = self.manifest_objects()
+        referenced = set()
+        for _path, _mtime, objects in manifests:
+            referenced |= objects
+        
+        for root, _dirnames, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                path = os.path.join(root, name)
+                if name.endswith('.tmp') or path not in referenced:
+                    candidates.append(path)
+        
+        def is_orphan(path):
+            try:
+                stat = os.lstat(path)
+            except OSError:
+                return False
+            if now - max(stat.st_mtime, stat.st_ctime) < min_age:
+                return False
+            return path.endswith('.tmp') or stat.st_nlink == 1
+        
+        orphans = [path for path in candidates if is_orphan(path)]
+        removed = set(orphans)
+        for path, _mtime, objects in manifests:
+            if not any(os.path.exists(object_path) for object_path in objects - removed) and is_orphan(path):
+                orphans.append(path)
+        return orphans
+    
+    def evict(self):
+        # 只统计仅被缓存引用的对象（链接数为 1），超过上限时删除最久未使用的对象；仍被安装目录硬链接的对象不额外占用空间。
+        # 对象的最近使用时间取它自身和引用它的清单中最晚的修改时间。返回释放的字节数
+        freed = 0
+        last_used = {}
+        for _path, mtime, objects in self.manifest_objects():
+            for object_path in objects:
+                last_used[object_path] = max(mtime, last_used.get(object_path, 0))
+        with self._lock:
+            entries = []
+            for root, _dirnames, filenames in os.walk(self.objects_dir):
+                for name in filenames:
+                    if name.endswith('.tmp'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if stat.st_nlink == 1:
+                        entries.append((max(stat.st_mtime, last_used.get(path, 0)), stat.st_size, path))
+            total = sum(size for _mtime, size, _path in entries)
+            for _mtime, size, path in sorted(entries):
+                if total <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                    freed += size
+                except OSError:
+                    pass
+                total -= size
+        return freed
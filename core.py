@@ -0,0 +1,590 @@
+import os
+import re
+import shlex
+import sys
+import gettext
+import platform
+import threading
+import http_client
+from mirrors import DEFAULT_MIRRORS, PeerList, parse_mirrors
+from mirror_index import IndexCache, VersionCatalogue, DEFAULT_INDEX_TTL, DEFAULT_INDEX_CACHE_SIZE, parse_archive_name, version_key
+from content_store import ContentStore, STORE_DIR_NAME, DEFAULT_STORE_SIZE
+from installer import VersionInstaller, install_dir_name
+from download_manager import DownloadManager, DEFAULT_CONCURRENT_JOBS, QUEUE_PATH, read_queue
+from downloader import JOURNAL_SUFFIX
+from config_store import ConfigStore
+from version_scanner import FolderScanner, WATCH_INTERVAL, blender_executable
+from version_metadata import VersionMetadata
+from launch_telemetry import LaunchMonitor, LaunchStats
+from batch_runner import BatchJob, BatchRunner, cpu_cores, default_workers
+from warm_start import Prewarmer, WARM_BUDGET, WARM_VERSIONS
+from file_remover import TreeRemover, mark_removing, REMOVING_SUFFIX
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+requests = lazy_import('requests')
+cache_peer = lazy_import('cache_peer')
+
+# 常量定义
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lang')
+DEFAULT_LANGUAGE = 'zh_CN'  # 默认语言
+CONFIG_FILE = os.path.join(os.path.expanduser("~"), "blender_version_manager_config.ini")
+SOURCE_URL = 'https://mirrors.aliyun.com/blender/release/'
+INSTALLABLE_EXTENSIONS = ('zip', 'tar.xz', 'tar.gz', 'tar.bz2')  # 可以直接解压安装的格式
+PRESET_SECTION_PREFIX = 'PRESET:'  # 启动预设保存在配置文件的 [PRESET:名称] 节中
+PLATFORM_ALIASES = {
+    # 旧版本安装包使用的平台名，例如 blender-2.79b-windows64.zip、blender-2.83.0-linux64.tar.xz
+    'windows-x64': ('windows-x64', 'windows64', 'win64'),
+    'windows-arm64': ('windows-arm64',),
+    'linux-x64': ('linux-x64', 'linux64', 'linux-glibc'),
+    'macos-x64': ('macos-x64', 'macOS', 'OSX'),
+    'macos-arm64': ('macos-arm64',),
+}
+
+_catalogs = {}  # 语言 -> 已解析的翻译，界面切换语言时不再重新读取 .mo 文件
+
+class VersionNotFoundError(Exception):
+    pass
+
+def set_language(language):
+    # 安装 gettext 翻译到内置的 _，返回翻译函数；每种语言的翻译只解析一次
+    lang = _catalogs.get(language)
+    if lang is None:
+        gettext.bindtextdomain('messages', LOCALE_DIR)
+        gettext.textdomain('messages')
+        lang = _catalogs[language] = gettext.translation('messages', LOCALE_DIR, languages=[language], fallback=True)
+    lang.install()
+    return lang.gettext
+
+def default_platform():
+    # 当前系统对应的安装包平台名，例如 windows-x64、linux-x64、macos-arm64
+    arch = 'arm64' if platform.machine().lower() in ('arm64', 'aarch64') else 'x64'
+    if sys.platform.startswith('win'):
+        return f'windows-{arch}'
+    if sys.platform == 'darwin':
+        return f'macos-{arch}'
+    return f'linux-{arch}'
+
+def platform_matches(entry_platform, platform_name):
+    # 支持平台别名，也接受平台名的一部分（例如 "linux"）
+    return any(alias in entry_platform for alias in PLATFORM_ALIASES.get(platform_name, (platform_name,)))
+
+def major_directory(version):
+    # "4.2.3" -> "Blender4.2"，"2.79b" -> "Blender2.79"
+    match = re.match(r'(\d+\.\d+)', version)
+    return f"Blender{match.group(1)}" if match else None
+
+class VersionManagerCore:
+    # 不依赖图形界面的核心功能：配置、已安装版本、远程版本目录、安装、启动、卸载与清理，图形界面和命令行共用
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self.store = ConfigStore(config_file)
+        self.config = self.store.config
+        self._config_lock = self.store.lock
+        self.load_config()
+        self.configure_network()
+        self.index_cache = self.create_index_cache()
+        self.peers = self.create_peer_list()
+        self.catalogue = self.create_catalogue()
+        self.cache_server = None
+        self.scanner = FolderScanner(self.folder_path)
+        self.metadata = VersionMetadata()
+        self.launch_stats = LaunchStats()
+        self.prewarmer = Prewarmer(self.config.getint('PREFERENCES', 'WarmStartBudget', fallback=WARM_BUDGET // 1024 // 1024) * 1024 * 1024)
+        self._watcher = None
+        self._stop_watch = threading.Event()
+    
+    def load_config(self):
+        # 加载配置文件；只有缺少默认设置时才写回
+        self.store.load()
+        if 'VERSIONS' not in self.config:
+            self.config['VERSIONS'] = {}
+        if 'PREFERENCES' not in self.config:
+            self.config['PREFERENCES'] = {
+                'AutoFetch': 'False',
+                'FolderPath': '',
+                'SourceURL': SOURCE_URL,
+                'ThreadCount': '4',
+                'Language': DEFAULT_LANGUAGE
+            }
+        self.save_config()
+        set_language(self.config.get('PREFERENCES', 'Language', fallback=DEFAULT_LANGUAGE))
+    
+    def save_config(self):
+        # 保存配置文件：合并短时间内的多次修改，延迟后原子写入
+        self.store.save()
+    
+    def reload(self):
+        # 偏好设置修改后重建网络层和版本目录
+        self.configure_network()
+        self.index_cache = self.create_index_cache()
+        self.peers = self.create_peer_list()
+        self.catalogue.shutdown()
+        self.catalogue = self.create_catalogue()
+        if self.cache_server is not None:
+            self.cache_server.catalogue = self.catalogue
+            self.cache_server.store = self.create_content_store(self.folder_path)
+    
+    def shutdown(self):
+        self._stop_watch.set()
+        self.stop_cache_server()
+        self.prewarmer.stop()
+        self.catalogue.shutdown()
+        self.metadata.shutdown()
+        self.store.flush()
+    
+    @property
+    def folder_path(self):
+        return self.config.get('PREFERENCES', 'FolderPath', fallback='')
+    
+    def configure_network(self):
+        # 按偏好设置配置共享的网络层（连接池、超时、重试）
+        thread_count = self.config.getint('PREFERENCES', 'ThreadCount', fallback=4)
+        http_client.configure(
+            connect_timeout=self.config.getint('PREFERENCES', 'ConnectTimeout', fallback=http_client.DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=self.config.getint('PREFERENCES', 'ReadTimeout', fallback=http_client.DEFAULT_READ_TIMEOUT),
+            retries=self.config.getint('PREFERENCES', 'Retries', fallback=http_client.DEFAULT_RETRIES),
+            pool_size=max(http_client.DEFAULT_POOL_SIZE, thread_count * self.config.getint('PREFERENCES', 'ConcurrentDownloads', fallback=DEFAULT_CONCURRENT_JOBS) * 2)
+        )
+    
+    def create_index_cache(self):
+        # 按偏好设置创建镜像目录缓存
+        ttl = self.config.getint('PREFERENCES', 'IndexCacheTTL', fallback=DEFAULT_INDEX_TTL // 60) * 60
+        max_size = self.config.getint('PREFERENCES', 'IndexCacheSize', fallback=DEFAULT_INDEX_CACHE_SIZE // 1024 // 1024) * 1024 * 1024
+        return IndexCache(ttl=ttl, max_size=max_size)
+    
+    def create_catalogue(self):
+        # 创建内存版本目录，后台预取的小版本列表保存在其中
+        source_url = self.config.get('PREFERENCES', 'SourceURL', fallback=SOURCE_URL)
+        return VersionCatalogue(self.index_cache, source_url, peers=self.peers if self.peers.urls else None)
+    
+    def create_peer_list(self):
+        # 偏好设置中的局域网缓存节点（每行一个地址），下载安装包和目录页时优先于公共镜像
+        return PeerList(parse_mirrors(self.config.get('PREFERENCES', 'CachePeers', fallback='')))
+    
+    def create_content_store(self, folder_path):
+        # 按偏好设置创建安装缓存，缓存上限为 0 时不使用缓存
+        max_size = self.config.getint('PREFERENCES', 'InstallCacheSize', fallback=DEFAULT_STORE_SIZE // 1024 // 1024) * 1024 * 1024
+        if max_size <= 0:
+            return None
+        store_dir = self.config.get('PREFERENCES', 'InstallCacheDir', fallback='') or os.path.join(folder_path, STORE_DIR_NAME)
+        return ContentStore(store_dir, max_size, self.config.get('PREFERENCES', 'InstallCacheLinkMode', fallback='hardlink'))
+    
+    def create_installer(self, thread_count=None, streaming_install=None, delta_update=None):
+        # 按当前偏好设置创建安装流程，偏好设置修改后对新开始的任务生效
+        folder_path = self.folder_path
+        if delta_update is None:
+            delta_update = self.config.getboolean('PREFERENCES', 'DeltaUpdate', fallback=True)
+        if streaming_install is None:
+            streaming_install = self.config.getboolean('PREFERENCES', 'StreamingInstall', fallback=True)
+        if self.config.getboolean('PREFERENCES', 'CacheServe', fallback=False):
+            # 作为缓存节点时需要保留完整的压缩包供其他实例下载，不使用流式安装和增量更新
+            streaming_install = delta_update = False
+        return VersionInstaller(
+            folder_path,
+            self.config.get('PREFERENCES', 'SourceURL', fallback=SOURCE_URL),
+            parse_mirrors(self.config.get('PREFERENCES', 'Mirrors', fallback='\n'.join(DEFAULT_MIRRORS))),
+            thread_count or self.config.getint('PREFERENCES', 'ThreadCount', fallback=4),
+            streaming_install,
+            self.create_content_store(folder_path),
+            self.listing_names,
+            self.delta_base if delta_update else None,
+            self.config.get('PREFERENCES', 'InstallCacheLinkMode', fallback='hardlink'),
+            self.peers if self.peers.urls else None
+        )
+    
+    def delta_base(self, minor_version):
+        # 增量更新的基准：版本文件夹中已安装的同一系列（例如 4.2.x）里与目标最接近的版本目录，优先选择较旧的版本
+        parsed = parse_archive_name(minor_version)
+        if parsed is None:
+            return None
+        target_key = version_key(parsed[0])
+        target_path = os.path.join(self.folder_path, install_dir_name(minor_version))
+        older = []
+        newer = []
+        for executable in self.installed_versions(scan=False).values():
+            # 版本名在配置文件中会被转为小写，按可执行文件所在的目录判断
+            install_path = os.path.dirname(executable)
+            key = version_key(os.path.basename(install_path).rpartition(' ')[2])
+            if (os.path.normcase(os.path.dirname(install_path)) != os.path.normcase(self.folder_path) or install_path == target_path
+                    or len(key) < 2 or key[:2] != target_key[:2] or not os.path.isdir(install_path)):
+                continue
+            (older if key < target_key else newer).append((key, install_path))
+        if older:
+            return max(older)[1]
+        return min(newer)[1] if newer else None
+    
+    def listing_names(self, major_version):
+        # 供安装流程查找校验文件，目录页获取失败时返回空列表
+        try:
+            return [entry.name for entry in self.minor_versions(major_version)]
+        except requests.exceptions.RequestException:
+            return []
+    
+    def create_download_manager(self, queue_path=QUEUE_PATH, thread_count=None, concurrency=None, streaming_install=None, delta_update=None):
+        # 创建下载队列；queue_path 为 None 时队列只保存在内存中（命令行使用）
+        def run(job, limiter):
+            installer = self.create_installer(thread_count, streaming_install, delta_update)
+            self.register_install(installer.install(job, limiter))
+        
+        return DownloadManager(
+            run,
+            lambda job: self.create_installer().cleanup(job),
+            queue_path=queue_path,
+            concurrency=concurrency or self.config.getint('PREFERENCES', 'ConcurrentDownloads', fallback=DEFAULT_CONCURRENT_JOBS),
+            bandwidth=self.config.getint('PREFERENCES', 'BandwidthLimit', fallback=0) * 1024
+        )
+    
+    # 已安装版本
+    
+    def installed_versions(self, scan=True):
+        # 返回 {名称: 可执行文件路径}；启用自动获取且 scan 为 True 时先扫描版本文件夹
+        if scan and self.config.getboolean('PREFERENCES', 'AutoFetch', fallback=False):
+            self.scan_folder()
+        return dict(self.config['VERSIONS'])
+    
+    def scan_folder(self):
+        # 增量扫描版本文件夹，把尚未登记的 Blender 安装加入配置，一批只保存一次；返回新登记的版本名
+        if self.scanner.folder_path != self.folder_path:
+            self.scanner = FolderScanner(self.folder_path)
+        found = self.scanner.scan()
+        with self._config_lock:
+            added = [name for name in found if name not in self.config['VERSIONS']]
+            for name in added:
+                self.config['VERSIONS'][name] = found[name]
+            if added:
+                self.save_config()
+        return added
+    
+    def watch_folder(self, callback, interval=None):
+        # 启用自动获取时在后台定期检查版本文件夹，发现新版本后调用 callback(新版本名列表)；
+        # 每次检查只读取文件夹和未完成子目录的修改时间，间隔为 0 时不监视
+        interval = interval or self.config.getint('PREFERENCES', 'FolderWatchInterval', fallback=WATCH_INTERVAL)
+        if interval <= 0 or self._watcher is not None:
+            return
+        
+        def watch():
+            while not self._stop_watch.wait(interval):
+                if not self.config.getboolean('PREFERENCES', 'AutoFetch', fallback=False):
+                    continue
+                added = self.scan_folder()
+                if added:
+                    callback(added)
+        
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+    
+    def register_install(self, install_path):
+        # 安装完成后登记到版本列表，命令行和图形界面都能直接启动
+        executable = blender_executable(install_path)
+        if executable:
+            with self._config_lock:
+                self.config['VERSIONS'][os.path.basename(install_path)] = executable
+                self.save_config()
+        return executable
+    
+    def add_version(self, name, path):
+        with self._config_lock:
+            self.config['VERSIONS'][name] = path
+            self.save_config()
+    
+    def remove_version(self, name):
+        with self._config_lock:
+            if name in self.config['VERSIONS']:
+                del self.config['VERSIONS'][name]
+                self.save_config()
+    
+    def executable(self, name):
+        # 返回已登记版本的可执行文件路径
+        path = self.config['VERSIONS'].get(name)
+        if not path or not os.path.exists(path):
+            raise VersionNotFoundError(_("找不到 {0} 的可执行文件。").format(name))
+        return path
+    
+    # 远程版本目录
+    
+    def major_versions(self):
+        # 获取大版本列表（优先使用缓存），并在后台预取所有小版本列表
+        versions = self.catalogue.load_majors()
+        self.catalogue.prefetch(versions)
+        return versions
+    
+    def minor_versions(self, major_version):
+        return self.catalogue.get_minors(major_version)
+    
+    def search(self, version_prefix='', platform_name=None, installable=True):
+        # 跨大版本搜索安装包，返回 (大版本名, ListingEntry) 列表，最新的在前
+        self.major_versions()
+        self.catalogue.wait()
+        results = []
+        for major_version, entry in self.catalogue.search(version_prefix):
+            _version, entry_platform, extension = parse_archive_name(entry.name)
+            if installable and extension not in INSTALLABLE_EXTENSIONS:
+                continue
+            if platform_name and not platform_matches(entry_platform, platform_name):
+                continue
+            results.append((major_version, entry))
+        return results
+    
+    def resolve(self, version, platform_name=None):
+        # 把 "4.2.3"、"4.2" 或完整安装包名解析为 (大版本名, ListingEntry)；只抓取对应大版本的目录页
+        platform_name = platform_name or default_platform()
+        parsed = parse_archive_name(version)
+        major_version = major_directory(parsed[0] if parsed else version)
+        if major_version is None:
+            raise VersionNotFoundError(_("无效的版本号：{0}").format(version))
+        
+        try:
+            entries = self.minor_versions(major_version)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                raise VersionNotFoundError(_("未找到匹配的 Blender 版本：{0}（{1}）").format(version, platform_name))
+            raise
+        
+        candidates = []
+        for entry in entries:
+            entry_parsed = parse_archive_name(entry.name)
+            if entry_parsed is None:
+                continue
+            if parsed:
+                if entry.name == version:
+                    return major_version, entry
+                continue
+            entry_version, entry_platform, extension = entry_parsed
+            if (extension in INSTALLABLE_EXTENSIONS and platform_matches(entry_platform, platform_name)
+                    and VersionCatalogue.version_matches(entry_version, version)):
+                candidates.append(entry)
+        if not candidates:
+            raise VersionNotFoundError(_("未找到匹配的 Blender 版本：{0}（{1}）").format(version, platform_name))
+        return major_version, max(candidates, key=lambda entry: version_key(parse_archive_name(entry.name)[0]))
+    
+    # 安装、启动、卸载与清理
+    
+    def install(self, versions, platform_name=None, thread_count=None, concurrency=None, streaming_install=None, progress_callback=None, delta_update=None):
+        # 同步安装一个或多个版本（可并行），返回全部任务；progress_callback(jobs) 约每秒调用一次
+        if not os.path.isdir(self.folder_path):
+            raise VersionNotFoundError(_("请先设置有效的 Blender 版本列表文件夹路径。"))
+        targets = [self.resolve(version, platform_name) for version in versions]
+        manager = self.create_download_manager(None, thread_count, concurrency or len(targets), streaming_install, delta_update)
+        for major_version, entry in targets:
+            manager.add(major_version, entry.name)
+        while not manager.wait(1):
+            if progress_callback:
+                progress_callback(manager.snapshot())
+        return manager.snapshot()
+    
+    def launch(self, name, args=(), telemetry=None, env=None):
+        # 启动 Blender，返回 LaunchMonitor；需要记录启动数据时调用 wait_launch() 等待其退出。
+        # 不等待进程退出的调用方（例如命令行不带 --wait）应传入 telemetry=False
+        executable = self.executable(name)
+        if telemetry is None:
+            telemetry = self.config.getboolean('PREFERENCES', 'LaunchTelemetry', fallback=True)
+        entry = self.metadata.get(executable) or {}
+        monitor = LaunchMonitor(executable, args, name, entry.get('version') or None, telemetry, env=env).start()
+        self.metadata.record_launch(executable)
+        return monitor
+    
+    def wait_launch(self, monitor):
+        # 等待 Blender 退出，保存并返回本次启动的记录
+        record = monitor.wait()
+        self.launch_stats.add(record)
+        return record
+    
+    # 启动预设
+    
+    def presets(self):
+        # 返回 {预设名: {'version', 'args', 'env', 'factory_startup', 'blend_file'}}
+        with self._config_lock:
+            return {section[len(PRESET_SECTION_PREFIX):]: {
+                'version': self.config.get(section, 'Version', fallback=''),
+                'args': self.config.get(section, 'Args', fallback=''),
+                'env': self.config.get(section, 'Env', fallback=''),
+                'factory_startup': self.config.getboolean(section, 'FactoryStartup', fallback=False),
+                'blend_file': self.config.get(section, 'BlendFile', fallback='')
+            } for section in self.config.sections() if section.startswith(PRESET_SECTION_PREFIX)}
+    
+    def save_preset(self, name, version, args='', env='', factory_startup=False, blend_file=''):
+        with self._config_lock:
+            self.config[PRESET_SECTION_PREFIX + name] = {
+                'Version': version,
+                'Args': args,
+                'Env': env,
+                'FactoryStartup': str(bool(factory_startup)),
+                'BlendFile': blend_file
+            }
+            self.save_config()
+    
+    def delete_preset(self, name):
+        with self._config_lock:
+            if self.config.remove_section(PRESET_SECTION_PREFIX + name):
+                self.save_config()
+    
+    def launch_preset(self, name, telemetry=None):
+        # 按预设启动：--factory-startup、自定义参数，最后是要打开的 .blend 文件；环境变量每行一个 KEY=VALUE
+        preset = self.presets().get(name)
+        if preset is None:
+            raise VersionNotFoundError(_("找不到启动预设：{0}").format(name))
+        args = ['--factory-startup'] if preset['factory_startup'] else []
+        args += shlex.split(preset['args'], posix=os.name != 'nt')
+        if preset['blend_file']:
+            args.append(preset['blend_file'])
+        env = {}
+        for line in preset['env'].splitlines():
+            key, separator, value = line.partition('=')
+            if separator and key.strip():
+                env[key.strip()] = value.strip()
+        return self.launch(preset['version'], args, telemetry, env)
+    
+    # 批量渲染
+    
+    def create_batch(self, names, blend_file, frame=None, script=None, args=(), output_dir=None, workers=None):
+        # 在多个已登记版本上后台运行同一个 .blend：渲染第 frame 帧，或只执行 Python 脚本（frame 为 None 时）。
+        # 每个版本输出到 output_dir 下以版本名命名的子目录，避免相互覆盖；渲染线程数按并行数平分 CPU 核心
+        workers = workers or min(default_workers(), len(names)) or 1
+        threads = max(1, cpu_cores() // workers)
+        jobs = []
+        for name in names:
+            job_args = ['-b', blend_file]
+            if output_dir:
+                job_args += ['-o', os.path.join(os.path.abspath(output_dir), re.sub(r'[\\/:*?"<>|]', '_', name), '####')]
+            job_args += ['-t', str(threads)] + list(args)
+            if script:
+                job_args += ['-P', script]
+            if frame is not None:
+                job_args += ['-f', str(frame)]
+            jobs.append(BatchJob(name, self.executable(name), job_args))
+        return BatchRunner(jobs, workers)
+    
+    # 局域网缓存共享
+    
+    def serve_cache(self, host='', port=None, max_connections=None):
+        # 在局域网上提供本机安装缓存中的压缩包和镜像目录页，服务器在后台线程中运行；端口被占用时抛出 OSError
+        self.stop_cache_server()
+        port = self.config.getint('PREFERENCES', 'CachePort', fallback=cache_peer.DEFAULT_PEER_PORT) if port is None else port
+        max_connections = max_connections or self.config.getint('PREFERENCES', 'CacheConnections', fallback=cache_peer.DEFAULT_PEER_CONNECTIONS)
+        store = self.create_content_store(self.folder_path)
+        if store is None:
+            print(_("安装缓存已关闭，只共享目录页"))  # 调试信息
+        self.cache_server = cache_peer.CachePeerServer((host, port), self.catalogue, store, max_connections).start()
+        return self.cache_server
+    
+    def stop_cache_server(self):
+        server, self.cache_server = self.cache_server, None
+        if server is not None:
+            server.stop()
+    
+    # 启动加速
+    
+    def warm_candidates(self, limit=WARM_VERSIONS):
+        # 最近启动的版本和启动次数最多的版本交替排列，返回安装目录列表
+        installed = {name.lower(): path for name, path in self.installed_versions(scan=False).items() if os.path.exists(path)}
+        counts = {}
+        for record in self.launch_stats.records():
+            name = (record.get('name') or '').lower()
+            counts[name] = counts.get(name, 0) + 1
+        last_launched = {name: (self.metadata.get(path) or {}).get('last_launched') for name, path in installed.items()}
+        recent = sorted((name for name in installed if last_launched[name]), key=last_launched.get, reverse=True)
+        frequent = sorted((name for name in installed if counts.get(name)), key=counts.get, reverse=True)
+        ordered = []
+        for index in range(max(len(recent), len(frequent))):
+            for names in (recent, frequent):
+                if index < len(names) and names[index] not in ordered:
+                    ordered.append(names[index])
+        return [os.path.dirname(installed[name]) for name in ordered[:limit]]
+    
+    def prewarm(self, limit=None, wait=False):
+        # 在低优先级后台线程中预读常用版本，返回预读的安装目录；wait 为 True 时等待完成（命令行使用）
+        install_dirs = self.warm_candidates(limit or self.config.getint('PREFERENCES', 'WarmStartVersions', fallback=WARM_VERSIONS))
+        thread = self.prewarmer.start(install_dirs)
+        if wait:
+            thread.join()
+        return install_dirs
+    
+    def uninstall(self, name, remover=None):
+        # 先把安装目录改名并从配置中移除（瞬时完成），再并行删除文件；传入 TreeRemover 可以报告进度和取消，
+        # 取消或中断后留下的 .removing 目录由 gc() 清理。返回 {'name', 'path', 'size'}
+        path = self.config['VERSIONS'].get(name)
+        if not path or not os.path.exists(path):
+            raise VersionNotFoundError(_("找不到 {0} 的安装路径。").format(name))
+        install_dir = os.path.dirname(path)
+        removing_dir = mark_removing(install_dir)
+        self.remove_version(name)
+        remover = remover or TreeRemover()
+        freed = remover.remove([removing_dir])
+        if remover.errors:
+            raise remover.errors[0][1]
+        return {'name': name, 'path': install_dir, 'size': freed[removing_dir]}
+    
+    def gc(self, remover=None, include_archives=False):
+        # 清理并报告每一项释放的空间：有断点日志的未完成下载和解压目录、中断的卸载目录、
+        # 没有清单引用的安装缓存对象，移除可执行文件已不存在的版本记录，并按上限淘汰安装缓存和目录缓存；
+        # 下载队列中未完成的任务保留，队列不为空时不清理缓存对象。
+        # 没有断点日志的压缩包（可能是用户自己放进来的）及其未登记的同名安装目录只列为待确认项，include_archives 为 True 时才删除
+        folder_path = self.folder_path
+        queue = read_queue()
+        queued = set()
+        for item in queue:
+            queued.add(item.get('minor_version'))
+            queued.add(install_dir_name(item.get('minor_version', '-')))
+        with self._config_lock:
+            registered = {os.path.normcase(os.path.dirname(path)) for path in self.config['VERSIONS'].values()}
+        
+        targets = {}  # 路径 -> 类别
+        candidates = {}  # 需要用户确认才删除的路径 -> 类别
+        if os.path.isdir(folder_path):
+            for item in os.listdir(folder_path):
+                path = os.path.join(folder_path, item)
+                if item.endswith(REMOVING_SUFFIX):
+                    targets[path] = 'uninstall'
+                elif item.endswith(JOURNAL_SUFFIX) or item.endswith(JOURNAL_SUFFIX + '.tmp'):
+                    target = path[:path.rindex(JOURNAL_SUFFIX)]
+                    if os.path.basename(target) in queued:
+                        continue
+                    kind = 'extract' if os.path.isdir(target) else 'download'
+                    if os.path.lexists(target):
+                        targets[target] = kind
+                    targets[path] = kind
+                elif (os.path.isfile(path) and parse_archive_name(item) and item not in queued
+                        and not os.path.exists(path + JOURNAL_SUFFIX)):
+                    candidates[path] = 'download'
+                    # 压缩包还在时未登记的同名安装目录可能是解压了一半的，也可能是用户自己解压的
+                    extract_path = os.path.join(folder_path, install_dir_name(item))
+                    if (os.path.isdir(extract_path) and os.path.normcase(extract_path) not in registered
+                            and not os.path.exists(extract_path + JOURNAL_SUFFIX)):
+                        candidates[extract_path] = 'extract'
+        for path in list(candidates):
+            if path in targets:
+                del candidates[path]
+            elif include_archives:
+                targets[path] = candidates.pop(path)
+        
+        store = self.create_content_store(folder_path)
+        if store is not None and not queue:
+            for path in store.orphans():
+                targets[path] = 'cache'
+        
+        remover = remover or TreeRemover()
+        freed = remover.remove(list(targets))
+        removed = [{'path': path, 'kind': kind, 'size': freed[path]} for path, kind in targets.items()]
+        sizes = dict.fromkeys(candidates, 0)
+        for _path, size, root in TreeRemover().scan(list(candidates))[0]:
+            sizes[root] += size
+        
+        stale_versions = [name for name, path in self.config['VERSIONS'].items() if not os.path.exists(path)]
+        for name in stale_versions:
+            self.remove_version(name)
+        
+        if store is not None:
+            size = store.evict()
+            if size:
+                removed.append({'path': store.store_dir, 'kind': 'cache', 'size': size})
+        size = self.index_cache.evict()
+        if size:
+            removed.append({'path': self.index_cache.cache_dir, 'kind': 'index', 'size': size})
+        return {
+            'removed': removed,
+            'candidates': [{'path': path, 'kind': kind, 'size': sizes[path]} for path, kind in candidates.items()],
+            'stale_versions': stale_versions,
+            'freed': sum(item['size'] for item in removed),
+            'errors': [f"{path}: {error}" for path, error in remover.errors]
+        }
@@ -0,0 +1,153 @@
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from content_store import link_file
+from downloader import DownloadError, RangeStreamReader
+from extractor import StreamingInstaller, WriterPool, member_target
+from progress import UNIT_FILES
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+requests = lazy_import('requests')
+
+# 常量定义
+CRC_CHUNK_SIZE = 1024 * 1024  # 计算旧版本文件 CRC 时每次读取的大小，zlib.crc32 处理大块数据时会释放 GIL
+MAX_RANGE_GAP = 1024 * 1024  # 两段变化的成员之间未变化的数据不超过此大小时合并为一次 Range 请求，少发请求比少传这些字节更划算
+
+class DeltaInstaller(StreamingInstaller):
+    # 增量更新：读取目标压缩包的中央目录，按大小和 CRC 与已安装的同系列版本逐个比较；未变化的文件从旧版本链接或复制，
+    # 只通过 Range 请求下载并解压变化的成员。不下载完整压缩包，因此不校验整体摘要，只依靠各成员的 CRC
+    def __init__(self, url, dest, base_path, thread_count=4, progress=None, link_mode='hardlink', **kwargs):
+        super(DeltaInstaller, self).__init__(url, dest, thread_count, progress, **kwargs)
+        self.base_path = base_path
+        self.link_mode = link_mode
+        self.reused_bytes = 0  # 从旧版本复用的解压后字节数
+        self.fetched_bytes = 0  # 实际下载的压缩包字节数
+        self._run_start = 0
+    
+    def install(self):
+        self.read_central_directory()
+        self.checksum = self.hasher = None
+        os.makedirs(self.dest, exist_ok=True)
+        self.save_journal()  # 日志存在即表示安装目录尚未完成，取消时据此清理
+        
+        reused, changed = self.compare()
+        self.reuse(reused)
+        self.fetch(changed)
+        if self._cancel_event.is_set():
+            raise DownloadError(_("下载已取消。"))
+        os.remove(self.journal_path)
+        print(_("增量更新：复用 {0} 个文件（{1} MB），下载 {2} 个文件（{3} MB，完整压缩包 {4} MB）").format(
+            len(reused), self.reused_bytes // 1024 // 1024, len(changed), self.fetched_bytes // 1024 // 1024, self.total_size // 1024 // 1024))  # 调试信息
+        return self.dest
+    
+    def compare(self):
+        # 返回 (可复用的 [(成员, 目标路径, 旧版本路径)], 需要下载的成员列表)；大小不同的文件不必计算 CRC
+        candidates = []
+        changed = []
+        for info in self.members:
+            target = member_target(self.dest, info.filename, self.prefix)
+            if target is None:
+                continue
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+                continue
+            base = member_target(self.base_path, info.filename, self.prefix)
+            try:
+                same_size = os.path.isfile(base) and os.path.getsize(base) == info.file_size
+            except OSError:
+                same_size = False
+            if same_size:
+                candidates.append((info, target, base))
+            else:
+                changed.append(info)
+        
+        self.progress.start(sum(info.file_size for info, _target, _base in candidates), message=_("正在比较已安装的文件..."))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            matches = list(executor.map(self.matches, candidates))
+        reused = [item for item, match in zip(candidates, matches) if match]
+        changed.extend(item[0] for item, match in zip(candidates, matches) if not match)
+        changed.sort(key=lambda info: info.header_offset)
+        return reused, changed
+    
+    def matches(self, item):
+        # 在工作线程中计算旧版本文件的 CRC 并与中央目录中的记录比较
+        info, _target, base = item
+        crc = 0
+        try:
+            with open(base, 'rb') as file:
+                while not self._cancel_event.is_set():
+                    data = file.read(CRC_CHUNK_SIZE)
+                    if not data:
+                        break
+                    crc = zlib.crc32(data, crc)
+                    self.progress.add(len(data))
+        except OSError:
+            return False
+        return crc == info.CRC
+    
+    def reuse(self, reused):
+        # 未变化的文件按安装缓存的链接方式从旧版本放到新目录
+        self.progress.start(len(reused), message=_("正在复用未变化的文件..."), unit=UNIT_FILES)
+        for info, target, base in reused:
+            if self._cancel_event.is_set():
+                return
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.lexists(target):
+                os.remove(target)
+            link_file(base, target, self.link_mode)
+            self.reused_bytes += info.file_size
+            self.progress.add(1)
+    
+    def member_ranges(self):
+        # 成员在压缩包中占用的区间 [本地文件头偏移, 下一个成员的偏移)
+        offsets = [info.header_offset for info in self.members] + [self.cd_offset]
+        return {info.header_offset: offsets[index + 1] for index, info in enumerate(self.members)}
+    
+    def plan_runs(self, changed):
+        # 把位置相近的变化成员合并为连续区间，返回 [(起点, 终点, 成员列表)]
+        ends = self.member_ranges()
+        runs = []
+        for info in changed:
+            start, end = info.header_offset, ends[info.header_offset]
+            if runs and start - runs[-1][1] <= MAX_RANGE_GAP:
+                runs[-1][1] = end
+                runs[-1][2].append(info)
+            else:
+                runs.append([start, end, [info]])
+        return runs
+    
+    def fetch(self, changed):
+        # 逐个区间下载并解压变化的成员；网络中断时从当前区间的起点重试
+        runs = self.plan_runs(changed)
+        self.progress.start(sum(end - start for start, end, _members in runs), message=_("正在下载变化的文件..."))
+        for start, end, members in runs:
+            attempt = 1
+            while True:
+                try:
+                    self.fetch_run(start, end, members)
+                    break
+                except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout):
+                    if attempt >= self.max_attempts or self._cancel_event.is_set():
+                        raise
+                    attempt += 1
+                    print(_("下载中断，正在从断点续传（第 {0} 次尝试）").format(attempt))  # 调试信息
+            if self._cancel_event.is_set():
+                return
+            self.fetched_bytes += end - start
+    
+    def fetch_run(self, start, end, members):
+        self._run_start = start
+        with RangeStreamReader(self.url, start, end, self.thread_count, validator=self.validator, mirrors=self.mirrors, limiter=self.limiter) as reader, WriterPool(self.workers) as pool:
+            try:
+                for info in members:
+                    if self._cancel_event.is_set():
+                        return
+                    reader.skip(info.header_offset - reader.position)
+                    self.extract_member(reader, info, pool)
+            finally:
+                pool.wait()
+    
+    def report_progress(self, position):
+        # 进度按已下载的区间字节数计
+        self.progress.set(self.fetched_bytes + position - self._run_start)
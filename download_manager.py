@@ -0,0 +1,325 @@
+import os
+import json
+import time
+import uuid
+import threading
+import progress
+from progress import ProgressCounter
+from downloader import DownloadError
+from mirror_index import CACHE_DIR
+
+# 常量定义
+QUEUE_PATH = os.path.join(CACHE_DIR, "download_queue.json")
+DEFAULT_CONCURRENT_JOBS = 2  # 同时进行的安装任务数
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_PAUSED = 'paused'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING, JOB_PAUSED)
+
+class BandwidthLimiter:
+    # 令牌桶限速器：所有任务的下载线程共享同一个速率上限，rate 为 0 时不限速
+    def __init__(self, rate=0):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = rate
+            self.tokens = min(self.tokens, rate)
+    
+    def consume(self, size):
+        # 取走 size 个字节的额度；额度不足时记为欠账并睡眠到还清为止，最多允许 1 秒的突发
+        with self._lock:
+            if self.rate <= 0:
+                return
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= size
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+class DownloadJob:
+    # 一个安装任务；状态和优先级会写入队列文件，进度只保存在内存中
+    def __init__(self, major_version, minor_version, priority=PRIORITY_NORMAL, job_id=None, state=JOB_QUEUED, created=None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.major_version = major_version
+        self.minor_version = minor_version
+        self.priority = priority
+        self.state = state
+        self.created = created or time.time()
+        self.progress = ProgressCounter()  # 当前步骤的进度，工作线程直接累加
+        self.speed = None  # 发布线程计算的平滑速度（单位/秒）和剩余秒数
+        self.eta = None
+        self.error = None
+        self.exception = None  # 失败时的异常，供命令行区分退出码
+        self.task = None  # 正在运行的下载器或流式安装器，暂停和取消时调用其 cancel()
+        self.stop_requested = False
+        self.active = False  # 工作线程仍在运行（暂停后线程可能尚未退出）
+        self._lock = threading.Lock()
+    
+    @property
+    def done(self):
+        return self.progress.done
+    
+    @property
+    def total(self):
+        return self.progress.total
+    
+    @property
+    def message(self):
+        return self.progress.message
+    
+    def update(self, done, total, message=None):
+        # 切换步骤时调用；步骤内的进度由工作线程通过 progress.add() 累加
+        self.progress.start(total, done, message)
+    
+    def publish(self, snapshot):
+        self.speed = snapshot.speed
+        self.eta = snapshot.eta
+    
+    def set_task(self, task):
+        # 登记当前可取消的步骤；登记前已请求停止时立即取消
+        with self._lock:
+            self.task = task
+            stop = self.stop_requested
+        if stop and task is not None:
+            task.cancel()
+    
+    def request_stop(self):
+        with self._lock:
+            self.stop_requested = True
+            task = self.task
+        if task is not None:
+            task.cancel()
+    
+    def check_stopped(self):
+        # 在不可中断的步骤之间检查是否已请求暂停或取消
+        if self.stop_requested:
+            raise DownloadError(_("下载已取消。"))
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'major_version': self.major_version,
+            'minor_version': self.minor_version,
+            'priority': self.priority,
+            'state': self.state,
+            'created': self.created
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['major_version'], data['minor_version'], int(data.get('priority', PRIORITY_NORMAL)),
+                   data['id'], data.get('state', JOB_QUEUED), data.get('created'))
+
+def read_queue(queue_path=QUEUE_PATH):
+    # 读取队列文件中未完成的任务（字典列表），文件不存在或损坏时返回空列表
+    try:
+        with open(queue_path, 'r', encoding='utf-8') as file:
+            items = json.load(file)
+    except (OSError, ValueError):
+        return []
+    return [item for item in items if isinstance(item, dict) and item.get('state') in ACTIVE_STATES]
+
+class DownloadManager:
+    # 安装任务队列：持久化到磁盘（queue_path 为 None 时只在内存中），按优先级调度，限制同时运行的任务数，所有任务共享一个限速器
+    def __init__(self, runner, cleanup=None, queue_path=QUEUE_PATH, concurrency=DEFAULT_CONCURRENT_JOBS, bandwidth=0):
+        self.runner = runner  # runner(job, limiter) 执行安装，出错时抛出异常
+        self.cleanup = cleanup  # cleanup(job) 删除已取消任务留下的文件
+        self.queue_path = queue_path
+        self.concurrency = max(1, int(concurrency))
+        self.limiter = BandwidthLimiter(bandwidth)
+        self.jobs = []
+        self._listeners = []
+        self._closing = False
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+    
+    def add_listener(self, callback):
+        # callback(job) 在任务状态变化时从工作线程调用
+        self._listeners.append(callback)
+    
+    def notify(self, job):
+        for callback in list(self._listeners):
+            callback(job)
+    
+    def load(self):
+        # 恢复上次未完成的任务：运行中的任务重新排队并从断点续传，已暂停的保持暂停
+        items = read_queue(self.queue_path) if self.queue_path else []
+        with self._lock:
+            for item in items:
+                try:
+                    job = DownloadJob.from_dict(item)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if job.state not in ACTIVE_STATES or self.find(job.id):
+                    continue
+                if job.state == JOB_RUNNING:
+                    job.state = JOB_QUEUED
+                self.jobs.append(job)
+        self.schedule()
+    
+    def save(self):
+        # 只保存未完成的任务，先写临时文件再替换；界面线程和工作线程都会保存，串行写入避免共用临时文件
+        if not self.queue_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                items = [job.to_dict() for job in self.jobs if job.state in ACTIVE_STATES]
+            os.makedirs(os.path.dirname(self.queue_path), exist_ok=True)
+            temp_path = self.queue_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(items, file)
+            os.replace(temp_path, self.queue_path)
+    
+    def find(self, job_id):
+        with self._lock:
+            for job in self.jobs:
+                if job.id == job_id:
+                    return job
+        return None
+    
+    def snapshot(self):
+        with self._lock:
+            return list(self.jobs)
+    
+    def add(self, major_version, minor_version, priority=PRIORITY_NORMAL):
+        # 加入队列；同一版本已在队列中时返回已有任务
+        with self._lock:
+            for job in self.jobs:
+                if job.minor_version == minor_version and job.state in ACTIVE_STATES:
+                    return job
+            job = DownloadJob(major_version, minor_version, priority)
+            self.jobs.append(job)
+        self.changed(job)
+        return job
+    
+    def changed(self, job):
+        self.save()
+        self.notify(job)
+        self.schedule()
+        with self._changed:
+            self._changed.notify_all()
+    
+    def wait(self, timeout=None):
+        # 等待排队和运行中的任务全部结束（已暂停的任务不计），超时返回 False
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: not any(job.state in (JOB_QUEUED, JOB_RUNNING) or job.active for job in self.jobs), timeout)
+    
+    def pause(self, job_id):
+        # 暂停任务：运行中的任务停止下载，断点日志保留，恢复时从断点续传
+        job = self.find(job_id)
+        if job is None or job.state not in (JOB_QUEUED, JOB_RUNNING):
+            return
+        with self._lock:
+            running = job.state == JOB_RUNNING
+            job.state = JOB_PAUSED
+        if running:
+            job.request_stop()
+        self.changed(job)
+    
+    def resume(self, job_id):
+        # 恢复已暂停的任务或重试失败的任务
+        job = self.find(job_id)
+        if job is None or job.state not in (JOB_PAUSED, JOB_FAILED):
+            return
+        with self._lock:
+            job.state = JOB_QUEUED
+            job.error = None
+        self.changed(job)
+    
+    def cancel(self, job_id):
+        # 取消任务并删除未完成的文件；运行中的任务在其线程退出后清理
+        job = self.find(job_id)
+        if job is None or job.state not in ACTIVE_STATES + (JOB_FAILED,):
+            return
+        with self._lock:
+            running = job.active
+            job.state = JOB_CANCELLED
+        if running:
+            job.request_stop()
+        elif self.cleanup:
+            self.cleanup(job)
+        self.changed(job)
+    
+    def set_priority(self, job_id, priority):
+        job = self.find(job_id)
+        if job is not None:
+            job.priority = priority
+            self.changed(job)
+    
+    def remove_finished(self):
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job.state in ACTIVE_STATES]
+    
+    def set_concurrency(self, concurrency):
+        self.concurrency = max(1, int(concurrency))
+        self.schedule()
+    
+    def set_bandwidth(self, rate):
+        self.limiter.set_rate(rate)
+    
+    def schedule(self):
+        # 有空闲名额时按优先级（同级按加入顺序）启动排队中的任务
+        with self._lock:
+            if self._closing:
+                return
+            running = sum(1 for job in self.jobs if job.state == JOB_RUNNING)
+            queued = sorted((job for job in self.jobs if job.state == JOB_QUEUED and not job.active), key=lambda job: (job.priority, job.created))
+            started = queued[:max(0, self.concurrency - running)]
+            for job in started:
+                job.state = JOB_RUNNING
+                job.active = True
+                job.stop_requested = False
+                job.error = None
+                job.exception = None
+        for job in started:
+            threading.Thread(target=self.run, args=(job,), daemon=True).start()
+            self.notify(job)
+        if started:
+            self.save()
+    
+    def run(self, job):
+        progress.subscribe(job.progress, job.publish)
+        try:
+            self.runner(job, self.limiter)
+            with self._lock:
+                # 暂停请求到达时安装可能已经完成
+                if job.state != JOB_CANCELLED:
+                    job.state = JOB_DONE
+        except Exception as e:
+            with self._lock:
+                if job.state == JOB_RUNNING:
+                    job.state = JOB_FAILED
+                    job.error = str(e)
+                    job.exception = e
+            if job.state == JOB_CANCELLED and self.cleanup:
+                self.cleanup(job)
+        finally:
+            progress.unsubscribe(job.progress)
+            job.set_task(None)
+            job.active = False
+        self.changed(job)
+    
+    def shutdown(self):
+        # 退出程序时停止运行中的任务并重新排队，下次启动后自动续传
+        with self._lock:
+            self._closing = True
+            running = [job for job in self.jobs if job.state == JOB_RUNNING]
+            for job in running:
+                job.state = JOB_QUEUED
+        for job in running:
+            job.request_stop()
+        self.save()
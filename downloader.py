@@ -0,0 +1,500 @@
+import os
+import json
+import threading
+import collections
+import http_client
+from concurrent.futures import ThreadPoolExecutor
+from checksums import IncrementalHasher, file_checksum, corrupt_zip_ranges
+from progress import ProgressCounter
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+zipfile = lazy_import('zipfile')
+requests = lazy_import('requests')
+
+# 常量定义
+BLOCK_SIZE = 256 * 1024  # 每次从连接读取并写入磁盘的数据块大小；块越大每字节的循环开销越小，但暂停和限速的粒度越粗
+MIN_SEGMENT_SIZE = 1024 * 1024  # 单个分段的最小字节数，避免小文件开过多连接
+JOURNAL_SUFFIX = '.vmtpart'  # 断点续传日志文件后缀
+JOURNAL_INTERVAL = 4 * 1024 * 1024  # 每下载多少字节记录一次断点
+MAX_ATTEMPTS = 3  # 网络中断后自动续传的最大尝试次数
+STREAM_BLOCK_SIZE = 4 * 1024 * 1024  # 流式读取时每个预取块的大小
+
+class DownloadError(Exception):
+    pass
+
+class RangeNotSupportedError(DownloadError):
+    pass
+
+class ChecksumError(DownloadError):
+    pass
+
+class DownloadJournal:
+    # 断点续传日志：记录 URL、ETag/Last-Modified、文件总大小和已完成的字节区间
+    def __init__(self, path):
+        self.path = path
+        self.url = None
+        self.etag = None
+        self.last_modified = None
+        self.total_size = 0
+        self.completed = []  # 已合并的 [start, end) 区间列表
+    
+    def load(self):
+        # 读取日志文件，损坏或不存在时返回 False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            self.url = data['url']
+            self.etag = data.get('etag')
+            self.last_modified = data.get('last_modified')
+            self.total_size = int(data['total_size'])
+            self.completed = [[int(start), int(end)] for start, end in data['completed']]
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+    
+    def matches(self, url, etag, last_modified, total_size):
+        # 远端文件未变化时才允许续传
+        if self.url != url or self.total_size != total_size:
+            return False
+        if etag or self.etag:
+            return self.etag == etag
+        return bool(last_modified) and self.last_modified == last_modified
+    
+    def reset(self, url, etag, last_modified, total_size):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.total_size = total_size
+        self.completed = []
+    
+    def add_range(self, start, end):
+        # 合并新完成的 [start, end) 区间
+        if end <= start:
+            return
+        merged = []
+        for current in sorted(self.completed + [[start, end]]):
+            if merged and current[0] <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], current[1])
+            else:
+                merged.append(list(current))
+        self.completed = merged
+    
+    def completed_size(self):
+        return sum(end - start for start, end in self.completed)
+    
+    def missing_ranges(self):
+        # 返回尚未下载的 [start, end) 区间
+        missing = []
+        position = 0
+        for start, end in self.completed:
+            if start > position:
+                missing.append((position, start))
+            position = max(position, end)
+        if position < self.total_size:
+            missing.append((position, self.total_size))
+        return missing
+    
+    def save(self):
+        # 先写临时文件再替换，避免崩溃时留下半截日志
+        data = {
+            'url': self.url,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'total_size': self.total_size,
+            'completed': self.completed
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.path)
+    
+    def remove(self):
+        for path in (self.path, self.path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+
+class SegmentedDownloader:
+    def __init__(self, url, file_path, thread_count=4, progress=None, resume=True, max_attempts=MAX_ATTEMPTS, mirrors=None, standby_mirrors=None, checksum=None, limiter=None):
+        self.url = url
+        self.mirrors = [url] + [mirror for mirror in mirrors or [] if mirror != url]  # 并行分担分段的镜像
+        self.standby_mirrors = [mirror for mirror in standby_mirrors or [] if mirror not in self.mirrors]  # 仅用于故障转移
+        self.urls = list(self.mirrors)
+        self.failed_urls = set()
+        self.probe_url = url
+        self.file_path = file_path
+        self.thread_count = max(1, int(thread_count))
+        self.progress = progress or ProgressCounter()  # 已下载字节数
+        self.resume = resume
+        self.max_attempts = max(1, int(max_attempts))
+        self.journal = DownloadJournal(file_path + JOURNAL_SUFFIX)
+        self.checksum = checksum  # 镜像发布的 (算法, 摘要)，为 None 时只校验文件大小
+        self.hasher = None
+        self.limiter = limiter  # 多个任务共享的限速器
+        
+        self.total_size = 0
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()  # 用户取消
+        self._stop_event = threading.Event()  # 通知各分段线程停止
+    
+    @property
+    def downloaded_size(self):
+        return self.progress.done
+    
+    def cancel(self):
+        # 取消正在进行的下载
+        self._cancel_event.set()
+        self._stop_event.set()
+    
+    def download(self):
+        # 下载文件；启用续传时网络中断会从断点自动重试
+        attempt = 1
+        while True:
+            try:
+                return self.try_download()
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout):
+                if not self.resume or attempt >= self.max_attempts or self._cancel_event.is_set():
+                    raise
+                attempt += 1
+                print(_("下载中断，正在从断点续传（第 {0} 次尝试）").format(attempt))  # 调试信息
+    
+    def try_download(self):
+        # 探测服务器是否支持 Range 请求，支持则分段并行下载，否则退回单连接下载
+        if not self._cancel_event.is_set():
+            self._stop_event.clear()
+        self.urls = list(self.mirrors)
+        self.failed_urls = set()
+        response = self.probe()
+        total_size = self.parse_content_range(response.headers.get('content-range'))
+        
+        if response.status_code == 206 and total_size:
+            response.close()
+            self.total_size = total_size
+            self.prepare_journal(response.headers.get('etag'), response.headers.get('last-modified'))
+            self.progress.start(total_size, self.journal.completed_size())
+            self.create_hasher()
+            if self.hasher:
+                for start, end in self.journal.completed:
+                    self.hasher.mark_written(start, end)
+            self.download_segments(self.split_segments(self.journal.missing_ranges()))
+        else:
+            self.journal.remove()
+            self.total_size = int(response.headers.get('content-length', 0))
+            self.progress.start(self.total_size)
+            self.create_hasher()
+            self.download_single(response)
+        
+        if self._cancel_event.is_set():
+            raise DownloadError(_("下载已取消。"))
+        if self.downloaded_size != self.total_size:
+            raise DownloadError(_("下载不完整，文件大小不匹配。"))
+        self.verify_checksum(ranged=response.status_code == 206)
+        self.journal.remove()
+        return self.file_path
+    
+    def create_hasher(self):
+        # 下载过程中边写入边计算摘要
+        self.hasher = IncrementalHasher(self.file_path, self.checksum[0]) if self.checksum else None
+    
+    def verify_checksum(self, ranged):
+        # 与镜像发布的摘要比对；不一致时按 ZIP 成员 CRC 找出损坏的区间，只重新下载这些分段
+        if not self.checksum or self.hasher.hexdigest() == self.checksum[1]:
+            return
+        if not ranged:
+            raise ChecksumError(_("文件校验失败，下载的数据已损坏。"))
+        ranges = corrupt_zip_ranges(self.file_path) if zipfile.is_zipfile(self.file_path) else None
+        if ranges is None:
+            ranges = [(0, self.total_size)]
+        print(_("校验失败，重新下载 {0} 个损坏的区间（{1:.2f} MB）").format(len(ranges), sum(end - start for start, end in ranges) / 1024 / 1024))  # 调试信息
+        
+        self.hasher = None
+        self.journal.reset(self.journal.url, self.journal.etag, self.journal.last_modified, self.total_size)
+        position = 0
+        for start, end in sorted(ranges):
+            self.journal.add_range(position, start)
+            position = max(position, end)
+        self.journal.add_range(position, self.total_size)
+        if self.resume:
+            self.journal.save()
+        self.progress.start(self.total_size, self.journal.completed_size())
+        self.download_segments(self.split_segments(self.journal.missing_ranges()))
+        
+        if self._cancel_event.is_set():
+            raise DownloadError(_("下载已取消。"))
+        if self.downloaded_size != self.total_size or file_checksum(self.file_path, self.checksum[0]) != self.checksum[1]:
+            raise ChecksumError(_("文件校验失败，下载的数据已损坏。"))
+    
+    def probe(self):
+        # 依次尝试各镜像，返回第一个可用镜像对 Range 探测请求的响应
+        candidates = self.urls + self.standby_mirrors
+        for url in candidates:
+            try:
+                response = http_client.get(url, headers={'Range': 'bytes=0-0'}, stream=True)
+                response.raise_for_status()
+                self.probe_url = url
+                return response
+            except requests.exceptions.RequestException as e:
+                if url == candidates[-1]:
+                    raise
+                self.mark_failed(url)
+                print(_("镜像 {0} 不可用，切换到下一个镜像：{1}").format(url, e))  # 调试信息
+    
+    def healthy_urls(self):
+        with self._lock:
+            return [url for url in self.urls if url not in self.failed_urls]
+    
+    def mark_failed(self, url):
+        # 标记镜像失败并启用一个备用镜像；仍有其他可用镜像时返回 True
+        with self._lock:
+            if url not in self.failed_urls:
+                self.failed_urls.add(url)
+                for standby in self.standby_mirrors:
+                    if standby not in self.urls and standby not in self.failed_urls:
+                        self.urls.append(standby)
+                        break
+            return any(item not in self.failed_urls for item in self.urls)
+    
+    def prepare_journal(self, etag, last_modified):
+        # 日志与远端文件一致且本地文件完好时续传，否则重新预分配文件
+        journal = self.journal
+        if (self.resume and journal.load()
+                and journal.matches(self.url, etag, last_modified, self.total_size)
+                and os.path.exists(self.file_path)
+                and os.path.getsize(self.file_path) == self.total_size):
+            print(_("从断点续传：已完成 {0:.2f} MB").format(journal.completed_size() / 1024 / 1024))  # 调试信息
+            return
+        
+        journal.reset(self.url, etag, last_modified, self.total_size)
+        with open(self.file_path, 'wb') as file:
+            file.truncate(self.total_size)
+        if self.resume:
+            journal.save()
+    
+    def split_segments(self, ranges):
+        # 将待下载区间拆分到线程数，每段不小于 MIN_SEGMENT_SIZE
+        segments = [tuple(item) for item in ranges]
+        while segments and len(segments) < self.thread_count:
+            largest = max(segments, key=lambda item: item[1] - item[0])
+            start, end = largest
+            if end - start < 2 * MIN_SEGMENT_SIZE:
+                break
+            middle = start + (end - start) // 2
+            index = segments.index(largest)
+            segments[index:index + 1] = [(start, middle), (middle, end)]
+        return segments
+    
+    def download_segments(self, segments):
+        # 由线程池并行下载各分段
+        if not segments:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.thread_count, len(segments))) as executor:
+            futures = [executor.submit(self.download_segment, start, end, index) for index, (start, end) in enumerate(segments)]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                self._stop_event.set()
+                raise
+            finally:
+                if self.resume:
+                    with self._lock:
+                        self.journal.save()
+    
+    def download_segment(self, start, end, index=0):
+        # 下载 [start, end) 分段；各分段轮流分配到不同镜像，镜像出错或卡住时从断开处切换到下一个镜像继续
+        position = [start]
+        while position[0] < end:
+            healthy_urls = self.healthy_urls() or [self.probe_url]
+            url = healthy_urls[index % len(healthy_urls)]
+            try:
+                self.fetch_segment(url, position, end)
+                if self._stop_event.is_set():
+                    return
+            except (requests.exceptions.RequestException, DownloadError) as e:
+                # 镜像返回的分段不完整（DownloadError）也换下一个镜像；已取消或暂停时直接退出，由 try_download 报告取消
+                if self._stop_event.is_set():
+                    return
+                if url == self.probe_url and isinstance(e, RangeNotSupportedError):
+                    self.journal.remove()
+                    raise
+                if not self.mark_failed(url):
+                    raise
+                print(_("镜像 {0} 下载失败，切换到下一个镜像：{1}").format(url, e))  # 调试信息
+    
+    def fetch_segment(self, url, position, end):
+        # 从指定镜像下载 [position[0], end) 并写入文件，position[0] 随写入推进，定期记录断点
+        start = position[0]
+        headers = {'Range': f'bytes={start}-{end - 1}'}
+        validator = self.journal.etag or self.journal.last_modified
+        if validator and url == self.probe_url:
+            headers['If-Range'] = validator
+        response = http_client.get(url, headers=headers, stream=True)
+        response.raise_for_status()
+        if response.status_code != 206 or self.parse_content_range(response.headers.get('content-range')) != self.total_size:
+            response.close()
+            raise RangeNotSupportedError(_("服务器未按分段返回数据。"))
+        
+        committed = start
+        with response, open(self.file_path, 'r+b') as file:
+            file.seek(start)
+            try:
+                for data in response.iter_content(BLOCK_SIZE):
+                    if self._stop_event.is_set():
+                        return
+                    if self.limiter:
+                        self.limiter.consume(len(data))
+                    data = data[:end - position[0]]
+                    file.write(data)
+                    if self.hasher:
+                        # 先落盘再登记，其他线程补读时才能读到这段数据
+                        file.flush()
+                        self.hasher.update(position[0], data)
+                    position[0] += len(data)
+                    self.progress.add(len(data))
+                    if self.resume and position[0] - committed >= JOURNAL_INTERVAL:
+                        file.flush()
+                        self.commit_range(committed, position[0])
+                        committed = position[0]
+                    if position[0] >= end:
+                        break
+            finally:
+                if self.resume and position[0] > committed:
+                    file.flush()
+                    self.commit_range(committed, position[0], save=False)
+        
+        if position[0] != end:
+            raise DownloadError(_("下载不完整，文件大小不匹配。"))
+    
+    def commit_range(self, start, end, save=True):
+        # 记录已写入磁盘的区间
+        with self._lock:
+            self.journal.add_range(start, end)
+            if save:
+                self.journal.save()
+    
+    def download_single(self, response):
+        # 单连接顺序下载（服务器不支持 Range 时使用）
+        with response, open(self.file_path, 'wb') as file:
+            for data in response.iter_content(BLOCK_SIZE):
+                if self._stop_event.is_set():
+                    return
+                if self.limiter:
+                    self.limiter.consume(len(data))
+                if self.hasher:
+                    self.hasher.update(file.tell(), data)
+                file.write(data)
+                self.progress.add(len(data))
+        
+        if not self.total_size:
+            self.total_size = self.progress.total = self.downloaded_size
+    
+    @staticmethod
+    def parse_content_range(content_range):
+        # 解析 "bytes 0-0/12345" 格式，返回文件总大小
+        if not content_range or '/' not in content_range:
+            return 0
+        total = content_range.rsplit('/', 1)[1].strip()
+        return int(total) if total.isdigit() else 0
+
+def fetch_range(url, start, end, validator=None, limiter=None):
+    # 下载 [start, end) 区间并返回其内容
+    headers = {'Range': f'bytes={start}-{end - 1}'}
+    if validator:
+        headers['If-Range'] = validator
+    response = http_client.get(url, headers=headers, stream=True)
+    with response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise RangeNotSupportedError(_("服务器未按分段返回数据。"))
+        parts = []
+        for data in response.iter_content(BLOCK_SIZE):
+            if limiter:
+                limiter.consume(len(data))
+            parts.append(data)
+    content = b''.join(parts)
+    if len(content) != end - start:
+        raise DownloadError(_("下载不完整，文件大小不匹配。"))
+    return content
+
+class RangeStreamReader:
+    # 按顺序读取远端文件的 [start, end) 区间；后台并行预取数据块，内存占用不超过 (线程数 + 1) 个块
+    def __init__(self, url, start, end, thread_count=4, block_size=STREAM_BLOCK_SIZE, validator=None, mirrors=None, hasher=None, limiter=None):
+        self.url = url
+        self.limiter = limiter
+        self.hasher = hasher  # 按顺序读出的数据同时送入摘要计算
+        self.urls = [url] + [mirror for mirror in mirrors or [] if mirror != url]
+        self.failed_urls = set()
+        self._block_index = 0
+        self.position = start
+        self.end = end
+        self.block_size = block_size
+        self.validator = validator
+        self.thread_count = max(1, int(thread_count))
+        
+        self._next_offset = start
+        self._pending = collections.deque()
+        self._buffer = memoryview(b'')
+        self._executor = ThreadPoolExecutor(max_workers=self.thread_count)
+        for _index in range(self.thread_count):
+            self.schedule_block()
+    
+    def schedule_block(self):
+        # 提交下一个待预取的数据块
+        if self._next_offset >= self.end:
+            return
+        block_end = min(self._next_offset + self.block_size, self.end)
+        self._pending.append(self._executor.submit(self.fetch_block, self._next_offset, block_end, self._block_index))
+        self._next_offset = block_end
+        self._block_index += 1
+    
+    def fetch_block(self, start, end, index):
+        # 数据块轮流从各镜像获取，失败时换下一个镜像重试
+        while True:
+            urls = [url for url in self.urls if url not in self.failed_urls] or [self.url]
+            url = urls[index % len(urls)]
+            try:
+                return fetch_range(url, start, end, self.validator if url == self.url else None, self.limiter)
+            except (requests.exceptions.RequestException, DownloadError):
+                if len(urls) <= 1:
+                    raise
+                self.failed_urls.add(url)
+    
+    def read(self, size):
+        # 读取最多 size 字节，仅在到达区间末尾时返回更少的数据
+        parts = []
+        remaining = size
+        while remaining > 0:
+            if not self._buffer:
+                if not self._pending:
+                    break
+                self._buffer = memoryview(self._pending.popleft().result())
+                self.schedule_block()
+            part = self._buffer[:remaining]
+            self._buffer = self._buffer[len(part):]
+            parts.append(part)
+            remaining -= len(part)
+        data = b''.join(parts)
+        self.position += len(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        return data
+    
+    def skip(self, size):
+        # 跳过 size 字节
+        while size > 0:
+            data = self.read(min(size, self.block_size))
+            if not data:
+                break
+            size -= len(data)
+    
+    def close(self):
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
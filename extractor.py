@@ -0,0 +1,537 @@
+import os
+import io
+import bz2
+import json
+import lzma
+import zlib
+import hashlib
+import shutil
+import struct
+import heapq
+import threading
+import http_client
+from concurrent.futures import ThreadPoolExecutor
+from progress import ProgressCounter
+from downloader import DownloadError, RangeNotSupportedError, ChecksumError, RangeStreamReader, SegmentedDownloader, JOURNAL_SUFFIX, JOURNAL_INTERVAL, MAX_ATTEMPTS
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+tarfile = lazy_import('tarfile')
+zipfile = lazy_import('zipfile')
+requests = lazy_import('requests')
+
+# 常量定义
+EOCD_SEARCH_SIZE = 65536 + 22  # 中央目录结束记录（含最长注释）可能占用的尾部字节数
+WRITE_CHUNK_SIZE = 1024 * 1024  # 解压时每次处理的压缩数据大小
+SMALL_MEMBER_SIZE = 8 * 1024 * 1024  # 不超过此大小的成员整体读入内存后交给写入线程池
+MAX_PENDING_BYTES = 64 * 1024 * 1024  # 写入线程池中在途数据的上限
+LOCAL_HEADER_FORMAT = '<4s5H3L2H'
+LOCAL_HEADER_SIZE = struct.calcsize(LOCAL_HEADER_FORMAT)
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+EOCD_FORMAT = '<4s4H2LH'
+EOCD_SIZE = struct.calcsize(EOCD_FORMAT)
+EOCD_SIGNATURE = b'PK\x05\x06'
+ZIP64_LOCATOR_FORMAT = '<4sLQL'
+ZIP64_LOCATOR_SIZE = struct.calcsize(ZIP64_LOCATOR_FORMAT)
+ZIP64_EOCD_FORMAT = '<4sQ2H2L4Q'
+ZIP64_EOCD_SIZE = struct.calcsize(ZIP64_EOCD_FORMAT)
+
+class TailFile(io.RawIOBase):
+    # 只包含文件尾部数据的只读文件对象，偏移量与完整文件一致，供 zipfile 解析中央目录
+    def __init__(self, data, base, total_size):
+        self.data = data
+        self.base = base
+        self.total_size = total_size
+        self.offset = 0
+    
+    def seekable(self):
+        return True
+    
+    def readable(self):
+        return True
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.offset
+        elif whence == io.SEEK_END:
+            offset += self.total_size
+        self.offset = offset
+        return self.offset
+    
+    def tell(self):
+        return self.offset
+    
+    def read(self, size=-1):
+        if self.offset < self.base:
+            raise zipfile.BadZipFile(_("无法读取 ZIP 中央目录。"))
+        start = self.offset - self.base
+        end = len(self.data) if size is None or size < 0 else start + size
+        data = self.data[start:end]
+        self.offset += len(data)
+        return data
+
+def archive_prefix(names):
+    # 所有成员都位于同一个顶层文件夹时返回该文件夹前缀（如 "blender-4.2.3-windows-x64/"）
+    prefix = None
+    for name in names:
+        head, separator, _tail = name.partition('/')
+        if not separator:
+            return ''
+        if prefix is None:
+            prefix = head
+        elif head != prefix:
+            return ''
+    return prefix + '/' if prefix else ''
+
+def member_target(dest, name, prefix):
+    # 去掉顶层文件夹前缀后计算成员的目标路径，拒绝越出目标目录的路径
+    if prefix and (name + '/').startswith(prefix):
+        name = name[len(prefix):]
+    parts = [part for part in name.replace('\\', '/').split('/') if part and part != '.']
+    if not parts:
+        return None
+    if '..' in parts or os.path.isabs(name) or ':' in parts[0]:
+        raise zipfile.BadZipFile(_("压缩包中包含非法路径：{0}").format(name))
+    return os.path.join(dest, *parts)
+
+def apply_permissions(info, target):
+    # 还原 Unix 系统下打包的可执行权限
+    if info.create_system == 3:
+        mode = (info.external_attr >> 16) & 0o777
+        if mode:
+            os.chmod(target, mode)
+
+def default_workers():
+    return os.cpu_count() or 4
+
+class WriterPool:
+    # 有界并行写入线程池：限制在途数据量，任务异常在 wait() 时抛出
+    def __init__(self, workers=None, max_pending_bytes=MAX_PENDING_BYTES):
+        self.max_pending_bytes = max_pending_bytes
+        self.pending_bytes = 0
+        self.futures = []
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers or default_workers())
+    
+    def submit(self, size, function, *args):
+        # 在途数据超过上限时阻塞，直到有任务完成
+        with self._condition:
+            while self.pending_bytes and self.pending_bytes + size > self.max_pending_bytes:
+                self._condition.wait()
+            self.pending_bytes += size
+        self.futures = [future for future in self.futures if not future.done() or future.exception()]
+        self.futures.append(self._executor.submit(self.run, size, function, args))
+    
+    def run(self, size, function, args):
+        try:
+            function(*args)
+        finally:
+            with self._condition:
+                self.pending_bytes -= size
+                self._condition.notify_all()
+    
+    def wait(self):
+        # 等待全部任务完成并抛出其中的第一个异常
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            self.shutdown()
+
+def shard_members(items, count, key):
+    # 按压缩大小贪心分片（最大者优先放入当前负载最小的分片），使各线程工作量接近
+    count = max(1, min(count, len(items)))
+    shards = [[] for _index in range(count)]
+    loads = [(0, index) for index in range(count)]
+    for item in sorted(items, key=key, reverse=True):
+        load, index = heapq.heappop(loads)
+        shards[index].append(item)
+        heapq.heappush(loads, (load + key(item) + 1, index))
+    return shards
+
+def extract_archive(archive_path, dest, workers=None, progress=None):
+    # 按文件类型选择 ZIP 或 tar（.tar.xz/.tar.gz/.tar.bz2）解压方式；progress 为 ProgressCounter
+    if zipfile.is_zipfile(archive_path):
+        extract_zip(archive_path, dest, workers, progress)
+    elif tarfile.is_tarfile(archive_path):
+        extract_tar(archive_path, dest, workers, progress)
+    else:
+        raise zipfile.BadZipFile(_("下载的文件不是有效的 ZIP 文件。"))
+
+def extract_zip(zip_path, dest, workers=None, progress=None):
+    # 多线程并行解压本地 ZIP，写入时直接去掉顶层文件夹前缀，无需再移动文件；进度按解压后的字节数计
+    workers = workers or default_workers()
+    with zipfile.ZipFile(zip_path, 'r') as z:
+        infos = z.infolist()
+    prefix = archive_prefix([info.filename for info in infos])
+    
+    files = []
+    directories = set()
+    for info in infos:
+        target = member_target(dest, info.filename, prefix)
+        if target is None:
+            continue
+        if info.is_dir():
+            directories.add(target)
+        else:
+            directories.add(os.path.dirname(target))
+            files.append((info, target))
+    for directory in sorted(directories):
+        os.makedirs(directory, exist_ok=True)
+    
+    progress = progress or ProgressCounter()
+    progress.start(sum(info.file_size for info, _target in files))
+    stop_event = threading.Event()
+    shards = shard_members(files, workers, key=lambda item: item[0].compress_size)
+    with ThreadPoolExecutor(max_workers=max(1, len(shards))) as executor:
+        futures = [executor.submit(extract_zip_shard, zip_path, shard, progress, stop_event) for shard in shards]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            stop_event.set()
+            raise
+
+def extract_zip_shard(zip_path, shard, progress, stop_event):
+    # 每个线程使用独立的 ZipFile 句柄，zlib 解压时会释放 GIL，可充分利用多核
+    with zipfile.ZipFile(zip_path, 'r') as z:
+        for info, target in shard:
+            if stop_event.is_set():
+                return
+            with z.open(info) as source, open(target, 'wb') as file:
+                shutil.copyfileobj(source, file, WRITE_CHUNK_SIZE)
+            apply_permissions(info, target)
+            progress.add(info.file_size)
+
+def write_file(target, data, mode=None):
+    with open(target, 'wb') as file:
+        file.write(data)
+    if mode:
+        os.chmod(target, mode)
+
+def tar_member_name(name):
+    # GNU tar 用 "tar -C dir ." 打包时成员名和硬链接目标都带 "./" 前缀
+    while name.startswith('./'):
+        name = name[2:]
+    return '' if name == '.' else name
+
+def extract_tar(tar_path, dest, workers=None, progress=None):
+    # 流式解压 tar 包：xz/gz 流只能单线程顺序解压，文件写入交给线程池并行完成；进度按已读取的压缩包字节数计
+    progress = progress or ProgressCounter()
+    progress.start(os.path.getsize(tar_path))
+    prefix = None
+    with open(tar_path, 'rb') as raw, tarfile.open(fileobj=raw, mode='r|*') as tar, WriterPool(workers) as pool:
+        for member in tar:
+            name = tar_member_name(member.name)
+            if not name:
+                # 代表压缩包根目录的 "./" 成员，不参与顶层文件夹的判断
+                continue
+            if prefix is None:
+                # 流式读取无法预先列出全部成员，以第一个成员的顶层文件夹作为前缀
+                head = name.split('/', 1)[0]
+                prefix = head + '/' if member.isdir() or '/' in name else ''
+            target = member_target(dest, name, prefix)
+            if target is None:
+                continue
+            
+            if member.isdir():
+                os.makedirs(target, exist_ok=True)
+            elif member.isfile():
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                source = tar.extractfile(member)
+                if member.size <= SMALL_MEMBER_SIZE:
+                    pool.submit(member.size, write_file, target, source.read(), member.mode & 0o777)
+                else:
+                    with open(target, 'wb') as file:
+                        shutil.copyfileobj(source, file, WRITE_CHUNK_SIZE)
+                    os.chmod(target, member.mode & 0o777)
+            elif member.issym() or member.islnk():
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                pool.wait()
+                extract_tar_link(dest, prefix, member, target)
+            
+            progress.set(raw.tell())
+
+def extract_tar_link(dest, prefix, member, target):
+    # 还原符号链接与硬链接，拒绝指向目标目录之外的链接
+    if os.path.lexists(target):
+        os.remove(target)
+    if member.issym():
+        resolved = os.path.normpath(os.path.join(os.path.dirname(target), member.linkname))
+        if os.path.isabs(member.linkname) or not resolved.startswith(os.path.normpath(dest) + os.sep):
+            raise tarfile.TarError(_("压缩包中包含非法路径：{0}").format(member.linkname))
+        try:
+            os.symlink(member.linkname, target)
+        except OSError:
+            if os.path.isfile(resolved):
+                shutil.copy2(resolved, target)
+    else:
+        # 硬链接目标与成员名一样去掉 "./" 和顶层文件夹前缀，否则指向的路径不存在
+        source = member_target(dest, tar_member_name(member.linkname), prefix)
+        if source is None or not os.path.isfile(source):
+            raise tarfile.TarError(_("压缩包中包含非法路径：{0}").format(member.linkname))
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+def make_decompressor(info):
+    # 根据压缩方式创建增量解压器，存储方式返回 None
+    if info.compress_type == zipfile.ZIP_STORED:
+        return None
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.decompressobj(-15)
+    if info.compress_type == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Decompressor()
+    if info.compress_type == zipfile.ZIP_LZMA:
+        return zipfile.LZMADecompressor()
+    raise zipfile.BadZipFile(_("不支持的压缩方式：{0}").format(info.compress_type))
+
+class StreamingInstaller:
+    # 边下载边解压：先读取 ZIP 中央目录，再按顺序流式读取各成员并直接写入目标目录，不在磁盘上保留压缩包
+    def __init__(self, url, dest, thread_count=4, progress=None, max_attempts=MAX_ATTEMPTS, workers=None, mirrors=None, checksum=None, limiter=None):
+        self.url = url
+        self.limiter = limiter  # 多个任务共享的限速器
+        self.checksum = checksum  # 镜像发布的 (算法, 摘要)
+        self.hasher = None
+        self.mirrors = mirrors or []
+        self.dest = dest
+        self.thread_count = max(1, int(thread_count))
+        self.workers = workers or default_workers()
+        self.progress = progress or ProgressCounter()  # 已流过的压缩包字节数
+        self.max_attempts = max(1, int(max_attempts))
+        self.journal_path = dest + JOURNAL_SUFFIX
+        
+        self.total_size = 0
+        self.validator = None
+        self.members = []
+        self.prefix = ''
+        self.cd_offset = 0
+        self.central_directory = b''
+        self.extracted = 0  # 已完成解压的成员数（按在压缩包中的顺序）
+        self._cancel_event = threading.Event()
+    
+    def cancel(self):
+        # 取消正在进行的安装
+        self._cancel_event.set()
+    
+    def install(self):
+        # 读取中央目录后流式解压；网络中断时从当前成员处自动续传
+        self.read_central_directory()
+        self.load_journal()
+        self.progress.start(self.total_size, self.members[self.extracted].header_offset if self.extracted < len(self.members) else self.cd_offset)
+        os.makedirs(self.dest, exist_ok=True)
+        self.save_journal()  # 日志存在即表示安装目录尚未完成，取消时据此清理
+        if self.checksum and self.extracted == 0 and self.members and self.members[0].header_offset == 0:
+            # 从头开始安装时整个压缩包按顺序流过，可顺带计算整体摘要；续传时只依靠各成员的 CRC
+            self.hasher = hashlib.new(self.checksum[0])
+        
+        attempt = 1
+        while True:
+            try:
+                self.extract_members()
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout):
+                if attempt >= self.max_attempts or self._cancel_event.is_set():
+                    raise
+                attempt += 1
+                self.hasher = None
+                print(_("下载中断，正在从断点续传（第 {0} 次尝试）").format(attempt))  # 调试信息
+        
+        if self._cancel_event.is_set():
+            raise DownloadError(_("下载已取消。"))
+        if self.hasher is not None:
+            self.hasher.update(self.central_directory)
+            if self.hasher.hexdigest() != self.checksum[1]:
+                raise ChecksumError(_("文件校验失败，下载的数据已损坏。"))
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        return self.dest
+    
+    def read_central_directory(self):
+        # 通过 Range 请求获取压缩包尾部，解析出全部成员信息
+        response = http_client.get(self.url, headers={'Range': f'bytes=-{EOCD_SEARCH_SIZE}'})
+        response.raise_for_status()
+        total_size = SegmentedDownloader.parse_content_range(response.headers.get('content-range'))
+        if response.status_code != 206 or not total_size:
+            raise RangeNotSupportedError(_("服务器未按分段返回数据。"))
+        self.total_size = total_size
+        self.validator = response.headers.get('etag') or response.headers.get('last-modified')
+        
+        tail = response.content
+        base = total_size - len(tail)
+        cd_offset = self.find_central_directory(tail, base)
+        if cd_offset < base:
+            headers = {'Range': f'bytes={cd_offset}-{base - 1}'}
+            if self.validator:
+                headers['If-Range'] = self.validator
+            response = http_client.get(self.url, headers=headers)
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RangeNotSupportedError(_("服务器未按分段返回数据。"))
+            tail = response.content + tail
+            base = cd_offset
+        
+        with zipfile.ZipFile(TailFile(tail, base, total_size)) as z:
+            infos = z.infolist()
+        for info in infos:
+            if info.flag_bits & 0x1:
+                raise zipfile.BadZipFile(_("不支持加密的压缩包。"))
+        self.prefix = archive_prefix([info.filename for info in infos])
+        self.members = sorted(infos, key=lambda info: info.header_offset)
+        self.cd_offset = cd_offset
+        self.central_directory = tail[cd_offset - base:]
+    
+    @staticmethod
+    def find_central_directory(tail, base):
+        # 在尾部数据中查找中央目录结束记录，返回中央目录的起始偏移量
+        index = tail.rfind(EOCD_SIGNATURE)
+        if index < 0 or len(tail) - index < EOCD_SIZE:
+            raise zipfile.BadZipFile(_("下载的文件不是有效的 ZIP 文件。"))
+        record = struct.unpack(EOCD_FORMAT, tail[index:index + EOCD_SIZE])
+        cd_offset = record[6]
+        locator_index = index - ZIP64_LOCATOR_SIZE
+        if cd_offset == 0xFFFFFFFF and locator_index >= 0:
+            locator = struct.unpack(ZIP64_LOCATOR_FORMAT, tail[locator_index:index])
+            zip64_index = locator[2] - base
+            if zip64_index >= 0:
+                zip64_record = struct.unpack(ZIP64_EOCD_FORMAT, tail[zip64_index:zip64_index + ZIP64_EOCD_SIZE])
+                cd_offset = zip64_record[9]
+        return cd_offset
+    
+    def load_journal(self):
+        # 与上次中断时的远端文件一致则跳过已解压的成员
+        self.extracted = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data['url'] == self.url and data['validator'] == self.validator and data['total_size'] == self.total_size:
+                self.extracted = min(int(data['extracted']), len(self.members))
+                print(_("从断点续传：已解压 {0} 个文件").format(self.extracted))  # 调试信息
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    
+    def save_journal(self):
+        data = {
+            'url': self.url,
+            'validator': self.validator,
+            'total_size': self.total_size,
+            'extracted': self.extracted
+        }
+        temp_path = self.journal_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.journal_path)
+    
+    def extract_members(self):
+        # 从第一个未完成的成员开始顺序读取压缩数据，小文件交给线程池并行解压写入
+        if self.extracted >= len(self.members):
+            return
+        start = self.members[self.extracted].header_offset
+        saved_position = start
+        with RangeStreamReader(self.url, start, self.cd_offset, self.thread_count, validator=self.validator, mirrors=self.mirrors, hasher=self.hasher, limiter=self.limiter) as reader, WriterPool(self.workers) as pool:
+            try:
+                for info in self.members[self.extracted:]:
+                    if self._cancel_event.is_set():
+                        return
+                    reader.skip(info.header_offset - reader.position)
+                    self.extract_member(reader, info, pool)
+                    self.extracted += 1
+                    if reader.position - saved_position >= JOURNAL_INTERVAL:
+                        pool.wait()
+                        self.save_journal()
+                        saved_position = reader.position
+            finally:
+                pool.wait()
+        self.save_journal()
+    
+    def extract_member(self, reader, info, pool):
+        # 解析本地文件头并把成员数据解压写入目标路径
+        header = reader.read(LOCAL_HEADER_SIZE)
+        if len(header) != LOCAL_HEADER_SIZE or header[:4] != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(_("下载的文件不是有效的 ZIP 文件。"))
+        name_length, extra_length = struct.unpack(LOCAL_HEADER_FORMAT, header)[9:11]
+        reader.skip(name_length + extra_length)
+        
+        target = member_target(self.dest, info.filename, self.prefix)
+        if target is None or info.is_dir():
+            if target is not None:
+                os.makedirs(target, exist_ok=True)
+            reader.skip(info.compress_size)
+            self.report_progress(reader.position)
+            return
+        
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        data_offset = reader.position
+        if info.compress_size <= SMALL_MEMBER_SIZE:
+            data = reader.read(info.compress_size)
+            if len(data) != info.compress_size:
+                raise DownloadError(_("下载不完整，文件大小不匹配。"))
+            pool.submit(len(data), self.write_member, info, target, [data], data_offset)
+            self.report_progress(reader.position)
+        else:
+            self.write_member(info, target, self.read_chunks(reader, info.compress_size), data_offset)
+    
+    def read_chunks(self, reader, size):
+        # 分块读取大成员的压缩数据，边读边汇报进度
+        remaining = size
+        while remaining > 0:
+            data = reader.read(min(remaining, WRITE_CHUNK_SIZE))
+            if not data:
+                raise DownloadError(_("下载不完整，文件大小不匹配。"))
+            remaining -= len(data)
+            yield data
+            self.report_progress(reader.position)
+    
+    def write_member(self, info, target, chunks, data_offset=None):
+        # 解压成员数据写入目标文件并校验 CRC；校验失败时只重新下载这一个成员
+        decompressor = make_decompressor(info)
+        crc = 0
+        if os.path.lexists(target):
+            # 目标可能是链接到旧版本或安装缓存的文件（例如中断的增量更新留下的），先删除再写入，避免改写共享的文件
+            os.remove(target)
+        try:
+            with open(target, 'wb') as file:
+                for data in chunks:
+                    if decompressor is not None:
+                        data = decompressor.decompress(data)
+                    crc = zlib.crc32(data, crc)
+                    file.write(data)
+                if info.compress_type == zipfile.ZIP_DEFLATED:
+                    data = decompressor.flush()
+                    crc = zlib.crc32(data, crc)
+                    file.write(data)
+        except (zlib.error, lzma.LZMAError, EOFError, ValueError):
+            crc = None
+        
+        if crc != info.CRC:
+            if data_offset is None:
+                raise zipfile.BadZipFile(_("文件 {0} 校验失败。").format(info.filename))
+            print(_("文件 {0} 校验失败，重新下载该文件").format(info.filename))  # 调试信息
+            self.hasher = None  # 整体摘要已包含损坏的数据，修复后只依靠成员 CRC
+            self.write_member(info, target, self.refetch_member(data_offset, data_offset + info.compress_size))
+            return
+        apply_permissions(info, target)
+    
+    def refetch_member(self, start, end):
+        # 单独重新下载一个成员的压缩数据
+        with RangeStreamReader(self.url, start, end, self.thread_count, validator=self.validator, mirrors=self.mirrors, limiter=self.limiter) as reader:
+            while True:
+                data = reader.read(WRITE_CHUNK_SIZE)
+                if not data:
+                    break
+                yield data
+    
+    def report_progress(self, position):
+        self.progress.set(position)
@@ -0,0 +1,120 @@
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from progress import ProgressCounter, UNIT_FILES
+
+# 常量定义
+REMOVE_WORKERS = 8  # 并行删除文件的线程数；删除以元数据操作为主，机械硬盘以外（SSD、NTFS、网络共享）并行收益明显
+REMOVING_SUFFIX = '.removing'  # 卸载前先把安装目录改名，删除被取消或中断时留下的目录由清理功能删除
+
+class RemovalCancelled(Exception):
+    pass
+
+def unlink(path):
+    # 删除文件或符号链接；Windows 上只读文件需要先去掉只读属性
+    try:
+        os.unlink(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE)
+        os.unlink(path)
+
+def mark_removing(path):
+    # 把目录改名为 "<目录>.removing"：改名是瞬时的，版本立即从列表中消失；文件被占用（例如 Blender 仍在运行）时抛出 OSError，此时什么都不会被删除
+    target = path + REMOVING_SUFFIX
+    index = 1
+    while os.path.lexists(target):
+        target = f"{path}.{index}{REMOVING_SUFFIX}"
+        index += 1
+    os.rename(path, target)
+    return target
+
+def freed_size(stat_result):
+    # 还有其他硬链接（例如安装缓存中的对象）的文件删除后不释放空间；Windows 上 scandir 不返回链接数，此时为 0
+    return stat_result.st_size if stat_result.st_nlink <= 1 else 0
+
+class TreeRemover:
+    # 并行删除文件和目录树：先遍历收集文件及大小，再由线程池并行删除文件，最后自底向上删除空目录；不跟随符号链接。
+    # progress 按已删除的文件数计；cancel() 后尽快停止并抛出 RemovalCancelled，已删除的部分不恢复
+    def __init__(self, workers=REMOVE_WORKERS, progress=None):
+        self.workers = workers
+        self.progress = progress or ProgressCounter()
+        self.errors = []  # 删除失败的 (路径, 异常)
+        self._cancel_event = threading.Event()
+    
+    def cancel(self):
+        self._cancel_event.set()
+    
+    def scan(self, paths):
+        # 返回 (文件列表 [(路径, 删除后释放的字节数, 所属的顶层路径)], 目录列表)；目录按先序排列，倒序删除即可保证先删子目录
+        files = []
+        directories = []
+        
+        def walk(directory, root):
+            directories.append(directory)
+            try:
+                with os.scandir(directory) as iterator:
+                    entries = list(iterator)
+            except OSError as e:
+                self.errors.append((directory, e))
+                return
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        walk(entry.path, root)
+                    else:
+                        files.append((entry.path, freed_size(entry.stat(follow_symlinks=False)), root))
+                except OSError as e:
+                    self.errors.append((entry.path, e))
+        
+        for path in paths:
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    walk(path, path)
+                elif os.path.lexists(path):
+                    files.append((path, freed_size(os.lstat(path)), path))
+            except OSError as e:
+                self.errors.append((path, e))
+        return files, directories
+    
+    def remove_file(self, item):
+        # 在工作线程中删除一个文件，返回释放的字节数
+        if self._cancel_event.is_set():
+            return 0
+        path, size, _root = item
+        try:
+            unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.errors.append((path, e))
+            size = 0
+        self.progress.add(1)
+        return size
+    
+    def remove(self, paths):
+        # 删除 paths 中的文件和目录，返回 {顶层路径: 释放的字节数}
+        files, directories = self.scan(paths)
+        freed = dict.fromkeys(paths, 0)
+        self.progress.start(len(files), unit=UNIT_FILES)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='remove') as executor:
+            try:
+                for item, size in zip(files, executor.map(self.remove_file, files)):
+                    freed[item[2]] += size
+            except BaseException:
+                # 例如命令行按下 Ctrl+C：让排队的删除任务直接返回，不再继续删除
+                self.cancel()
+                raise
+        if self._cancel_event.is_set():
+            raise RemovalCancelled(_("删除已取消。"))
+        
+        for directory in reversed(directories):
+            try:
+                os.rmdir(directory)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # 目录中有删除失败的文件时目录也删不掉，只记录文件本身的错误
+                if not any(path.startswith(directory + os.sep) for path, _error in self.errors):
+                    self.errors.append((directory, e))
+        return freed
@@ -0,0 +1,86 @@
+import threading
+import urllib.parse
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+requests = lazy_import('requests')
+urllib3 = lazy_import('urllib3')
+
+# 常量定义
+DEFAULT_CONNECT_TIMEOUT = 10  # 建立连接超时（秒）
+DEFAULT_READ_TIMEOUT = 30  # 两次收到数据之间的最长等待（秒），防止镜像卡住时线程永久挂起
+DEFAULT_RETRIES = 3  # 连接失败、连接被重置和 5xx 响应的重试次数
+DEFAULT_BACKOFF_FACTOR = 0.5  # 指数退避系数：0.5s、1s、2s……
+DEFAULT_POOL_SIZE = 16  # 每个主机保持的 keep-alive 连接数，需不小于下载线程数
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+class HttpClient:
+    # 所有镜像请求共用的网络层：每个主机一个带连接池的会话，统一超时与指数退避重试
+    def __init__(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, pool_size=DEFAULT_POOL_SIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._lock = threading.Lock()
+    
+    def create_session(self):
+        retry = urllib3.util.retry.Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def session_for(self, url):
+        # 按 scheme + 主机复用会话，使同一镜像的请求共享 keep-alive 连接，避免重复 TLS 握手
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self.create_session()
+        return session
+    
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session_for(url).get(url, **kwargs)
+    
+    def head(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('allow_redirects', True)
+        return self.session_for(url).head(url, **kwargs)
+    
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+_client = HttpClient()
+
+def configure(connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES,
+              backoff_factor=DEFAULT_BACKOFF_FACTOR, pool_size=DEFAULT_POOL_SIZE):
+    # 按偏好设置替换全局网络层；正在进行的下载继续使用旧会话直到结束
+    global _client
+    _client = HttpClient(connect_timeout, read_timeout, retries, backoff_factor, pool_size)
+    return _client
+
+def get_client():
+    return _client
+
+def get(url, **kwargs):
+    return _client.get(url, **kwargs)
+
+def head(url, **kwargs):
+    return _client.head(url, **kwargs)
@@ -0,0 +1,134 @@
+import os
+import shutil
+from downloader import SegmentedDownloader, RangeNotSupportedError, JOURNAL_SUFFIX
+from extractor import StreamingInstaller, extract_archive
+from delta_installer import DeltaInstaller
+from mirrors import mirror_url, rank_mirrors, select_mirrors
+from checksums import fetch_checksum
+
+def install_dir_name(minor_version):
+    # 安装目录名，例如 "Blender 4.2.3"
+    return _("Blender {0}").format(minor_version.split('-')[1])
+
+class VersionInstaller:
+    # 安装一个 Blender 版本：优先从安装缓存链接，其次测速选择镜像，边下载边解压或分段下载后解压，最后纳入安装缓存
+    def __init__(self, folder_path, source_url, mirrors=None, thread_count=4, streaming_install=True, store=None, listing=None, delta_base=None, link_mode='hardlink', peers=None):
+        self.folder_path = folder_path
+        self.source_url = source_url
+        self.mirrors = mirrors or []
+        self.thread_count = thread_count
+        self.streaming_install = streaming_install
+        self.store = store
+        self.listing = listing  # listing(major_version) 返回目录中的文件名，用于查找校验文件
+        self.delta_base = delta_base  # delta_base(minor_version) 返回可作为增量更新基准的已安装版本目录，没有时返回 None
+        self.link_mode = link_mode  # 增量更新复用旧版本文件的方式
+        self.peers = peers  # 局域网缓存节点（PeerList），优先于公共镜像
+    
+    def paths(self, job):
+        # 返回 (压缩包下载路径, 安装目录)
+        return os.path.join(self.folder_path, job.minor_version), os.path.join(self.folder_path, install_dir_name(job.minor_version))
+    
+    def install(self, job, limiter=None):
+        major_version, minor_version = job.major_version, job.minor_version
+        zip_path, extract_path = self.paths(job)
+        store = self.store
+        
+        # 各步骤都累加到任务的进度计数器，进度由发布线程定时读取；这里只在步骤切换时设置说明文字
+        progress = job.progress
+        installed = False
+        cached = False
+        if store is not None:
+            cached_archive = store.find_archive(minor_version)
+            job.update(0, 0, _("正在从缓存安装..."))
+            if store.materialize(minor_version, extract_path, progress):
+                # 缓存中已有该版本的全部文件，直接链接出安装目录
+                print(_("已从缓存安装 {0}").format(minor_version))  # 调试信息
+                installed = cached = True
+            elif cached_archive:
+                # 缓存中保留了压缩包，只需重新解压
+                job.update(0, 0, _("正在解压..."))
+                extract_archive(cached_archive, extract_path, progress=progress)
+                installed = True
+        
+        if not installed:
+            # 局域网缓存节点已有该安装包时只从节点下载，公共镜像仅用于故障转移；
+            # 否则配置了多个镜像时先测速排序，最快的镜像并行分担分段，其余用于故障转移
+            bases = [self.source_url] + [base for base in self.mirrors if base.rstrip('/') != self.source_url.rstrip('/')]
+            mirror_urls = [mirror_url(base, major_version, minor_version) for base in bases]
+            active_urls, standby_urls = mirror_urls[:1], mirror_urls[1:]
+            peer_urls = self.peers.locate(major_version, minor_version) if self.peers is not None else []
+            if peer_urls:
+                print(_("从局域网缓存节点下载：{0}").format(peer_urls[0]))  # 调试信息
+                active_urls, standby_urls = peer_urls, mirror_urls
+            elif len(mirror_urls) > 1:
+                job.update(0, 0, _("正在测试镜像速度..."))
+                stats = rank_mirrors(mirror_urls)
+                for item in stats:
+                    print(_("镜像 {0}：{1:.2f} MB/s").format(item.url, item.throughput / 1024 / 1024))  # 调试信息
+                active_urls, standby_urls = select_mirrors(stats)
+            download_url = active_urls[0]
+            
+            # 镜像发布了 .sha256/.md5 时边下载边校验；从缓存节点下载时仍以公共镜像发布的校验值为准，镜像没有时才用节点提供的摘要
+            listing_names = self.listing(major_version) if self.listing else []
+            checksum = fetch_checksum(mirror_urls[0] if peer_urls else download_url, minor_version, listing_names or None)
+            if checksum is None and peer_urls:
+                checksum = fetch_checksum(download_url, minor_version)
+            if checksum:
+                print(_("校验值（{0}）：{1}").format(*checksum))  # 调试信息
+            job.check_stopped()
+            
+            base_path = self.delta_base(minor_version) if self.delta_base and minor_version.endswith('.zip') else None
+            if base_path:
+                # 已安装同系列的其他版本时只下载变化的文件
+                try:
+                    print(_("以 {0} 为基准增量更新").format(base_path))  # 调试信息
+                    installer = DeltaInstaller(download_url, extract_path, base_path, self.thread_count, progress, self.link_mode, mirrors=active_urls[1:], limiter=limiter)
+                    job.set_task(installer)
+                    installer.install()
+                    installed = True
+                except RangeNotSupportedError:
+                    print(_("源不支持分段请求，改为完整安装"))  # 调试信息
+            
+            if not installed and self.streaming_install and minor_version.endswith('.zip'):
+                # 边下载边解压，压缩包不落盘
+                try:
+                    job.update(0, 0, _("正在下载并解压..."))
+                    installer = StreamingInstaller(download_url, extract_path, self.thread_count, progress, mirrors=active_urls[1:], checksum=checksum, limiter=limiter)
+                    job.set_task(installer)
+                    installer.install()
+                    installed = True
+                except RangeNotSupportedError:
+                    print(_("源不支持分段请求，改为先下载后解压"))  # 调试信息
+        
+        if not installed:
+            # 按偏好设置的线程数分段并行下载
+            job.update(0, 0, _("正在下载..."))
+            downloader = SegmentedDownloader(download_url, zip_path, self.thread_count, progress, mirrors=active_urls[1:], standby_mirrors=standby_urls, checksum=checksum, limiter=limiter)
+            job.set_task(downloader)
+            downloader.download()
+            job.set_task(None)
+            job.check_stopped()
+            job.update(0, 0, _("正在解压..."))
+            extract_archive(zip_path, extract_path, progress=progress)
+            if store is not None:
+                # 压缩包移入缓存代替删除，重装时无需再次下载
+                store.add_archive(zip_path, minor_version)
+            else:
+                os.remove(zip_path)
+        
+        job.set_task(None)
+        if store is not None and not cached:
+            # 与其他版本相同的文件改为链接到同一份缓存对象，并记录清单供重装使用
+            job.update(0, 0, _("正在建立安装缓存..."))
+            store.add_tree(minor_version, extract_path, progress)
+        return extract_path
+    
+    def cleanup(self, job):
+        # 取消任务后删除下载了一半的压缩包、断点日志和未完成的流式安装目录
+        zip_path, extract_path = self.paths(job)
+        for path in (zip_path, zip_path + JOURNAL_SUFFIX, zip_path + JOURNAL_SUFFIX + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.exists(extract_path + JOURNAL_SUFFIX):
+            shutil.rmtree(extract_path, ignore_errors=True)
+            os.remove(extract_path + JOURNAL_SUFFIX)
@@ -0,0 +1,198 @@
+import os
+import csv
+import sys
+import json
+import time
+import ctypes
+import threading
+import statistics
+from mirror_index import CACHE_DIR
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+subprocess = lazy_import('subprocess')
+
+# 常量定义
+STATS_PATH = os.path.join(CACHE_DIR, "launch_stats.jsonl")
+LOG_DIR_NAME = 'logs'  # 启动日志放在安装目录下的子目录中
+MAX_LOG_FILES = 20  # 每个版本保留的启动日志数
+READY_MARKER = 'BLENDER_VMT_READY'
+# Blender 事件循环开始运行（界面第一次绘制）后计时器才会触发；后台模式没有事件循环，脚本执行时即视为就绪。
+# 表达式在用户参数之前执行，计时器必须是 persistent，否则随后打开 .blend 文件时会被清除
+READY_EXPR = ("import bpy;(print('{0}', flush=True) if bpy.app.background "
+              "else bpy.app.timers.register(lambda: print('{0}', flush=True), persistent=True))").format(READY_MARKER)
+RECORD_FIELDS = ('name', 'version', 'started', 'ready_seconds', 'duration', 'peak_rss', 'cpu_seconds', 'exit_code', 'log_file')
+SUMMARY_FIELDS = ('name', 'version', 'launches', 'failures', 'ready_median', 'ready_min', 'peak_rss_median', 'cpu_median')
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    _fields_ = [('cb', ctypes.c_ulong), ('PageFaultCount', ctypes.c_ulong), ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t), ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+def windows_process_usage(handle):
+    # Windows：进程退出后句柄仍然有效，从中读取峰值工作集和用户态+内核态 CPU 时间
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    peak_rss = None
+    if ctypes.windll.psapi.GetProcessMemoryInfo(int(handle), ctypes.byref(counters), counters.cb):
+        peak_rss = counters.PeakWorkingSetSize
+    times = [ctypes.c_ulonglong() for _index in range(4)]
+    cpu_seconds = None
+    if ctypes.windll.kernel32.GetProcessTimes(int(handle), *[ctypes.byref(value) for value in times]):
+        cpu_seconds = (times[2].value + times[3].value) / 10 ** 7  # FILETIME 以 100 纳秒为单位
+    return peak_rss, cpu_seconds
+
+def rotate_logs(log_dir, keep=MAX_LOG_FILES):
+    # 删除最旧的日志，只保留最近 keep 个（文件名按时间排序）
+    try:
+        names = sorted(name for name in os.listdir(log_dir) if name.startswith('blender_') and name.endswith('.log'))
+    except OSError:
+        return
+    for name in names[:-keep] if keep > 0 else names:
+        try:
+            os.remove(os.path.join(log_dir, name))
+        except OSError:
+            pass
+
+class LaunchMonitor:
+    # 启动并监视一个 Blender 进程：输出写入按时间命名的日志，记录就绪时间、峰值内存、CPU 时间和退出码；
+    # telemetry 为 False 时输出直接写入日志文件，不检测就绪时间，调用方可以不等待进程退出
+    def __init__(self, executable, args=(), name=None, version=None, telemetry=True, log_dir=None, env=None):
+        self.executable = executable
+        self.args = list(args)
+        self.env = dict(os.environ, **env) if env else None  # 在当前环境变量基础上追加或覆盖
+        self.name = name or os.path.basename(os.path.dirname(executable))
+        self.version = version
+        self.telemetry = telemetry
+        self.log_dir = log_dir or os.path.join(os.path.dirname(executable), LOG_DIR_NAME)
+        self.log_file = None
+        self.process = None
+        self.started = None
+        self.ready_seconds = None
+        self._start_time = None
+        self._reader = None
+    
+    def start(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.started = time.time()
+        self.log_file = os.path.join(self.log_dir, time.strftime('blender_%Y%m%d_%H%M%S.log', time.localtime(self.started)))
+        if os.path.exists(self.log_file):
+            self.log_file = self.log_file[:-4] + f"_{int(self.started * 1000) % 1000:03d}.log"
+        rotate_logs(self.log_dir, MAX_LOG_FILES - 1)
+        
+        self._start_time = time.monotonic()
+        if not self.telemetry:
+            with open(self.log_file, 'wb') as log:
+                self.process = subprocess.Popen([self.executable] + self.args, stdout=log, stderr=log, stdin=subprocess.DEVNULL, env=self.env)
+            return self
+        
+        self.process = subprocess.Popen([self.executable, '--python-expr', READY_EXPR] + self.args,
+                                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, env=self.env)
+        self._reader = threading.Thread(target=self.read_output, daemon=True)
+        self._reader.start()
+        return self
+    
+    def read_output(self):
+        # 把输出写入日志，同时查找就绪标记（标记行不写入日志）
+        marker = READY_MARKER.encode()
+        with open(self.log_file, 'wb') as log:
+            for line in self.process.stdout:
+                if self.ready_seconds is None and marker in line:
+                    self.ready_seconds = time.monotonic() - self._start_time
+                    continue
+                log.write(line)
+                log.flush()
+    
+    def wait(self):
+        # 等待进程退出并返回本次启动的记录
+        peak_rss = cpu_seconds = None
+        if hasattr(os, 'wait4'):
+            # POSIX：wait4 同时返回子进程的资源使用统计
+            _pid, status, usage = os.wait4(self.process.pid, 0)
+            self.process.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+            cpu_seconds = usage.ru_utime + usage.ru_stime
+        else:
+            self.process.wait()
+            try:
+                peak_rss, cpu_seconds = windows_process_usage(self.process._handle)
+            except (AttributeError, OSError):
+                pass
+        duration = time.monotonic() - self._start_time
+        if self._reader is not None:
+            self._reader.join()
+        return {
+            'name': self.name,
+            'version': self.version,
+            'started': self.started,
+            'ready_seconds': round(self.ready_seconds, 3) if self.ready_seconds is not None else None,
+            'duration': round(duration, 3),
+            'peak_rss': peak_rss,
+            'cpu_seconds': round(cpu_seconds, 3) if cpu_seconds is not None else None,
+            'exit_code': self.process.returncode,
+            'log_file': self.log_file
+        }
+
+class LaunchStats:
+    # 启动记录，每次启动追加一行 JSON
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def add(self, record):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    def records(self):
+        # 读取全部记录，跳过写了一半的行
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return records
+    
+    def summary(self, records=None):
+        # 按版本汇总：启动次数、失败次数、就绪时间中位数和最小值、峰值内存和 CPU 时间中位数；就绪最快的在前
+        groups = {}
+        for record in self.records() if records is None else records:
+            groups.setdefault(record.get('name'), []).append(record)
+        
+        def median(values, digits=3):
+            values = [value for value in values if value is not None]
+            return round(statistics.median(values), digits) if values else None
+        
+        rows = []
+        for name, items in groups.items():
+            ready = [item.get('ready_seconds') for item in items]
+            rows.append({
+                'name': name,
+                'version': next((item['version'] for item in reversed(items) if item.get('version')), None),
+                'launches': len(items),
+                'failures': sum(1 for item in items if item.get('exit_code') not in (0, None)),
+                'ready_median': median(ready),
+                'ready_min': min((value for value in ready if value is not None), default=None),
+                'peak_rss_median': median((item.get('peak_rss') for item in items), None),
+                'cpu_median': median(item.get('cpu_seconds') for item in items)
+            })
+        rows.sort(key=lambda row: (row['ready_median'] is None, row['ready_median'] or 0))
+        return rows
+    
+    def export(self, path, rows=None, fields=RECORD_FIELDS):
+        # 按扩展名导出为 CSV 或 JSON，默认导出全部启动记录
+        rows = self.records() if rows is None else rows
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            if path.lower().endswith('.json'):
+                json.dump(rows, file, ensure_ascii=False, indent=2)
+            else:
+                writer = csv.DictWriter(file, fieldnames=fields, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(rows)
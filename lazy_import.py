@@ -0,0 +1,22 @@
+import sys
+import importlib
+
+class LazyModule:
+    # 模块代理：第一次访问属性时才导入真正的模块，之后直接转发。
+    # 导入由 importlib 的模块锁保护，多个线程同时第一次访问时只会等待同一次导入完成，不会看到未初始化完的模块
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attribute):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+    
+    def __repr__(self):
+        return f"<lazy module '{self._name}'>"
+
+def lazy_import(name):
+    # 返回延迟加载的模块，用于 requests、zipfile 等只在下载、解压时才用到的模块，缩短界面的启动时间；模块已导入时直接返回
+    return sys.modules.get(name) or LazyModule(name)
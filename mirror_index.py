@@ -0,0 +1,347 @@
+import os
+import re
+import html
+import json
+import time
+import calendar
+import hashlib
+import threading
+import collections
+import urllib.parse
+import http_client
+from concurrent.futures import ThreadPoolExecutor
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+requests = lazy_import('requests')
+
+# 常量定义
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".blender_version_manager")
+INDEX_CACHE_DIR = os.path.join(CACHE_DIR, "index")
+DEFAULT_INDEX_TTL = 3600  # 目录页缓存有效期（秒）
+DEFAULT_INDEX_CACHE_SIZE = 16 * 1024 * 1024  # 目录页缓存总大小上限（字节）
+PREFETCH_WORKERS = 8  # 后台预取小版本列表的并发数
+
+# 目录页解析（Apache/nginx autoindex）
+ANCHOR_PATTERN = re.compile(r'<a\s[^>]*?href\s*=\s*["\']([^"\']*)["\'][^>]*>', re.IGNORECASE)
+TAG_PATTERN = re.compile(r'<[^>]*>')
+DATE_PATTERN = re.compile(
+    r'(?P<year>\d{4})-(?P<month>\d{2}|[A-Za-z]{3})-(?P<day>\d{2})[ T](?P<time>\d{2}:\d{2}(?::\d{2})?)'
+    r'|(?P<day2>\d{2})-(?P<month2>[A-Za-z]{3})-(?P<year2>\d{4}) (?P<time2>\d{2}:\d{2}(?::\d{2})?)'
+)
+MONTHS = {name: index for index, name in enumerate(['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+SIZE_PATTERN = re.compile(r'(?<![\w.:-])(\d+(?:\.\d+)?)\s*([KMGT]i?B?|B)?(?![\w.:-])', re.IGNORECASE)
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+ARCHIVE_PATTERN = re.compile(r'^blender-(?P<version>\d+(?:\.\d+)*[a-z]?)-(?P<platform>.+?)\.(?P<extension>zip|tar\.xz|tar\.gz|tar\.bz2|dmg|msi|msix|exe)$')
+VERSION_PART_PATTERN = re.compile(r'(\d+)([a-z]?)')
+
+ListingEntry = collections.namedtuple('ListingEntry', ['name', 'href', 'is_dir', 'size', 'mtime'])
+
+def parse_listing(page):
+    # 单次扫描目录页中的链接，从每个链接之后到下一个链接之前的文本中提取修改时间和大小，不构建 DOM
+    entries = []
+    matches = list(ANCHOR_PATTERN.finditer(page))
+    for index, match in enumerate(matches):
+        href = html.unescape(match.group(1))
+        if not href or href.startswith(('?', '#', '/', '..')) or '://' in href:
+            continue
+        name = urllib.parse.unquote(href.split('?', 1)[0])
+        is_dir = name.endswith('/')
+        name = name.rstrip('/')
+        if not name or '/' in name:
+            continue
+        
+        tail_end = matches[index + 1].start() if index + 1 < len(matches) else len(page)
+        tail = page[match.end():tail_end]
+        close = tail.lower().find('</a>')
+        if close >= 0:
+            tail = tail[close + 4:]
+        text = html.unescape(TAG_PATTERN.sub(' ', tail))
+        mtime, text = parse_listing_date(text)
+        size = None if is_dir else parse_listing_size(text)
+        entries.append(ListingEntry(name, href, is_dir, size, mtime))
+    return entries
+
+def parse_listing_date(text):
+    # 返回 (UTC 时间戳, 去掉日期后的剩余文本)，支持 "2024-10-15 10:20"、"15-Oct-2024 10:20"、"2024-Oct-15 10:20"
+    match = DATE_PATTERN.search(text)
+    if not match:
+        return None, text
+    if match.group('year'):
+        year, month, day, clock = match.group('year', 'month', 'day', 'time')
+    else:
+        year, month, day, clock = match.group('year2', 'month2', 'day2', 'time2')
+    month = int(month) if month.isdigit() else MONTHS.get(month.lower())
+    if not month:
+        return None, text
+    parts = [int(part) for part in clock.split(':')] + [0]
+    timestamp = calendar.timegm((int(year), month, int(day), parts[0], parts[1], parts[2]))
+    return timestamp, text[:match.start()] + text[match.end():]
+
+def parse_listing_size(text):
+    # 解析 "346030080"、"330M"、"330.0 MiB" 等大小写法，未找到时返回 None
+    match = SIZE_PATTERN.search(text)
+    if not match:
+        return None
+    unit = (match.group(2) or '').upper()[:1]
+    return int(float(match.group(1)) * SIZE_UNITS.get(unit, 1))
+
+def format_size(size):
+    # 将字节数格式化为便于阅读的字符串
+    if size is None:
+        return ''
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+class IndexCache:
+    # 镜像目录页的磁盘缓存：过期后用 ETag/Last-Modified 条件请求重新验证，超出容量时按最近使用时间淘汰
+    def __init__(self, cache_dir=INDEX_CACHE_DIR, ttl=DEFAULT_INDEX_TTL, max_size=DEFAULT_INDEX_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._refreshing = set()
+    
+    def entry_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+    
+    def get(self, url):
+        # 读取缓存条目，并更新其访问时间供淘汰使用
+        path = self.entry_path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('url') == url else None
+    
+    def put(self, url, body, etag=None, last_modified=None):
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+            'body': body
+        }
+        self.write_entry(entry)
+        self.evict()
+        return entry
+    
+    def write_entry(self, entry):
+        # 先写临时文件再替换，避免并发读到半截内容
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.entry_path(entry['url'])
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(entry, file)
+        os.replace(temp_path, path)
+    
+    def is_fresh(self, entry):
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+    
+    def evict(self):
+        # 总大小超过上限时删除最久未使用的条目，返回释放的字节数
+        freed = 0
+        with self._lock:
+            try:
+                names = [name for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+            except OSError:
+                return freed
+            entries = []
+            for name in names:
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _mtime, size, _path in entries)
+            for _mtime, size, path in sorted(entries):
+                if total <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                    freed += size
+                except OSError:
+                    pass
+                total -= size
+        return freed
+    
+    def fetch(self, url, background_refresh=True, client=None):
+        # 返回目录页内容：缓存未过期直接返回；已过期时先返回旧内容并在后台重新验证，无缓存时同步下载。
+        # client 为 None 时使用全局网络层
+        entry = self.get(url)
+        if entry is not None:
+            if not self.is_fresh(entry):
+                if background_refresh:
+                    self.refresh_async(url, client=client)
+                else:
+                    entry = self.revalidate(url, entry, client)
+            return entry['body']
+        return self.revalidate(url, None, client)['body']
+    
+    def revalidate(self, url, entry, client=None):
+        # 发送条件请求；304 表示内容未变化，只刷新缓存时间
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        response = (client or http_client).get(url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            entry['fetched_at'] = time.time()
+            self.write_entry(entry)
+            return entry
+        response.raise_for_status()
+        return self.put(url, response.text, response.headers.get('etag'), response.headers.get('last-modified'))
+    
+    def refresh_async(self, url, callback=None, client=None):
+        # 在后台线程中重新验证缓存，同一 URL 同时只刷新一次
+        with self._lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+        
+        def refresh():
+            try:
+                entry = self.revalidate(url, self.get(url), client)
+                if callback:
+                    callback(entry['body'])
+            except requests.exceptions.RequestException as e:
+                print(_("刷新目录缓存失败：{0}").format(e))  # 调试信息
+            finally:
+                with self._lock:
+                    self._refreshing.discard(url)
+        
+        threading.Thread(target=refresh, daemon=True).start()
+
+def version_key(version):
+    # "3.6.5" -> ((3, ''), (6, ''), (5, ''))，"2.79b" -> ((2, ''), (79, 'b'))，用于版本排序
+    key = []
+    for part in version.split('.'):
+        match = VERSION_PART_PATTERN.match(part)
+        if match:
+            key.append((int(match.group(1)), match.group(2)))
+    return tuple(key)
+
+def parse_archive_name(name):
+    # 从 "blender-4.2.3-linux-x64.tar.xz" 中提取 (版本, 平台, 扩展名)，非安装包返回 None
+    match = ARCHIVE_PATTERN.match(name)
+    if not match:
+        return None
+    return match.group('version'), match.group('platform'), match.group('extension')
+
+class VersionCatalogue:
+    # 内存中的版本目录：获取大版本列表后在后台并发抓取所有小版本列表，选择小版本时无需等待网络
+    def __init__(self, index_cache, source_url, workers=PREFETCH_WORKERS, peers=None):
+        self.index_cache = index_cache
+        self.source_url = source_url
+        self.workers = workers
+        self.peers = peers  # 局域网缓存节点，目录页优先从节点获取
+        self.majors = []
+        self.minors = {}  # 大版本名 -> 小版本 ListingEntry 列表
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = None
+    
+    def major_url(self, major_version):
+        return f"{self.source_url}/{major_version}/"
+    
+    def fetch_page(self, major_version=None):
+        # 获取根目录页或大版本目录页：优先从局域网缓存节点获取，节点都不可用时回到公共镜像
+        page = self.peers.fetch_page(self.index_cache, f"{major_version}/" if major_version else '') if self.peers else None
+        if page is not None:
+            return page
+        return self.index_cache.fetch(self.major_url(major_version) if major_version else self.source_url)
+    
+    def load_majors(self):
+        # 获取大版本列表（优先使用缓存）
+        entries = parse_listing(self.fetch_page())
+        self.majors = [entry for entry in entries if entry.name.startswith('Blender')]
+        return self.majors
+    
+    def fetch_minors(self, major_version):
+        entries = parse_listing(self.fetch_page(major_version))
+        prefix = f"blender-{major_version.split('Blender')[-1]}"
+        minors = [entry for entry in entries if entry.name.startswith(prefix)]
+        with self._lock:
+            self.minors[major_version] = minors
+        return minors
+    
+    def prefetch(self, majors=None):
+        # 使用有界线程池在后台抓取所有大版本下的小版本列表，不阻塞调用方
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='catalogue')
+            for entry in majors if majors is not None else self.majors:
+                if entry.name not in self._futures and entry.name not in self.minors:
+                    self._futures[entry.name] = self._executor.submit(self.fetch_minors, entry.name)
+    
+    def get_minors(self, major_version):
+        # 已预取则直接返回；正在预取则等待该大版本完成；否则同步抓取
+        with self._lock:
+            minors = self.minors.get(major_version)
+            future = self._futures.get(major_version)
+        if minors is not None:
+            return minors
+        if future is not None:
+            try:
+                return future.result()
+            except requests.exceptions.RequestException:
+                with self._lock:
+                    self._futures.pop(major_version, None)
+        return self.fetch_minors(major_version)
+    
+    def wait(self):
+        # 等待全部预取任务完成，忽略单个大版本的网络错误
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            try:
+                future.result()
+            except requests.exceptions.RequestException:
+                pass
+    
+    def search(self, version_prefix='', platform=None):
+        # 跨大版本查找安装包，如 search('3.6', 'linux-x64')；结果按版本从新到旧排列，元素为 (大版本名, ListingEntry)
+        with self._lock:
+            catalogue = list(self.minors.items())
+        results = []
+        for major_version, entries in catalogue:
+            for entry in entries:
+                parsed = parse_archive_name(entry.name)
+                if parsed is None:
+                    continue
+                version, entry_platform, _extension = parsed
+                if version_prefix and not self.version_matches(version, version_prefix):
+                    continue
+                if platform and platform not in entry_platform:
+                    continue
+                results.append((major_version, entry))
+        results.sort(key=lambda item: version_key(parse_archive_name(item[1].name)[0]), reverse=True)
+        return results
+    
+    @staticmethod
+    def version_matches(version, version_prefix):
+        # "3.6" 匹配 3.6、3.6.x；"2.79" 同时匹配 2.79a、2.79b 等字母后缀版本
+        if not version.startswith(version_prefix):
+            return False
+        rest = version[len(version_prefix):]
+        return not rest or rest[0] == '.' or rest.isalpha()
+    
+    def latest(self, version_prefix='', platform=None):
+        # 返回符合条件的最新安装包，如 latest('3.6', 'linux-x64')，未找到时返回 None
+        results = self.search(version_prefix, platform)
+        return results[0] if results else None
+    
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._futures = {}
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,115 @@
+import re
+import time
+import threading
+import collections
+import http_client
+from concurrent.futures import ThreadPoolExecutor
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+requests = lazy_import('requests')
+
+# 常量定义
+DEFAULT_MIRRORS = [
+    'https://mirrors.aliyun.com/blender/release/',
+    'https://download.blender.org/release/',
+]
+PROBE_SIZE = 256 * 1024  # 测速时下载的字节数
+PROBE_TIMEOUT = 5  # 测速请求的连接/读取超时（秒）
+MIN_THROUGHPUT_RATIO = 0.25  # 速度低于最快镜像此比例的镜像不参与分段下载
+PEER_TIMEOUT = (2, 30)  # 连接局域网缓存节点的超时较短且不重试，节点关机时尽快回到公共镜像
+PEER_RETRY_INTERVAL = 60  # 请求失败的缓存节点在此秒数内不再尝试
+
+MirrorStats = collections.namedtuple('MirrorStats', ['url', 'latency', 'throughput', 'error'])
+
+def parse_mirrors(text):
+    # 解析按行或逗号分隔的镜像列表，去重并统一以 "/" 结尾
+    mirrors = []
+    for item in re.split(r'[\s,]+', text or ''):
+        if not item:
+            continue
+        item = item.rstrip('/') + '/'
+        if item not in mirrors:
+            mirrors.append(item)
+    return mirrors
+
+def mirror_url(base_url, *parts):
+    # 拼接镜像根地址与相对路径
+    return '/'.join([base_url.rstrip('/')] + [part.strip('/') for part in parts])
+
+def probe_mirror(url):
+    # 用一个 Range 请求测量首字节延迟和下载速度
+    start = time.perf_counter()
+    try:
+        response = http_client.get(url, headers={'Range': f'bytes=0-{PROBE_SIZE - 1}'}, stream=True, timeout=(PROBE_TIMEOUT, PROBE_TIMEOUT))
+        with response:
+            response.raise_for_status()
+            latency = time.perf_counter() - start
+            size = 0
+            for data in response.iter_content(64 * 1024):
+                size += len(data)
+                if size >= PROBE_SIZE:
+                    break
+        elapsed = max(time.perf_counter() - start - latency, 1e-6)
+        return MirrorStats(url, latency, size / elapsed, None)
+    except requests.exceptions.RequestException as e:
+        return MirrorStats(url, None, 0, e)
+
+def rank_mirrors(urls, workers=8):
+    # 并发测速，可用镜像按速度从快到慢排列，失败的镜像排在最后
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as executor:
+        stats = list(executor.map(probe_mirror, urls))
+    return sorted(stats, key=lambda item: (item.error is not None, -item.throughput))
+
+def select_mirrors(stats, min_ratio=MIN_THROUGHPUT_RATIO):
+    # 返回 (参与并行下载的镜像, 备用镜像)：速度不低于最快镜像 min_ratio 倍的镜像并行下载，其余仅在故障转移时使用
+    available = [item for item in stats if item.error is None]
+    if not available:
+        return [item.url for item in stats[:1]], [item.url for item in stats[1:]]
+    best = available[0].throughput
+    active = [item.url for item in available if item.throughput >= best * min_ratio]
+    return active, [item.url for item in stats if item.url not in active]
+
+class PeerList:
+    # 客户端一侧的缓存节点列表：节点优先于公共镜像，请求失败的节点在 retry_interval 秒内跳过，避免每次都等待超时
+    def __init__(self, urls, retry_interval=PEER_RETRY_INTERVAL):
+        self.urls = list(urls)
+        self.retry_interval = retry_interval
+        self._failed = {}  # 节点地址 -> 失败时间
+        self._lock = threading.Lock()
+        self.client = http_client.HttpClient(*PEER_TIMEOUT, retries=0)  # 目录页和探测请求专用；下载压缩包仍走全局网络层，按 Retry-After 重试
+    
+    def available(self):
+        now = time.monotonic()
+        with self._lock:
+            return [url for url in self.urls if now - self._failed.get(url, -self.retry_interval) >= self.retry_interval]
+    
+    def mark_failed(self, url, error):
+        with self._lock:
+            self._failed[url] = time.monotonic()
+        print(_("缓存节点 {0} 不可用，暂时改用公共镜像：{1}").format(url, error))  # 调试信息
+    
+    def fetch_page(self, index_cache, path=''):
+        # 依次向可用节点请求目录页（仍经过本机的目录缓存），都不可用时返回 None
+        for url in self.available():
+            try:
+                return index_cache.fetch(url + path, client=self.client)
+            except requests.exceptions.RequestException as e:
+                self.mark_failed(url, e)
+        return None
+    
+    def locate(self, major_version, archive_name):
+        # 返回已缓存该安装包的节点上的下载地址；未命中（404）的节点仍视为可用
+        urls = []
+        for url in self.available():
+            archive_url = mirror_url(url, major_version, archive_name)
+            try:
+                response = self.client.head(archive_url)
+            except requests.exceptions.RequestException as e:
+                self.mark_failed(url, e)
+                continue
+            if response.status_code == 200:
+                urls.append(archive_url)
+        return urls
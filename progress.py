@@ -0,0 +1,129 @@
+import time
+import threading
+import collections
+from mirror_index import format_size
+
+# 常量定义
+PUBLISH_INTERVAL = 0.25  # 发布进度的间隔（秒）：界面按固定频率刷新，与数据块大小和工作线程数无关
+SPEED_SMOOTHING = 0.3  # 速度的指数平滑系数，越小越平稳
+UNIT_BYTES = 'bytes'
+UNIT_FILES = 'files'
+
+ProgressSnapshot = collections.namedtuple('ProgressSnapshot', 'done total speed eta message unit')
+
+def format_speed(speed, unit=UNIT_BYTES):
+    if speed is None:
+        return ''
+    if unit == UNIT_BYTES:
+        return _("{0}/s").format(format_size(speed))
+    return _("{0:.0f} 个文件/秒").format(speed)
+
+def format_eta(seconds):
+    # 把剩余秒数格式化为 "1:02:03" 或 "2:03"
+    if seconds is None:
+        return ''
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class ProgressCounter:
+    # 无锁进度计数器：每个工作线程只累加自己的槽位，读取时求和；热路径上没有锁、回调和字符串格式化，
+    # 由 ProgressPublisher 定时读取。start() 和 set() 只能在没有其他线程累加时调用（阶段开始时或单线程生产者）
+    def __init__(self, total=0, message='', unit=UNIT_BYTES):
+        self.total = total
+        self.message = message
+        self.unit = unit
+        self.phase = 0  # 每次 start() 加一，发布线程据此重新计算速度
+        self._offset = 0
+        self._slots = []
+        self._local = threading.local()
+    
+    def add(self, amount):
+        slot = getattr(self._local, 'slot', None)
+        if slot is None:
+            slot = self._local.slot = [0]
+            self._slots.append(slot)
+        slot[0] += amount
+    
+    def counted(self):
+        return sum(slot[0] for slot in self._slots[:])
+    
+    @property
+    def done(self):
+        return self._offset + self.counted()
+    
+    def set(self, done):
+        self._offset = done - self.counted()
+    
+    def start(self, total, done=0, message=None, unit=UNIT_BYTES):
+        # 开始一个新阶段，例如下载完成后开始解压
+        self.total = total
+        self.unit = unit
+        if message is not None:
+            self.message = message
+        self.set(done)
+        self.phase += 1
+
+class ProgressPublisher:
+    # 唯一的定时发布线程：按固定频率读取所有订阅的计数器，计算平滑后的速度（单位/秒）和剩余秒数，
+    # 在发布线程中调用 callback(ProgressSnapshot)；没有订阅时线程退出
+    def __init__(self, interval=PUBLISH_INTERVAL, smoothing=SPEED_SMOOTHING):
+        self.interval = interval
+        self.smoothing = smoothing
+        self._subscriptions = {}  # 计数器 -> {'callback', 'phase', 'time', 'done', 'speed'}
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def subscribe(self, counter, callback):
+        with self._lock:
+            self._subscriptions[counter] = {'callback': callback, 'phase': None, 'time': None, 'done': 0, 'speed': None}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name='progress', daemon=True)
+                self._thread.start()
+    
+    def unsubscribe(self, counter):
+        # 取消订阅前再发布一次，界面能看到最终进度
+        with self._lock:
+            subscription = self._subscriptions.pop(counter, None)
+        if subscription is not None:
+            self.publish(counter, subscription, time.monotonic())
+    
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._subscriptions:
+                    self._thread = None
+                    return
+                subscriptions = list(self._subscriptions.items())
+            now = time.monotonic()
+            for counter, subscription in subscriptions:
+                self.publish(counter, subscription, now)
+    
+    def sample(self, counter, subscription, now):
+        done = counter.done
+        if subscription['phase'] != counter.phase:
+            subscription.update(phase=counter.phase, time=now, done=done, speed=None)
+        elapsed = now - subscription['time']
+        if elapsed > 0 and done >= subscription['done']:
+            rate = (done - subscription['done']) / elapsed
+            speed = subscription['speed']
+            subscription['speed'] = rate if speed is None else speed + self.smoothing * (rate - speed)
+            subscription.update(time=now, done=done)
+        speed = subscription['speed']
+        eta = (counter.total - done) / speed if speed and counter.total > done else None
+        return ProgressSnapshot(done, counter.total, speed, eta, counter.message, counter.unit)
+    
+    def publish(self, counter, subscription, now):
+        try:
+            subscription['callback'](self.sample(counter, subscription, now))
+        except Exception as e:
+            print(_("进度回调出错：{0}").format(e))  # 调试信息
+
+_publisher = ProgressPublisher()
+
+def subscribe(counter, callback):
+    _publisher.subscribe(counter, callback)
+
+def unsubscribe(counter):
+    _publisher.unsubscribe(counter)
@@ -0,0 +1,37 @@
+import os
+import sys
+import gettext
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+gettext.install('messages')
+
+import http_client
+from range_server import RangeServer
+
+@pytest.fixture(autouse=True)
+def fast_client():
+    # 测试中不等待指数退避重试，读取超时也缩短
+    yield http_client.configure(connect_timeout=2, read_timeout=5, retries=0)
+    http_client.get_client().close()
+    http_client.configure()
+
+@pytest.fixture
+def range_server(tmp_path):
+    # 返回一个工厂：每次调用启动一个以 tmp_path/"srv" 为根目录的服务器，测试结束后全部关闭
+    root = tmp_path / 'srv'
+    root.mkdir()
+    servers = []
+    
+    def start():
+        server = RangeServer(str(root))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,120 @@
+import os
+import re
+import sys
+import http.server
+import urllib.parse
+
+# 常量定义
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    # 从 server.root 提供文件（目录返回其中的 index.html），支持单区间 Range 请求和 If-None-Match 条件请求，只读取请求的区间，
+    # 测试和基准测试（benchmarks/bench_suite.py）共用；server 上的开关用于模拟各种镜像故障：
+    # ranges 为 False 时忽略 Range 返回完整文件，abort_after 为整数时每个响应只发送这么多字节后断开连接
+    # （设置了 abort_at 时只对包含该偏移量的响应生效），
+    # truncate_to 为整数时 206 响应的正文只保留这么多字节（Content-Length 与正文一致，连接正常结束），
+    # corrupt_at 为整数时第一个包含该偏移量的 GET 响应中这个字节被改写（只损坏一次）
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_HEAD(self):
+        self.send_file(False)
+    
+    def do_GET(self):
+        self.send_file(True)
+    
+    def send_file(self, send_body):
+        server = self.server
+        server.requests.append((self.command, self.path, self.headers.get('Range')))
+        path = os.path.join(server.root, urllib.parse.unquote(self.path.split('?', 1)[0]).lstrip('/'))
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = '"{0}-{1}"'.format(size, int(stat.st_mtime))
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        match = RANGE_PATTERN.match(self.headers.get('Range', ''))
+        start, end = 0, size - 1
+        if match and server.ranges:
+            start, end = match.groups()
+            if start:
+                start, end = int(start), min(int(end), size - 1) if end else size - 1
+            else:
+                start, end = max(0, size - int(end)), size - 1
+            if start > end:
+                self.send_error(416)
+                return
+            with open(path, 'rb') as file:
+                file.seek(start)
+                body = file.read(end - start + 1)
+            if server.truncate_to is not None:
+                body = body[:server.truncate_to]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            with open(path, 'rb') as file:
+                body = file.read()
+            self.send_response(200)
+        if server.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Type', 'text/html; charset=utf-8' if path.endswith('.html') else 'application/octet-stream')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not send_body:
+            return
+        if server.corrupt_at is not None and start <= server.corrupt_at < start + len(body):
+            index = server.corrupt_at - start
+            body = body[:index] + bytes([body[index] ^ 0xFF]) + body[index + 1:]
+            server.corrupt_at = None
+        if server.abort_after is not None and (server.abort_at is None or start <= server.abort_at <= end) and len(body) > server.abort_after:
+            self.wfile.write(body[:server.abort_after])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(body)
+
+class RangeServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, root):
+        super(RangeServer, self).__init__(('127.0.0.1', 0), RangeRequestHandler)
+        self.root = root
+        self.ranges = True
+        self.abort_after = None
+        self.abort_at = None
+        self.truncate_to = None
+        self.corrupt_at = None
+        self.requests = []  # (方法, 路径, Range)
+        self.url = f'http://127.0.0.1:{self.server_address[1]}/'
+    
+    def handle_error(self, request, client_address):
+        # 模拟断线时的连接重置不是错误
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+    
+    def served_bytes(self, name):
+        # 按 Range 头统计 name 被请求的字节数（只统计 GET）
+        total = 0
+        for command, path, byte_range in self.requests:
+            if command != 'GET' or path.lstrip('/') != name:
+                continue
+            match = RANGE_PATTERN.match(byte_range or '')
+            if not match:
+                total += os.path.getsize(os.path.join(self.root, name))
+            elif not match.group(1):
+                total += int(match.group(2))
+            else:
+                total += int(match.group(2)) - int(match.group(1)) + 1
+        return total
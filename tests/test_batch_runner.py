@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import threading
+
+from batch_runner import BatchRunner, BatchJob, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED, READ_CHUNK_SIZE
+
+# 常量定义
+SLEEP_SCRIPT = 'import time; time.sleep({0})'
+# POSIX 上再启动一个共用输出管道的孙进程，取消时必须连同它一起结束，否则读取输出会一直等到它退出
+HANG_SCRIPT = (
+    'import os, sys, time, subprocess\n'
+    'if os.name != "nt":\n'
+    '    subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])\n'
+    'print("started", flush=True)\n'
+    'time.sleep(60)\n'
+)
+
+def python_job(name, script):
+    # 用当前的 Python 解释器代替 Blender 作为子进程
+    return BatchJob(name, sys.executable, ['-c', script])
+
+def test_concurrency_limit():
+    # 同时运行的任务数不超过 workers，全部任务都运行完
+    running = set()
+    peak = []
+    lock = threading.Lock()
+    
+    def on_change(job):
+        with lock:
+            if job.state == JOB_RUNNING:
+                running.add(job.name)
+            else:
+                running.discard(job.name)
+            peak.append(len(running))
+    
+    jobs = [python_job(f'job-{index}', SLEEP_SCRIPT.format(0.3)) for index in range(5)]
+    results = BatchRunner(jobs, workers=2, on_change=on_change).run()
+    assert max(peak) == 2
+    assert [result['state'] for result in results] == [JOB_DONE] * 5
+    assert all(result['duration'] >= 0.3 for result in results)
+
+def test_exit_codes_and_output():
+    # 记录每个任务的退出码，输出按行保存；超过读取块大小的长行不被截断，无法启动的程序报告错误
+    long_line = 'x' * (2 * READ_CHUNK_SIZE)
+    jobs = [
+        python_job('ok', f'print("first"); print("x" * {len(long_line)}); print("last", end="")'),
+        python_job('fail', 'import sys; print("error"); sys.exit(3)'),
+        BatchJob('missing', os.path.join(os.path.dirname(sys.executable), 'no-such-blender')),
+    ]
+    results = BatchRunner(jobs, workers=3).run()
+    assert [(result['state'], result['exit_code']) for result in results] == [(JOB_DONE, 0), (JOB_FAILED, 3), (JOB_FAILED, None)]
+    assert jobs[0].log_lines() == ['first', long_line, 'last']
+    assert jobs[1].log_lines() == ['error']
+    assert results[2]['error']
+
+def test_cancel():
+    # 取消时运行中的进程（连同它启动的子进程）立即结束，尚未开始的任务不再启动
+    started = threading.Event()
+    
+    def on_change(job):
+        if job.state == JOB_RUNNING:
+            started.set()
+    
+    jobs = [python_job(f'job-{index}', HANG_SCRIPT) for index in range(3)]
+    runner = BatchRunner(jobs, workers=1, on_change=on_change)
+    thread = runner.start()
+    assert started.wait(10)
+    deadline = time.monotonic() + 10
+    while not jobs[0].log_lines() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    runner.cancel()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert [job.state for job in jobs] == [JOB_CANCELLED] * 3
+    assert jobs[0].exit_code is not None
+    assert jobs[1].process is None and jobs[2].process is None
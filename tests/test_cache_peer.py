@@ -0,0 +1,137 @@
+import os
+import socket
+import threading
+
+import pytest
+
+import http_client
+import cache_peer
+from cache_peer import CachePeerServer, RETRY_AFTER, parse_range
+from content_store import ContentStore
+from mirror_index import IndexCache
+from mirrors import PeerList
+
+# 常量定义
+ARCHIVE_NAME = 'blender-4.2.3-linux-x64.zip'
+ARCHIVE_SIZE = 256 * 1024
+
+@pytest.fixture
+def peer(tmp_path):
+    # 安装缓存中有一个压缩包的缓存节点，返回 (服务器, 压缩包内容, 缓存对象路径)
+    data = os.urandom(ARCHIVE_SIZE)
+    download = tmp_path / ARCHIVE_NAME
+    download.write_bytes(data)
+    store = ContentStore(str(tmp_path / 'store'))
+    object_path = store.add_archive(str(download), ARCHIVE_NAME)
+    server = CachePeerServer(('127.0.0.1', 0), None, store, max_connections=2).start()
+    server.archive_url = f'http://127.0.0.1:{server.server_address[1]}/Blender4.2/{ARCHIVE_NAME}'
+    yield server, data, object_path
+    server.stop()
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range('bytes=0-9', 100) == (0, 10)
+    assert parse_range('bytes=90-', 100) == (90, 100)
+    assert parse_range('bytes=-10', 100) == (90, 100)
+    assert parse_range('bytes=0-999', 100) == (0, 100)
+    assert parse_range('bytes=100-', 100) is False
+    assert parse_range('bytes=0-1,5-6', 100) is None
+
+def test_range_requests(peer):
+    server, data, _object_path = peer
+    response = http_client.get(server.archive_url)
+    assert response.status_code == 200
+    assert response.content == data
+    
+    response = http_client.get(server.archive_url, headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-199/{ARCHIVE_SIZE}'
+    assert response.content == data[100:200]
+    
+    response = http_client.get(server.archive_url, headers={'Range': 'bytes=-65536'})
+    assert response.status_code == 206
+    assert response.content == data[-65536:]
+
+def test_unsatisfiable_range(peer):
+    server, _data, _object_path = peer
+    response = http_client.get(server.archive_url, headers={'Range': f'bytes={ARCHIVE_SIZE}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{ARCHIVE_SIZE}'
+
+def test_busy_peer_returns_retry_after(peer):
+    # 传输名额用完时返回 503 和 Retry-After；HEAD 探测不占名额
+    server, data, _object_path = peer
+    for _index in range(server.max_connections):
+        assert server.transfers.acquire(blocking=False)
+    try:
+        response = http_client.get(server.archive_url)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(RETRY_AFTER)
+        assert http_client.head(server.archive_url).status_code == 200
+    finally:
+        for _index in range(server.max_connections):
+            server.transfers.release()
+    assert http_client.get(server.archive_url).content == data
+
+def test_corrupt_object_is_removed(peer):
+    server, _data, object_path = peer
+    with open(object_path, 'r+b') as file:
+        file.write(b'corrupt')
+    assert http_client.get(server.archive_url).status_code == 404
+    assert not os.path.exists(object_path)
+
+def test_verification_does_not_block_other_archives(peer, tmp_path, monkeypatch):
+    # 第一次请求某个压缩包时要计算整个文件的摘要，期间其他压缩包的请求不应等待
+    server, _data, object_path = peer
+    other_name = 'blender-4.1.1-linux-x64.zip'
+    other = tmp_path / other_name
+    other.write_bytes(os.urandom(1024))
+    server.store.add_archive(str(other), other_name)
+    
+    hashing = threading.Event()
+    release = threading.Event()
+    file_digest = cache_peer.file_digest
+    
+    def slow_digest(path):
+        if path == object_path:
+            hashing.set()
+            release.wait(10)
+        return file_digest(path)
+    
+    monkeypatch.setattr(cache_peer, 'file_digest', slow_digest)
+    slow_request = threading.Thread(target=http_client.get, args=(server.archive_url,))
+    slow_request.start()
+    try:
+        assert hashing.wait(5)
+        other_url = server.archive_url.replace(ARCHIVE_NAME, other_name)
+        assert http_client.get(other_url, timeout=2).status_code == 200
+    finally:
+        release.set()
+        slow_request.join()
+
+def test_dead_peer_is_not_retried(tmp_path):
+    # 节点的目录页请求不经过全局网络层的重试，连接失败一次就回到公共镜像
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen()
+    connections = []
+    
+    def accept():
+        while True:
+            try:
+                connection, _address = listener.accept()
+            except OSError:
+                return
+            connections.append(connection)
+            connection.close()
+    
+    threading.Thread(target=accept, daemon=True).start()
+    http_client.configure(retries=3, backoff_factor=0)
+    url = f'http://127.0.0.1:{listener.getsockname()[1]}/'
+    peers = PeerList([url])
+    try:
+        assert peers.fetch_page(IndexCache(str(tmp_path / 'index')), 'Blender4.2/') is None
+        assert len(connections) == 1
+        assert peers.available() == []
+    finally:
+        listener.close()
@@ -0,0 +1,74 @@
+import os
+import random
+import hashlib
+import threading
+
+from checksums import IncrementalHasher, checksum_names, fetch_checksum, parse_checksum_file
+
+# 常量定义
+BLOCK_SIZE = 64 * 1024
+
+def test_out_of_order_writes(tmp_path):
+    # 多个线程乱序写入分段，摘要与顺序计算的结果一致
+    data = os.urandom(64 * BLOCK_SIZE)
+    path = str(tmp_path / 'a.bin')
+    with open(path, 'wb') as file:
+        file.truncate(len(data))
+    hasher = IncrementalHasher(path, 'sha256')
+    blocks = list(range(0, len(data), BLOCK_SIZE))
+    random.Random(0).shuffle(blocks)
+    
+    def write(positions):
+        with open(path, 'r+b') as file:
+            for position in positions:
+                file.seek(position)
+                file.write(data[position:position + BLOCK_SIZE])
+                file.flush()
+                hasher.update(position, data[position:position + BLOCK_SIZE])
+    
+    threads = [threading.Thread(target=write, args=(blocks[index::4],)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hasher.hexdigest() == hashlib.sha256(data).hexdigest()
+
+def test_short_read_keeps_range(tmp_path):
+    # 登记的区间还没有完整落盘时保留在区间表中，数据写完后取摘要仍能补读
+    data = os.urandom(2 * BLOCK_SIZE)
+    path = tmp_path / 'a.bin'
+    path.write_bytes(data[:BLOCK_SIZE])
+    hasher = IncrementalHasher(str(path), 'sha256')
+    hasher.mark_written(0, len(data))
+    assert hasher.offset == BLOCK_SIZE
+    with open(path, 'ab') as file:
+        file.write(data[BLOCK_SIZE:])
+    assert hasher.hexdigest() == hashlib.sha256(data).hexdigest()
+
+def test_parse_checksum_file():
+    # GNU coreutils 与 BSD 两种格式，忽略无法识别的行
+    text = (
+        'D41D8CD98F00B204E9800998ECF8427ED41D8CD98F00B204E9800998ECF8427E  blender-4.2.3-linux-x64.tar.xz\n'
+        '0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef *release/blender-4.2.3-windows-x64.zip\n'
+        'SHA256 (blender-4.2.3-macos-arm64.dmg) = aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa\n'
+        'not a checksum line\n'
+    )
+    assert parse_checksum_file(text) == {
+        'blender-4.2.3-linux-x64.tar.xz': 'd41d8cd98f00b204e9800998ecf8427ed41d8cd98f00b204e9800998ecf8427e',
+        'blender-4.2.3-windows-x64.zip': '0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef',
+        'blender-4.2.3-macos-arm64.dmg': 'a' * 64,
+    }
+
+def test_checksum_names():
+    assert checksum_names('blender-4.2.3-linux-x64.tar.xz', ['blender-4.2.3.md5', 'blender-4.2.3.sha256']) == [
+        ('blender-4.2.3.sha256', 'sha256'),
+        ('blender-4.2.3.md5', 'md5'),
+    ]
+
+def test_fetch_checksum(tmp_path, range_server):
+    # 优先使用按版本发布的 .sha256 文件；镜像没有发布校验文件时返回 None
+    server = range_server()
+    digest = hashlib.sha256(b'archive').hexdigest()
+    (tmp_path / 'srv' / 'blender-4.2.3.sha256').write_text(f'{digest}  blender-4.2.3-linux-x64.tar.xz\n', encoding='utf-8')
+    assert fetch_checksum(server.url + 'blender-4.2.3-linux-x64.tar.xz', 'blender-4.2.3-linux-x64.tar.xz') == ('sha256', digest)
+    assert fetch_checksum(server.url + 'blender-4.1.1-linux-x64.tar.xz', 'blender-4.1.1-linux-x64.tar.xz') is None
@@ -0,0 +1,78 @@
+import os
+import time
+
+import pytest
+
+import config_store
+from config_store import ConfigStore
+
+# 常量定义
+DELAY = 0.2
+
+@pytest.fixture
+def writes(monkeypatch):
+    # 记录实际写盘的次数
+    paths = []
+    write_atomic = config_store.write_atomic
+    
+    def counting_write(path, text):
+        paths.append(path)
+        write_atomic(path, text)
+    
+    monkeypatch.setattr(config_store, 'write_atomic', counting_write)
+    return paths
+
+def make_store(path):
+    store = ConfigStore(str(path), delay=DELAY)
+    store.load()
+    if not store.config.has_section('Settings'):
+        store.config.add_section('Settings')
+    return store
+
+def test_burst_is_written_once(tmp_path, writes):
+    # 延迟期间的多次修改合并为一次写入，写入的是最后的值
+    store = make_store(tmp_path / 'config.ini')
+    for index in range(100):
+        with store.lock:
+            store.config.set('Settings', 'ThreadCount', str(index))
+        store.save()
+    assert writes == []
+    time.sleep(DELAY * 3)
+    assert writes == [str(tmp_path / 'config.ini')]
+    assert 'threadcount = 99' in (tmp_path / 'config.ini').read_text()
+
+def test_unchanged_content_is_not_rewritten(tmp_path, writes):
+    path = tmp_path / 'config.ini'
+    path.write_text('[Settings]\nthreadcount = 4\n\n')
+    store = make_store(path)
+    assert not store.flush()
+    with store.lock:
+        store.config.set('Settings', 'ThreadCount', '8')
+        store.config.set('Settings', 'ThreadCount', '4')
+    assert not store.flush()
+    assert writes == []
+    with store.lock:
+        store.config.set('Settings', 'ThreadCount', '8')
+    assert store.flush()
+    assert not store.flush()
+    assert len(writes) == 1
+
+def test_failed_write_keeps_original(tmp_path, monkeypatch):
+    # 写入中途失败时原文件保持完整，也不留下临时文件，之后仍可重试
+    path = tmp_path / 'config.ini'
+    path.write_text('[Settings]\nthreadcount = 4\n\n')
+    store = make_store(path)
+    with store.lock:
+        store.config.set('Settings', 'ThreadCount', '8')
+    
+    def failing_fsync(fd):
+        raise OSError('disk full')
+    
+    monkeypatch.setattr(config_store.os, 'fsync', failing_fsync)
+    with pytest.raises(OSError):
+        store.flush()
+    assert path.read_text() == '[Settings]\nthreadcount = 4\n\n'
+    assert os.listdir(tmp_path) == ['config.ini']
+    monkeypatch.undo()
+    assert store.flush()
+    assert 'threadcount = 8' in path.read_text()
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+from content_store import ContentStore, file_digest
+
+def make_tree(root, version):
+    # 模拟解压出的安装目录：共享的库文件、随版本变化的可执行文件、空目录和目录内的符号链接
+    (root / 'lib').mkdir(parents=True)
+    (root / 'lib' / 'libA.so.1').write_bytes(b'shared library')
+    if os.name != 'nt':
+        os.symlink('libA.so.1', root / 'lib' / 'libA.so')
+    (root / 'blender').write_bytes(f'#!/bin/sh\necho {version}\n'.encode())
+    os.chmod(root / 'blender', 0o755)
+    (root / 'scripts' / 'addons').mkdir(parents=True)
+    return root
+
+def test_installs_share_inodes(tmp_path):
+    # 同一版本再次安装和不同版本的相同文件都链接到同一个缓存对象
+    store = ContentStore(str(tmp_path / 'store'))
+    first = make_tree(tmp_path / 'a', '4.2.2')
+    store.add_tree('blender-4.2.2-linux-x64.tar.xz', str(first))
+    second = make_tree(tmp_path / 'b', '4.2.3')
+    store.add_tree('blender-4.2.3-linux-x64.tar.xz', str(second))
+    assert (first / 'lib' / 'libA.so.1').stat().st_ino == (second / 'lib' / 'libA.so.1').stat().st_ino
+    assert (first / 'blender').stat().st_ino != (second / 'blender').stat().st_ino
+    
+    copy = tmp_path / 'c'
+    assert store.materialize('blender-4.2.2-linux-x64.tar.xz', str(copy))
+    assert (copy / 'blender').stat().st_ino == (first / 'blender').stat().st_ino
+    assert (copy / 'lib' / 'libA.so.1').stat().st_nlink == 4  # 缓存对象 + 3 个安装目录
+    if os.name != 'nt':
+        assert os.access(copy / 'blender', os.X_OK)
+        assert os.readlink(copy / 'lib' / 'libA.so') == 'libA.so.1'
+    assert (copy / 'scripts' / 'addons').is_dir()
+
+def test_eviction_keeps_linked_objects(tmp_path):
+    # 仍被安装目录硬链接的对象不占缓存空间，超出上限也不淘汰；安装目录删除后才会被淘汰
+    store = ContentStore(str(tmp_path / 'store'), max_size=0)
+    install = make_tree(tmp_path / 'a', '4.2.2')
+    store.add_tree('blender-4.2.2-linux-x64.tar.xz', str(install))
+    archive = tmp_path / 'blender-4.2.2-linux-x64.tar.xz'
+    archive.write_bytes(b'archive')
+    store.add_archive(str(archive), archive.name)
+    assert store.find_archive(archive.name) is None  # 只被缓存引用的压缩包超出上限，立即淘汰
+    assert store.has_tree('blender-4.2.2-linux-x64.tar.xz')
+    
+    (install / 'blender').unlink()
+    store.evict()
+    assert not store.has_tree('blender-4.2.2-linux-x64.tar.xz')
+    assert os.path.exists(store.object_path(file_digest(install / 'lib' / 'libA.so.1')))
+
+@pytest.mark.parametrize('link_mode', ['copy', 'reflink'])
+def test_copy_modes_are_independent(tmp_path, link_mode):
+    # 复制和写时复制得到的是独立的文件，修改安装目录不影响缓存对象
+    store = ContentStore(str(tmp_path / 'store'), link_mode=link_mode)
+    install = make_tree(tmp_path / 'a', '4.2.2')
+    store.add_tree('blender-4.2.2-linux-x64.tar.xz', str(install))
+    copy = tmp_path / 'b'
+    assert store.materialize('blender-4.2.2-linux-x64.tar.xz', str(copy))
+    
+    object_path = store.object_path(file_digest(copy / 'lib' / 'libA.so.1'))
+    for path in (install / 'lib' / 'libA.so.1', copy / 'lib' / 'libA.so.1'):
+        assert path.stat().st_ino != os.stat(object_path).st_ino
+        assert path.stat().st_nlink == 1
+    (copy / 'lib' / 'libA.so.1').write_bytes(b'patched')
+    with open(object_path, 'rb') as file:
+        assert file.read() == b'shared library'
+    assert (install / 'lib' / 'libA.so.1').read_bytes() == b'shared library'
+
+def test_orphans_have_no_install_links(tmp_path):
+    # 只有既没有清单引用、也没有被安装目录硬链接的对象才是孤立对象；对象都已不在的清单也一并清理
+    store = ContentStore(str(tmp_path / 'store'))
+    install = make_tree(tmp_path / 'a', '4.2.2')
+    store.add_tree('blender-4.2.2-linux-x64.tar.xz', str(install))
+    linked = tmp_path / 'linked.bin'
+    linked.write_bytes(b'linked')
+    unreferenced = tmp_path / 'unreferenced.bin'
+    unreferenced.write_bytes(b'unreferenced')
+    linked_object = store.object_path(store.add_object(str(linked))[0])
+    unreferenced_object = store.object_path(store.add_object(str(unreferenced))[0])
+    unreferenced.unlink()
+    assert store.orphans(min_age=0) == [unreferenced_object]
+    assert store.orphans() == []  # 新建的对象可能属于正在进行的安装
+    
+    # 清单引用的对象都被淘汰后清单本身成为孤立文件
+    for path in (install / 'blender', install / 'lib' / 'libA.so.1'):
+        os.remove(store.object_path(file_digest(path), bool(path.stat().st_mode & 0o111)))
+    assert sorted(store.orphans(min_age=0)) == sorted([unreferenced_object, store.manifest_path('blender-4.2.2-linux-x64.tar.xz')])
+    assert os.path.exists(linked_object)
+
+def test_lru_uses_manifests_not_objects(tmp_path):
+    # 使用缓存只更新清单的修改时间，不改动可能与安装目录共享 inode 的对象；淘汰按清单记录的最近使用时间进行
+    store = ContentStore(str(tmp_path / 'store'))
+    names = ['blender-4.2.2-linux-x64.zip', 'blender-4.2.3-linux-x64.zip']
+    objects = []
+    for age, name in zip((100, 50), names):
+        archive = tmp_path / name
+        archive.write_bytes(os.urandom(100))
+        objects.append(store.add_archive(str(archive), name))
+        old = os.stat(objects[-1]).st_mtime - 200
+        os.utime(objects[-1], (old, old))
+        os.utime(store.manifest_path(name), (old + 200 - age, old + 200 - age))
+    mtime = os.stat(objects[0]).st_mtime
+    assert store.find_archive(names[0]) == objects[0]
+    assert os.stat(objects[0]).st_mtime == mtime
+    
+    store.max_size = 150
+    store.evict()
+    assert os.path.exists(objects[0]) and not os.path.exists(objects[1])
+
+def test_materialize_keeps_install_mtimes(tmp_path):
+    # 从缓存链接出新的安装不改动已有安装中文件的修改时间
+    store = ContentStore(str(tmp_path / 'store'))
+    install = make_tree(tmp_path / 'a', '4.2.2')
+    store.add_tree('blender-4.2.2-linux-x64.tar.xz', str(install))
+    os.utime(install / 'lib' / 'libA.so.1', (1000000000, 1000000000))
+    assert store.materialize('blender-4.2.2-linux-x64.tar.xz', str(tmp_path / 'b'))
+    assert (install / 'lib' / 'libA.so.1').stat().st_mtime == 1000000000
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+import core
+from core import VersionManagerCore
+from downloader import JOURNAL_SUFFIX
+from file_remover import REMOVING_SUFFIX
+from mirror_index import IndexCache
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    # 版本文件夹、配置文件和各种缓存都放在临时目录中；下载队列由测试通过 queue 列表提供
+    folder = tmp_path / 'versions'
+    folder.mkdir()
+    config_file = tmp_path / 'config.ini'
+    config_file.write_text(f'[VERSIONS]\n\n[PREFERENCES]\nfolderpath = {folder}\nlanguage = zh_CN\n\n', encoding='utf-8')
+    queue = []
+    monkeypatch.setattr(core, 'read_queue', lambda: list(queue))
+    manager = VersionManagerCore(str(config_file))
+    manager.index_cache = IndexCache(str(tmp_path / 'index'))
+    yield manager, folder, queue
+    manager.shutdown()
+
+def make_file(path, size=1024):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    return path
+
+def test_gc_removes_journaled_partials(manager):
+    # 带断点日志的未完成下载、中断的流式安装和中断的卸载都会被删除，报告释放的空间
+    manager, folder, _queue = manager
+    make_file(folder / 'blender-4.2.3-linux-x64.zip', 4096)
+    make_file(folder / ('blender-4.2.3-linux-x64.zip' + JOURNAL_SUFFIX), 100)
+    make_file(folder / 'Blender 4.1.1' / 'lib' / 'module.so', 2048)
+    make_file(folder / ('Blender 4.1.1' + JOURNAL_SUFFIX), 100)
+    make_file(folder / ('Blender 3.6.5' + REMOVING_SUFFIX) / 'blender', 512)
+    make_file(folder / 'Blender 4.0.2' / 'blender', 512)
+    manager.add_version('Blender 4.0.2', str(folder / 'Blender 4.0.2' / 'blender'))
+    
+    result = manager.gc()
+    assert sorted(os.listdir(folder)) == ['Blender 4.0.2']
+    removed = {os.path.basename(item['path']): (item['kind'], item['size']) for item in result['removed']}
+    assert removed == {
+        'blender-4.2.3-linux-x64.zip': ('download', 4096),
+        'blender-4.2.3-linux-x64.zip' + JOURNAL_SUFFIX: ('download', 100),
+        'Blender 4.1.1': ('extract', 2048),
+        'Blender 4.1.1' + JOURNAL_SUFFIX: ('extract', 100),
+        'Blender 3.6.5' + REMOVING_SUFFIX: ('uninstall', 512),
+    }
+    assert result['freed'] == 4096 + 100 + 2048 + 100 + 512
+    assert result['errors'] == []
+
+def test_gc_skips_queued_jobs(manager):
+    # 下载队列中未完成的任务（排队中、运行中或已暂停）留下的文件不删除
+    manager, folder, queue = manager
+    queue.append({'minor_version': 'blender-4.2.3-linux-x64.zip', 'state': 'queued'})
+    queue.append({'minor_version': 'blender-4.1.1-linux-x64.tar.xz', 'state': 'running'})
+    make_file(folder / 'blender-4.2.3-linux-x64.zip')
+    make_file(folder / ('blender-4.2.3-linux-x64.zip' + JOURNAL_SUFFIX))
+    make_file(folder / 'Blender 4.1.1' / 'blender')
+    make_file(folder / ('Blender 4.1.1' + JOURNAL_SUFFIX))
+    
+    result = manager.gc()
+    assert result['removed'] == []
+    assert sorted(os.listdir(folder)) == sorted([
+        'blender-4.2.3-linux-x64.zip', 'blender-4.2.3-linux-x64.zip' + JOURNAL_SUFFIX,
+        'Blender 4.1.1', 'Blender 4.1.1' + JOURNAL_SUFFIX,
+    ])
+
+def test_gc_forgets_missing_versions(manager):
+    manager, folder, _queue = manager
+    manager.add_version('Blender 2.93.18', str(folder / 'Blender 2.93.18' / 'blender'))
+    # 配置文件中的键不区分大小写，保存为小写
+    assert manager.gc()['stale_versions'] == ['blender 2.93.18']
+    assert 'Blender 2.93.18' not in manager.config['VERSIONS']
+
+def test_gc_lists_unjournaled_archives_as_candidates(manager):
+    # 没有断点日志的压缩包可能是用户自己放进来的：与它同名的未登记安装目录一起只列为待确认项，确认后才删除
+    manager, folder, _queue = manager
+    make_file(folder / 'blender-4.1.1-linux-x64.zip', 4096)
+    make_file(folder / 'Blender 4.1.1' / 'blender', 2048)
+    
+    result = manager.gc()
+    assert result['removed'] == []
+    candidates = {os.path.basename(item['path']): (item['kind'], item['size']) for item in result['candidates']}
+    assert candidates == {'blender-4.1.1-linux-x64.zip': ('download', 4096), 'Blender 4.1.1': ('extract', 2048)}
+    assert sorted(os.listdir(folder)) == ['Blender 4.1.1', 'blender-4.1.1-linux-x64.zip']
+    
+    result = manager.gc(include_archives=True)
+    assert result['candidates'] == []
+    assert result['freed'] == 4096 + 2048
+    assert os.listdir(folder) == []
@@ -0,0 +1,61 @@
+import os
+import random
+import zipfile
+
+import pytest
+
+from delta_installer import DeltaInstaller
+
+# 常量定义
+MEMBER_COUNT = 120
+MEMBER_SIZE = 64 * 1024
+CHANGED_MEMBERS = (3, 100)
+
+def make_archive(path, version, changed=()):
+    # 生成与 Blender 安装包结构相同的 ZIP（顶层目录 + 可执行文件 + 若干不可压缩的文件），可执行文件和 changed 中的成员随版本变化
+    prefix = f'blender-{version}-linux-x64/'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        info = zipfile.ZipInfo(prefix + 'blender')
+        info.external_attr = 0o100755 << 16
+        archive.writestr(info, f'#!/bin/sh\necho "blender {version}"\n')
+        for index in range(MEMBER_COUNT):
+            data = random.Random(index).randbytes(MEMBER_SIZE)
+            if index in changed:
+                data = data[:100] + version.encode() + data[100:]
+            archive.writestr(f'{prefix}lib/module_{index}.bin', data)
+
+@pytest.mark.parametrize('link_mode', ['copy', 'hardlink'])
+def test_delta_install_reuses_unchanged_members(tmp_path, range_server, link_mode):
+    # 补丁版本只下载变化的成员，其余从已安装的旧版本复用，结果与完整解压一致
+    server = range_server()
+    old_archive = tmp_path / 'old.zip'
+    make_archive(old_archive, '4.2.2')
+    with zipfile.ZipFile(old_archive) as archive:
+        archive.extractall(tmp_path / 'old')
+        old_members = {info.filename.split('/', 1)[1]: archive.read(info) for info in archive.infolist()}
+    base_path = str(tmp_path / 'old' / 'blender-4.2.2-linux-x64')
+    
+    name = 'blender-4.2.3-linux-x64.zip'
+    new_archive = tmp_path / 'srv' / name
+    make_archive(new_archive, '4.2.3', CHANGED_MEMBERS)
+    dest = str(tmp_path / 'new')
+    installer = DeltaInstaller(server.url + name, dest, base_path, 2, link_mode=link_mode)
+    installer.install()
+    
+    with zipfile.ZipFile(new_archive) as archive:
+        for info in archive.infolist():
+            relative_path = info.filename.split('/', 1)[1]
+            with open(os.path.join(dest, relative_path), 'rb') as file:
+                assert file.read() == archive.read(info), relative_path
+    if os.name != 'nt':
+        assert os.stat(os.path.join(dest, 'blender')).st_mode & 0o111
+    assert installer.reused_bytes == (MEMBER_COUNT - len(CHANGED_MEMBERS)) * MEMBER_SIZE
+    # 只下载了中央目录和变化的成员，远小于完整压缩包
+    assert server.served_bytes(name) < os.path.getsize(new_archive) // 4
+    # 变化的成员写入新文件，不会通过硬链接改动旧版本
+    for relative_path, data in old_members.items():
+        with open(os.path.join(base_path, relative_path), 'rb') as file:
+            assert file.read() == data, relative_path
+    unchanged = os.path.join('lib', 'module_0.bin')
+    shared = os.path.samefile(os.path.join(base_path, unchanged), os.path.join(dest, unchanged))
+    assert shared == (link_mode == 'hardlink')
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import threading
+
+import pytest
+
+import download_manager
+from downloader import DownloadError, SegmentedDownloader, MIN_SEGMENT_SIZE
+from download_manager import (BandwidthLimiter, DownloadManager, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW,
+                              JOB_QUEUED, JOB_RUNNING, JOB_PAUSED, JOB_DONE, JOB_CANCELLED)
+
+# 常量定义
+TIMEOUT = 5
+
+class FakeTask:
+    # 代替下载器登记到任务上，cancel() 让 runner 以“已取消”退出
+    def __init__(self):
+        self.cancelled = threading.Event()
+    
+    def cancel(self):
+        self.cancelled.set()
+
+class FakeRunner:
+    # 每个任务开始时记录顺序并阻塞，直到测试调用 finish() 或任务被暂停、取消
+    def __init__(self):
+        self.started = []
+        self.cleaned = []
+        self._events = {}
+        self._condition = threading.Condition()
+    
+    def __call__(self, job, limiter):
+        task = FakeTask()
+        finished = threading.Event()
+        with self._condition:
+            self.started.append(job.minor_version)
+            self._events[job.minor_version] = finished
+            self._condition.notify_all()
+        job.set_task(task)
+        while not finished.wait(0.01):
+            if task.cancelled.is_set():
+                raise DownloadError('cancelled')
+    
+    def cleanup(self, job):
+        self.cleaned.append(job.minor_version)
+    
+    def wait_started(self, count):
+        with self._condition:
+            assert self._condition.wait_for(lambda: len(self.started) >= count, TIMEOUT)
+    
+    def finish(self, minor_version):
+        self._events[minor_version].set()
+
+def wait_state(job, state):
+    # 等待任务进入 state；除运行中外还要等工作线程退出
+    deadline = time.monotonic() + TIMEOUT
+    while job.state != state or (job.active and state != JOB_RUNNING):
+        assert time.monotonic() < deadline, (job.state, state)
+        time.sleep(0.01)
+
+@pytest.fixture
+def manager(tmp_path):
+    runner = FakeRunner()
+    manager = DownloadManager(runner, runner.cleanup, str(tmp_path / 'queue.json'), concurrency=1)
+    yield manager, runner
+    manager.shutdown()
+
+def test_priority_order(manager):
+    # 名额空出时按优先级启动，同级按加入顺序
+    manager, runner = manager
+    first = manager.add('Blender4.2', 'blender-4.2.0.zip')
+    runner.wait_started(1)
+    manager.add('Blender4.2', 'blender-4.2.1.zip', PRIORITY_LOW)
+    manager.add('Blender4.2', 'blender-4.2.2.zip', PRIORITY_NORMAL)
+    manager.add('Blender4.2', 'blender-4.2.3.zip', PRIORITY_HIGH)
+    manager.add('Blender4.2', 'blender-4.2.4.zip', PRIORITY_NORMAL)
+    runner.finish('blender-4.2.0.zip')
+    wait_state(first, JOB_DONE)
+    for count in range(2, 6):
+        runner.wait_started(count)
+        runner.finish(runner.started[-1])
+    assert runner.started == ['blender-4.2.0.zip', 'blender-4.2.3.zip', 'blender-4.2.2.zip', 'blender-4.2.4.zip', 'blender-4.2.1.zip']
+
+def test_pause_resume_cancel(manager, tmp_path):
+    manager, runner = manager
+    job = manager.add('Blender4.2', 'blender-4.2.3.zip')
+    runner.wait_started(1)
+    assert job.state == JOB_RUNNING
+    
+    # 暂停后工作线程退出但任务保持暂停，队列文件中也是暂停状态
+    manager.pause(job.id)
+    wait_state(job, JOB_PAUSED)
+    restored = DownloadManager(runner, runner.cleanup, str(tmp_path / 'queue.json'))
+    restored.load()
+    assert [(item.id, item.state) for item in restored.jobs] == [(job.id, JOB_PAUSED)]
+    
+    manager.resume(job.id)
+    runner.wait_started(2)
+    wait_state(job, JOB_RUNNING)
+    
+    # 取消运行中的任务时等线程退出后再清理文件
+    manager.cancel(job.id)
+    wait_state(job, JOB_CANCELLED)
+    assert runner.cleaned == ['blender-4.2.3.zip']
+    
+    # 取消排队中的任务立即清理，不会启动
+    other = manager.add('Blender4.2', 'blender-4.2.4.zip')
+    runner.wait_started(3)
+    queued = manager.add('Blender4.2', 'blender-4.2.5.zip')
+    assert queued.state == JOB_QUEUED
+    manager.cancel(queued.id)
+    assert runner.cleaned == ['blender-4.2.3.zip', 'blender-4.2.5.zip']
+    runner.finish('blender-4.2.4.zip')
+    wait_state(other, JOB_DONE)
+    assert runner.started == ['blender-4.2.3.zip', 'blender-4.2.3.zip', 'blender-4.2.4.zip']
+
+def test_interrupted_jobs_are_requeued(tmp_path):
+    # 退出时运行中的任务重新排队，下次启动后继续
+    runner = FakeRunner()
+    manager = DownloadManager(runner, runner.cleanup, str(tmp_path / 'queue.json'))
+    job = manager.add('Blender4.2', 'blender-4.2.3.zip')
+    runner.wait_started(1)
+    manager.shutdown()
+    
+    restored = DownloadManager(runner, runner.cleanup, str(tmp_path / 'queue.json'))
+    restored.load()
+    runner.wait_started(2)
+    assert restored.jobs[0].id == job.id
+    runner.finish('blender-4.2.3.zip')
+    wait_state(restored.jobs[0], JOB_DONE)
+    assert not restored.snapshot()[0].error
+
+def test_concurrent_saves(tmp_path):
+    # 界面线程和多个工作线程同时保存队列文件
+    manager = DownloadManager(FakeRunner(), queue_path=str(tmp_path / 'queue.json'), concurrency=1)
+    for index in range(20):
+        manager.add('Blender4.2', f'blender-4.2.{index}.zip')
+    errors = []
+    
+    def save():
+        try:
+            for _index in range(50):
+                manager.save()
+        except OSError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=save) for _index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.shutdown()
+    assert errors == []
+    assert len(json.loads((tmp_path / 'queue.json').read_text(encoding='utf-8'))) == 20
+
+def test_bandwidth_limiter_with_fake_clock(monkeypatch):
+    # 令牌桶允许 1 秒的突发，超出后按欠账睡眠
+    clock = [100.0]
+    sleeps = []
+    
+    def sleep(delay):
+        sleeps.append(delay)
+        clock[0] += delay
+    
+    monkeypatch.setattr(download_manager.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(download_manager.time, 'sleep', sleep)
+    limiter = BandwidthLimiter(1000)
+    limiter.consume(1000)
+    assert sleeps == []
+    limiter.consume(500)
+    assert sleeps == [0.5]
+    clock[0] += 2
+    limiter.consume(800)
+    assert sleeps == [0.5]
+    limiter.set_rate(0)
+    limiter.consume(10 ** 9)
+    assert sleeps == [0.5]
+
+def test_shared_bandwidth_limit(tmp_path, range_server):
+    # 两个同时进行的下载共享同一个上限，总耗时不少于超出突发额度部分按上限传完的时间
+    server = range_server()
+    for name in ('a.bin', 'b.bin'):
+        (tmp_path / 'srv' / name).write_bytes(os.urandom(MIN_SEGMENT_SIZE))
+    limiter = BandwidthLimiter(MIN_SEGMENT_SIZE)
+    downloads = [SegmentedDownloader(server.url + name, str(tmp_path / name), 2, limiter=limiter) for name in ('a.bin', 'b.bin')]
+    threads = [threading.Thread(target=downloader.download) for downloader in downloads]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    assert 0.9 <= elapsed < TIMEOUT
+    for name in ('a.bin', 'b.bin'):
+        assert (tmp_path / name).read_bytes() == (tmp_path / 'srv' / name).read_bytes()
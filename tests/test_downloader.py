@@ -0,0 +1,139 @@
+import os
+import zipfile
+import hashlib
+
+import pytest
+import requests
+
+from downloader import SegmentedDownloader, DownloadJournal, ChecksumError, JOURNAL_SUFFIX, MIN_SEGMENT_SIZE
+from mirrors import rank_mirrors, select_mirrors
+from progress import ProgressCounter
+
+# 常量定义
+FILE_SIZE = 8 * MIN_SEGMENT_SIZE
+DEAD_URL = 'http://127.0.0.1:1/'  # 没有服务监听的端口，连接立即被拒绝
+
+@pytest.fixture
+def payload(tmp_path):
+    data = os.urandom(FILE_SIZE)
+    (tmp_path / 'srv' / 'a.bin').write_bytes(data)
+    return data
+
+def test_segmented_download(tmp_path, range_server, payload):
+    # 按线程数分段并行下载，每个分段一个 Range 请求，拼出的文件与原文件一致
+    server = range_server()
+    target = str(tmp_path / 'a.bin')
+    progress = ProgressCounter()
+    downloader = SegmentedDownloader(server.url + 'a.bin', target, 4, progress)
+    downloader.download()
+    with open(target, 'rb') as file:
+        assert file.read() == payload
+    # 1 个探测请求 + 4 个互不重叠的分段请求
+    assert len({byte_range for _command, _path, byte_range in server.requests}) == 5
+    assert server.served_bytes('a.bin') == FILE_SIZE + 1
+    assert (progress.done, progress.total) == (FILE_SIZE, FILE_SIZE)
+
+def test_resume_after_interrupted_transfer(tmp_path, range_server, payload):
+    # 传输中途断开后留下 .vmtpart 日志，下一次下载只请求缺失的区间，并且整体摘要仍然正确
+    server = range_server()
+    server.abort_after = MIN_SEGMENT_SIZE
+    target = str(tmp_path / 'a.bin')
+    checksum = ('sha256', hashlib.sha256(payload).hexdigest())
+    with pytest.raises(requests.exceptions.RequestException):
+        SegmentedDownloader(server.url + 'a.bin', target, 4, max_attempts=1, checksum=checksum).download()
+    
+    journal = DownloadJournal(target + JOURNAL_SUFFIX)
+    assert journal.load()
+    completed = journal.completed_size()
+    assert 0 < completed < FILE_SIZE
+    
+    server.abort_after = None
+    server.requests.clear()
+    SegmentedDownloader(server.url + 'a.bin', target, 4, checksum=checksum).download()
+    with open(target, 'rb') as file:
+        assert file.read() == payload
+    assert not os.path.exists(target + JOURNAL_SUFFIX)
+    # 探测请求的 1 字节加上缺失的区间
+    assert server.served_bytes('a.bin') == FILE_SIZE - completed + 1
+
+def test_dropped_connection_fails_over_to_next_mirror(tmp_path, range_server, payload):
+    # 一个镜像在传输中途断开时，分段从断开处改由另一个镜像下载，整个下载不失败
+    broken = range_server()
+    healthy = range_server()
+    broken.abort_after = 64 * 1024
+    target = str(tmp_path / 'a.bin')
+    downloader = SegmentedDownloader(broken.url + 'a.bin', target, 4, mirrors=[healthy.url + 'a.bin'])
+    downloader.download()
+    with open(target, 'rb') as file:
+        assert file.read() == payload
+    assert broken.url + 'a.bin' in downloader.failed_urls
+    assert healthy.served_bytes('a.bin') > 0
+
+def test_truncated_segment_fails_over_to_next_mirror(tmp_path, range_server, payload):
+    # 一个镜像返回长度不足的 206 正文时，分段从断开处改由另一个镜像下载，整个下载不失败
+    broken = range_server()
+    healthy = range_server()
+    broken.truncate_to = 1024
+    target = str(tmp_path / 'a.bin')
+    downloader = SegmentedDownloader(broken.url + 'a.bin', target, 4, mirrors=[healthy.url + 'a.bin'])
+    downloader.download()
+    with open(target, 'rb') as file:
+        assert file.read() == payload
+    assert broken.url + 'a.bin' in downloader.failed_urls
+    assert healthy.served_bytes('a.bin') > 0
+
+def test_standby_mirror_used_when_primary_is_down(tmp_path, range_server, payload):
+    # 首选镜像无法连接时探测请求改用备用镜像
+    server = range_server()
+    target = str(tmp_path / 'a.bin')
+    downloader = SegmentedDownloader(DEAD_URL + 'a.bin', target, 4, standby_mirrors=[server.url + 'a.bin'])
+    downloader.download()
+    with open(target, 'rb') as file:
+        assert file.read() == payload
+    assert downloader.probe_url == server.url + 'a.bin'
+
+def test_rank_mirrors(range_server, payload):
+    # 可用镜像排在前面，无法连接的镜像带着错误排在最后，只作为备用
+    server = range_server()
+    stats = rank_mirrors([DEAD_URL + 'a.bin', server.url + 'a.bin'])
+    assert [item.url for item in stats] == [server.url + 'a.bin', DEAD_URL + 'a.bin']
+    assert stats[0].error is None and stats[0].throughput > 0
+    assert stats[1].error is not None
+    assert select_mirrors(stats) == ([server.url + 'a.bin'], [DEAD_URL + 'a.bin'])
+
+def test_server_without_range_support(tmp_path, range_server, payload):
+    # 服务器忽略 Range 时退回单连接下载，探测请求的响应直接作为整个文件
+    server = range_server()
+    server.ranges = False
+    target = str(tmp_path / 'a.bin')
+    checksum = ('sha256', hashlib.sha256(payload).hexdigest())
+    downloader = SegmentedDownloader(server.url + 'a.bin', target, 4, checksum=checksum)
+    downloader.download()
+    with open(target, 'rb') as file:
+        assert file.read() == payload
+    assert downloader.total_size == FILE_SIZE
+    assert not os.path.exists(target + JOURNAL_SUFFIX)
+    assert [command for command, _path, _range in server.requests] == ['GET']
+
+def test_corrupt_member_is_refetched(tmp_path, range_server):
+    # 整体摘要不一致时按 ZIP 成员 CRC 找出损坏的成员，只重新下载它所在的区间
+    server = range_server()
+    archive_path = tmp_path / 'srv' / 'a.zip'
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        for index in range(8):
+            archive.writestr(f'blender/lib/module_{index}.bin', os.urandom(MIN_SEGMENT_SIZE))
+    with zipfile.ZipFile(archive_path) as archive:
+        infos = sorted(archive.infolist(), key=lambda info: info.header_offset)
+    data = archive_path.read_bytes()
+    server.corrupt_at = infos[5].header_offset + 1000
+    target = str(tmp_path / 'a.zip')
+    SegmentedDownloader(server.url + 'a.zip', target, 4, checksum=('sha256', hashlib.sha256(data).hexdigest())).download()
+    with open(target, 'rb') as file:
+        assert file.read() == data
+    assert server.served_bytes('a.zip') == len(data) + 1 + infos[6].header_offset - infos[5].header_offset
+
+def test_checksum_mismatch(tmp_path, range_server, payload):
+    # 不是 ZIP 的文件无法定位损坏区间，整体重新下载后仍不一致时报告校验失败
+    server = range_server()
+    with pytest.raises(ChecksumError):
+        SegmentedDownloader(server.url + 'a.bin', str(tmp_path / 'a.bin'), 4, checksum=('sha256', '0' * 64)).download()
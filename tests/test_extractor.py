@@ -0,0 +1,186 @@
+import io
+import os
+import json
+import hashlib
+import tarfile
+import zipfile
+
+import pytest
+import requests
+
+from downloader import ChecksumError, JOURNAL_SUFFIX, STREAM_BLOCK_SIZE
+from extractor import StreamingInstaller, EOCD_SEARCH_SIZE, extract_archive
+
+# 常量定义
+PREFIX = 'blender-4.2.3-linux-x64/'
+MEMBER_COUNT = 12
+MEMBER_SIZE = 1024 * 1024
+
+def make_archive(path):
+    # 生成带顶层目录的 ZIP，成员为不可压缩的数据，返回 {相对路径: 内容}
+    members = {'blender': b'#!/bin/sh\necho blender\n'}
+    for index in range(MEMBER_COUNT):
+        members[f'lib/module_{index}.bin'] = os.urandom(MEMBER_SIZE)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(PREFIX + name, data)
+    return members
+
+def assert_tree(dest, members):
+    for name, data in members.items():
+        with open(os.path.join(dest, name), 'rb') as file:
+            assert file.read() == data, name
+
+def test_stream_install(tmp_path, range_server):
+    # 去掉顶层目录后直接解压到目标目录，不在磁盘上保留压缩包，也不留下断点日志
+    server = range_server()
+    members = make_archive(tmp_path / 'srv' / 'a.zip')
+    dest = str(tmp_path / 'dest')
+    StreamingInstaller(server.url + 'a.zip', dest, 2).install()
+    assert_tree(dest, members)
+    assert not os.path.exists(dest + JOURNAL_SUFFIX)
+    assert server.served_bytes('a.zip') < os.path.getsize(tmp_path / 'srv' / 'a.zip') + EOCD_SEARCH_SIZE
+
+def test_resume_after_interrupted_stream(tmp_path, range_server):
+    # 传输中途断开后按日志跳过已解压的成员，续传只请求中央目录和剩余的成员
+    server = range_server()
+    archive_path = tmp_path / 'srv' / 'a.zip'
+    members = make_archive(archive_path)
+    with zipfile.ZipFile(archive_path) as archive:
+        infos = sorted(archive.infolist(), key=lambda info: info.header_offset)
+        cd_offset = archive.start_dir
+    dest = str(tmp_path / 'dest')
+    server.abort_after = 1024
+    server.abort_at = 2 * STREAM_BLOCK_SIZE
+    with pytest.raises(requests.exceptions.RequestException):
+        StreamingInstaller(server.url + 'a.zip', dest, 1, max_attempts=1).install()
+    
+    with open(dest + JOURNAL_SUFFIX, 'r', encoding='utf-8') as file:
+        extracted = json.load(file)['extracted']
+    assert 0 < extracted < len(infos)
+    
+    server.abort_after = None
+    server.requests.clear()
+    StreamingInstaller(server.url + 'a.zip', dest, 2).install()
+    assert_tree(dest, members)
+    assert not os.path.exists(dest + JOURNAL_SUFFIX)
+    assert server.served_bytes('a.zip') == EOCD_SEARCH_SIZE + cd_offset - infos[extracted].header_offset
+
+def test_corrupt_member_fails(tmp_path, range_server):
+    # 成员数据与中央目录中的 CRC 不一致时安装失败
+    server = range_server()
+    archive_path = tmp_path / 'srv' / 'a.zip'
+    make_archive(archive_path)
+    with zipfile.ZipFile(archive_path) as archive:
+        info = archive.getinfo(PREFIX + 'lib/module_3.bin')
+    with open(archive_path, 'r+b') as file:
+        file.seek(info.header_offset + 30 + len(info.filename) + 100)
+        byte = file.read(1)
+        file.seek(-1, os.SEEK_CUR)
+        file.write(bytes([byte[0] ^ 0xFF]))
+    with pytest.raises(zipfile.BadZipFile):
+        StreamingInstaller(server.url + 'a.zip', str(tmp_path / 'dest'), 2).install()
+
+def test_corrupt_block_refetches_member(tmp_path, range_server):
+    # 传输中损坏的成员 CRC 不一致时只重新下载这一个成员；整体摘要已包含损坏的数据，不再据此判定失败
+    server = range_server()
+    archive_path = tmp_path / 'srv' / 'a.zip'
+    members = make_archive(archive_path)
+    with zipfile.ZipFile(archive_path) as archive:
+        info = archive.getinfo(PREFIX + 'lib/module_3.bin')
+        cd_offset = archive.start_dir
+    server.corrupt_at = info.header_offset + 30 + len(info.filename) + 100
+    checksum = ('sha256', hashlib.sha256(archive_path.read_bytes()).hexdigest())
+    dest = str(tmp_path / 'dest')
+    installer = StreamingInstaller(server.url + 'a.zip', dest, 2, checksum=checksum)
+    installer.install()
+    assert_tree(dest, members)
+    assert installer.hasher is None
+    assert server.served_bytes('a.zip') == EOCD_SEARCH_SIZE + cd_offset + info.compress_size
+
+def test_checksum_mismatch(tmp_path, range_server):
+    # 各成员 CRC 都正确但整体摘要与镜像发布的不一致
+    server = range_server()
+    make_archive(tmp_path / 'srv' / 'a.zip')
+    with pytest.raises(ChecksumError):
+        StreamingInstaller(server.url + 'a.zip', str(tmp_path / 'dest'), 2, checksum=('sha256', '0' * 64)).install()
+
+def make_tar(path, members):
+    # members 为 TarInfo 列表，普通文件的内容为其名称
+    with tarfile.open(path, 'w:xz') as archive:
+        for info in members:
+            data = info.name.encode()
+            if info.isreg():
+                info.size = len(data)
+            archive.addfile(info, io.BytesIO(data) if info.isreg() else None)
+
+def tar_member(name, kind=tarfile.REGTYPE, linkname=''):
+    info = tarfile.TarInfo(name)
+    info.type = kind
+    info.linkname = linkname
+    info.mode = 0o755 if kind == tarfile.DIRTYPE else 0o644
+    return info
+
+def test_extract_zip_in_parallel(tmp_path):
+    # 多线程解压时去掉顶层目录，内容与压缩包一致
+    archive_path = tmp_path / 'a.zip'
+    members = make_archive(archive_path)
+    dest = str(tmp_path / 'dest')
+    extract_archive(str(archive_path), dest, workers=4)
+    assert_tree(dest, members)
+
+def test_extract_tar_with_links(tmp_path):
+    # tar 包中的目录内符号链接和硬链接按原样还原
+    archive_path = tmp_path / 'a.tar.xz'
+    make_tar(archive_path, [
+        tar_member('blender-4.2.3-linux-x64', tarfile.DIRTYPE),
+        tar_member('blender-4.2.3-linux-x64/lib/libA.so.1'),
+        tar_member('blender-4.2.3-linux-x64/lib/libA.so', tarfile.SYMTYPE, 'libA.so.1'),
+        tar_member('blender-4.2.3-linux-x64/lib/libB.so', tarfile.LNKTYPE, 'blender-4.2.3-linux-x64/lib/libA.so.1'),
+    ])
+    dest = tmp_path / 'dest'
+    extract_archive(str(archive_path), str(dest))
+    assert (dest / 'lib' / 'libA.so.1').read_bytes() == b'blender-4.2.3-linux-x64/lib/libA.so.1'
+    assert (dest / 'lib' / 'libA.so').read_bytes() == (dest / 'lib' / 'libA.so.1').read_bytes()
+    assert (dest / 'lib' / 'libB.so').read_bytes() == (dest / 'lib' / 'libA.so.1').read_bytes()
+    if os.name != 'nt':
+        assert os.readlink(dest / 'lib' / 'libA.so') == 'libA.so.1'
+
+def test_extract_tar_with_dot_prefix(tmp_path):
+    # "tar -C dir ." 打包的成员名和硬链接目标都带 "./" 前缀，去掉后与顶层文件夹前缀一起剥离
+    archive_path = tmp_path / 'a.tar.xz'
+    make_tar(archive_path, [
+        tar_member('./', tarfile.DIRTYPE),
+        tar_member('./blender-4.2.3-linux-x64', tarfile.DIRTYPE),
+        tar_member('./blender-4.2.3-linux-x64/lib/libA.so.1'),
+        tar_member('./blender-4.2.3-linux-x64/lib/libB.so', tarfile.LNKTYPE, './blender-4.2.3-linux-x64/lib/libA.so.1'),
+    ])
+    dest = tmp_path / 'dest'
+    extract_archive(str(archive_path), str(dest))
+    assert sorted(os.listdir(dest / 'lib')) == ['libA.so.1', 'libB.so']
+    assert (dest / 'lib' / 'libB.so').read_bytes() == b'./blender-4.2.3-linux-x64/lib/libA.so.1'
+
+@pytest.mark.parametrize('name', ['../evil', 'blender/../../evil', '/tmp/evil'])
+def test_zip_member_outside_dest(tmp_path, name):
+    archive_path = tmp_path / 'a.zip'
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr('blender/readme.txt', 'ok')
+        archive.writestr(name, 'evil')
+    with pytest.raises(zipfile.BadZipFile):
+        extract_archive(str(archive_path), str(tmp_path / 'dest'))
+    assert not os.path.exists(tmp_path / 'evil')
+
+@pytest.mark.parametrize('member', [
+    tar_member('blender/../../evil'),
+    tar_member('/tmp/evil'),
+    tar_member('blender/link', tarfile.SYMTYPE, '../../evil'),
+    tar_member('blender/link', tarfile.SYMTYPE, '/tmp/evil'),
+    tar_member('blender/link', tarfile.LNKTYPE, '../evil'),
+    tar_member('blender/link', tarfile.LNKTYPE, './'),
+], ids=['parent', 'absolute', 'symlink-parent', 'symlink-absolute', 'hardlink-parent', 'hardlink-dot'])
+def test_tar_member_outside_dest(tmp_path, member):
+    archive_path = tmp_path / 'a.tar.xz'
+    make_tar(archive_path, [tar_member('blender', tarfile.DIRTYPE), tar_member('blender/readme.txt'), member])
+    with pytest.raises((zipfile.BadZipFile, tarfile.TarError)):
+        extract_archive(str(archive_path), str(tmp_path / 'dest'))
+    assert not os.path.lexists(tmp_path / 'evil')
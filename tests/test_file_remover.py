@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from file_remover import TreeRemover, RemovalCancelled, mark_removing, REMOVING_SUFFIX
+from progress import ProgressCounter
+
+def make_tree(root, count=50):
+    for index in range(count):
+        path = root / f'dir_{index % 5}' / f'sub_{index % 3}' / f'file_{index}.bin'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x' * 100)
+    return root
+
+def test_remove_reports_freed_space(tmp_path):
+    # 删除整棵目录树；仍有其他硬链接的文件不计入释放的空间，目录外的符号链接目标不受影响
+    tree = make_tree(tmp_path / 'Blender 4.2.3')
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    (outside / 'keep.txt').write_bytes(b'keep')
+    if os.name != 'nt':
+        os.symlink(outside, tree / 'link')
+        os.link(tree / 'dir_0' / 'sub_0' / 'file_0.bin', tmp_path / 'shared.bin')
+    single = tmp_path / 'blender-4.2.3-linux-x64.zip'
+    single.write_bytes(b'y' * 300)
+    
+    progress = ProgressCounter()
+    remover = TreeRemover(workers=4, progress=progress)
+    freed = remover.remove([str(tree), str(single)])
+    assert not tree.exists() and not single.exists()
+    assert (outside / 'keep.txt').read_bytes() == b'keep'
+    # 符号链接按链接本身的大小计算
+    expected = 49 * 100 + len(str(outside)) if os.name != 'nt' else 50 * 100
+    assert freed == {str(tree): expected, str(single): 300}
+    assert progress.done == progress.total == (52 if os.name != 'nt' else 51)
+    assert remover.errors == []
+
+def test_cancel(tmp_path):
+    # 取消后停止删除并抛出 RemovalCancelled，剩余的文件保留
+    tree = make_tree(tmp_path / 'Blender 4.2.3', 1000)
+    class CancellingCounter(ProgressCounter):
+        def add(self, amount):
+            super().add(amount)
+            if self.done >= 100:
+                remover.cancel()
+    
+    remover = TreeRemover(workers=2, progress=CancellingCounter())
+    with pytest.raises(RemovalCancelled):
+        remover.remove([str(tree)])
+    remaining = sum(len(files) for _root, _dirs, files in os.walk(tree))
+    assert 0 < remaining < 1000
+
+def test_mark_removing(tmp_path):
+    # 改名为 .removing 后版本立即从列表中消失；重名时加序号
+    first = tmp_path / 'Blender 4.2.3'
+    first.mkdir()
+    (tmp_path / ('Blender 4.2.3' + REMOVING_SUFFIX)).mkdir()
+    target = mark_removing(str(first))
+    assert target == str(tmp_path / ('Blender 4.2.3.1' + REMOVING_SUFFIX))
+    assert not first.exists() and os.path.isdir(target)
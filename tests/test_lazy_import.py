@@ -0,0 +1,41 @@
+import os
+import sys
+import threading
+import subprocess
+
+from lazy_import import lazy_import, LazyModule
+
+def test_import_on_first_use(monkeypatch):
+    # 创建代理时不导入模块，第一次访问属性时才导入；已导入的模块直接返回
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    module = lazy_import('colorsys')
+    assert isinstance(module, LazyModule)
+    assert 'colorsys' not in sys.modules
+    assert module.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert 'colorsys' in sys.modules
+    assert lazy_import('colorsys') is sys.modules['colorsys']
+
+def test_concurrent_first_use(monkeypatch):
+    # 多个线程同时第一次访问时都拿到同一个完整初始化的模块
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    module = lazy_import('colorsys')
+    barrier = threading.Barrier(8)
+    results = []
+    
+    def use():
+        barrier.wait()
+        results.append(module.hsv_to_rgb)
+    
+    threads = [threading.Thread(target=use) for _index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8 and len(set(results)) == 1
+
+def test_cli_does_not_import_requests():
+    # 命令行启动时不加载 requests，只有访问网络的命令才会用到
+    script = 'import gettext, sys; gettext.install("messages"); import cli; print("requests" in sys.modules)'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
@@ -0,0 +1,159 @@
+import os
+import time
+import calendar
+
+import pytest
+
+from mirror_index import IndexCache, ListingEntry, VersionCatalogue, parse_listing
+
+# 常量定义
+MTIME = calendar.timegm((2024, 10, 15, 10, 20, 0))
+MIB = 1024 * 1024
+
+def write_page(root, body, mtime):
+    # 写入目录页并固定修改时间，ETag 只取决于长度和修改时间
+    path = root / 'index.html'
+    path.write_text(body, encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+def test_fresh_entry_is_served_from_disk(tmp_path, range_server):
+    server = range_server()
+    write_page(tmp_path / 'srv', 'v1', 1000000000)
+    cache = IndexCache(str(tmp_path / 'index'), ttl=3600)
+    assert cache.fetch(server.url + 'index.html') == 'v1'
+    write_page(tmp_path / 'srv', 'v2', 1000000001)
+    # 新建的缓存对象也从磁盘读取，未过期时不发请求
+    assert IndexCache(str(tmp_path / 'index'), ttl=3600).fetch(server.url + 'index.html') == 'v1'
+    assert len(server.requests) == 1
+
+def test_expired_entry_revalidates_with_etag(tmp_path, range_server):
+    # 过期后发送 If-None-Match；304 时保留缓存内容并刷新缓存时间
+    server = range_server()
+    url = server.url + 'index.html'
+    write_page(tmp_path / 'srv', 'v1', 1000000000)
+    cache = IndexCache(str(tmp_path / 'index'), ttl=0)
+    entry = cache.revalidate(url, None)
+    # 长度和修改时间不变，服务器认为内容未变化并返回 304
+    write_page(tmp_path / 'srv', 'v2', 1000000000)
+    assert cache.fetch(url, background_refresh=False) == 'v1'
+    assert cache.get(url)['fetched_at'] >= entry['fetched_at']
+    
+    write_page(tmp_path / 'srv', 'v3', 1000000001)
+    assert cache.fetch(url, background_refresh=False) == 'v3'
+    assert cache.get(url)['etag'] == '"2-1000000001"'
+    assert len(server.requests) == 3
+
+def test_expired_entry_refreshes_in_background(tmp_path, range_server):
+    # 过期后先返回旧内容，后台重新验证完成后缓存更新为新内容
+    server = range_server()
+    url = server.url + 'index.html'
+    write_page(tmp_path / 'srv', 'v1', 1000000000)
+    cache = IndexCache(str(tmp_path / 'index'), ttl=0)
+    cache.fetch(url)
+    write_page(tmp_path / 'srv', 'v2', 1000000001)
+    assert cache.fetch(url) == 'v1'
+    deadline = time.time() + 5
+    while cache.get(url)['body'] != 'v2':
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+def test_eviction_keeps_recent_entries(tmp_path):
+    # 超出容量时删除最久未使用的条目
+    cache = IndexCache(str(tmp_path / 'index'), max_size=3000)
+    for index in range(3):
+        cache.put(f'http://mirror/{index}/', 'x' * 1000)
+        entry_path = cache.entry_path(f'http://mirror/{index}/')
+        os.utime(entry_path, (1000000000 + index, 1000000000 + index))
+    cache.put('http://mirror/3/', 'x' * 1000)
+    assert cache.get('http://mirror/0/') is None
+    assert cache.get('http://mirror/3/')['body'] == 'x' * 1000
+
+@pytest.mark.parametrize('page, expected', [
+    # Apache autoindex 表格
+    ('<tr><td valign="top"><img src="/icons/folder.gif" alt="[DIR]"></td><td><a href="Blender4.2/">Blender4.2/</a></td>'
+     '<td align="right">2024-10-15 10:20  </td><td align="right">  - </td><td>&nbsp;</td></tr>\n'
+     '<tr><td valign="top"><img src="/icons/compressed.gif" alt="[   ]"></td><td><a href="blender-4.2.3-windows-x64.zip">blender-4.2.3-windows-x64.zip</a></td>'
+     '<td align="right">2024-10-15 10:20  </td><td align="right">330M</td><td>&nbsp;</td></tr>\n',
+     [ListingEntry('Blender4.2', 'Blender4.2/', True, None, MTIME),
+      ListingEntry('blender-4.2.3-windows-x64.zip', 'blender-4.2.3-windows-x64.zip', False, 330 * MIB, MTIME)]),
+    # nginx autoindex <pre>
+    ('<pre><a href="../">../</a>\n'
+     '<a href="Blender4.2/">Blender4.2/</a>                                        15-Oct-2024 10:20                   -\n'
+     '<a href="blender-4.2.3-linux-x64.tar.xz">blender-4.2.3-linux-x64.tar.xz</a>                    15-Oct-2024 10:20:00           346030080\n</pre>',
+     [ListingEntry('Blender4.2', 'Blender4.2/', True, None, MTIME),
+      ListingEntry('blender-4.2.3-linux-x64.tar.xz', 'blender-4.2.3-linux-x64.tar.xz', False, 346030080, MTIME)]),
+    # 阿里云镜像（fancyindex 表格，大小在日期之前）
+    ('<tr><td class="link"><a href="../">Parent directory/</a></td><td class="size">-</td><td class="date">-</td></tr>\n'
+     '<tr><td class="link"><a href="blender-4.2.3-macos-arm64.dmg" title="blender-4.2.3-macos-arm64.dmg">blender-4.2.3-macos-arm64.dmg</a></td>'
+     '<td class="size">330.0 MiB</td><td class="date">2024-Oct-15 10:20</td></tr>\n',
+     [ListingEntry('blender-4.2.3-macos-arm64.dmg', 'blender-4.2.3-macos-arm64.dmg', False, 330 * MIB, MTIME)]),
+], ids=['apache', 'nginx', 'aliyun'])
+def test_parse_listing(page, expected):
+    assert parse_listing(page) == expected
+
+def test_parse_listing_malformed_rows():
+    # 排序链接、上级目录、绝对路径、外部链接和子目录中的文件不算作条目；缺少日期或大小的行仍然保留名称
+    page = (
+        '<a href="?C=N;O=D">Name</a><a href="?C=M;O=A">Last modified</a>'
+        '<a href="../">Parent Directory</a><a href="/release/">release</a>'
+        '<a href="https://www.blender.org/">blender.org</a><a href="Blender4.2/blender.zip">nested</a>\n'
+        '<a href="blender%204.2&amp;x.zip">blender 4.2&amp;x.zip</a>   garbage 99-Foo-2024 25:99\n'
+        '<a href="blender-4.2.0.zip">blender-4.2.0.zip\n'
+        "<a href='blender-4.2.1.zip'>blender-4.2.1.zip</a> 15-Oct-2024 10:20 1.5G\n"
+        '<a href="">empty</a>'
+    )
+    assert parse_listing(page) == [
+        ListingEntry('blender 4.2&x.zip', 'blender%204.2&x.zip', False, None, None),
+        ListingEntry('blender-4.2.0.zip', 'blender-4.2.0.zip', False, None, None),
+        ListingEntry('blender-4.2.1.zip', 'blender-4.2.1.zip', False, int(1.5 * 1024 * MIB), MTIME),
+    ]
+
+def write_listing(directory, names):
+    # 生成 nginx 风格的目录页
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = ''.join(f'<a href="{name}">{name}</a>    15-Oct-2024 10:20    {0 if name.endswith("/") else 1000}\n' for name in names)
+    (directory / 'index.html').write_text(f'<pre><a href="../">../</a>\n{rows}</pre>', encoding='utf-8')
+
+@pytest.fixture
+def catalogue(tmp_path, range_server):
+    # 镜像上有 3 个大版本目录，每个目录中有不同平台的安装包和校验文件
+    server = range_server()
+    release = tmp_path / 'srv' / 'release'
+    write_listing(release, ['Blender2.79/', 'Blender3.6/', 'Blender4.2/', 'documentation/', 'blender-logo.png'])
+    write_listing(release / 'Blender2.79', ['blender-2.79-linux-glibc219-x86_64.tar.bz2', 'blender-2.79b-linux-glibc219-x86_64.tar.bz2', 'blender-2.79b-windows64.zip'])
+    write_listing(release / 'Blender3.6', ['blender-3.6.0-linux-x64.tar.xz', 'blender-3.6.13-linux-x64.tar.xz', 'blender-3.6.13-windows-x64.zip', 'blender-3.6.13.sha256'])
+    write_listing(release / 'Blender4.2', ['blender-4.2.3-linux-x64.tar.xz', 'blender-4.2.10-linux-x64.tar.xz', 'blender-4.2.10-windows-x64.zip'])
+    catalogue = VersionCatalogue(IndexCache(str(tmp_path / 'index')), server.url + 'release')
+    yield server, catalogue
+    catalogue.shutdown()
+
+def test_catalogue_merges_all_majors(catalogue):
+    # 预取后跨大版本按版本号从新到旧排列，每个目录页只请求一次
+    server, catalogue = catalogue
+    assert [entry.name for entry in catalogue.load_majors()] == ['Blender2.79', 'Blender3.6', 'Blender4.2']
+    catalogue.prefetch()
+    catalogue.wait()
+    assert [entry.name for _major, entry in catalogue.search(platform='linux')] == [
+        'blender-4.2.10-linux-x64.tar.xz',
+        'blender-4.2.3-linux-x64.tar.xz',
+        'blender-3.6.13-linux-x64.tar.xz',
+        'blender-3.6.0-linux-x64.tar.xz',
+        'blender-2.79b-linux-glibc219-x86_64.tar.bz2',
+        'blender-2.79-linux-glibc219-x86_64.tar.bz2',
+    ]
+    assert [entry.name for _major, entry in catalogue.search('2.79', 'windows')] == ['blender-2.79b-windows64.zip']
+    assert catalogue.latest('3.6', 'windows-x64') == ('Blender3.6', catalogue.get_minors('Blender3.6')[2])
+    assert catalogue.latest('3.6.1') is None
+    assert len(server.requests) == 4
+
+def test_catalogue_skips_failed_major(catalogue, tmp_path):
+    # 某个大版本的目录页下载失败时不影响其他大版本，查询该大版本时重新同步下载
+    server, catalogue = catalogue
+    catalogue.load_majors()
+    os.remove(tmp_path / 'srv' / 'release' / 'Blender3.6' / 'index.html')
+    catalogue.prefetch()
+    catalogue.wait()
+    assert catalogue.latest('3.6') is None
+    assert catalogue.latest('4.2')[1].name == 'blender-4.2.10-linux-x64.tar.xz'
+    write_listing(tmp_path / 'srv' / 'release' / 'Blender3.6', ['blender-3.6.13-linux-x64.tar.xz'])
+    assert [entry.name for entry in catalogue.get_minors('Blender3.6')] == ['blender-3.6.13-linux-x64.tar.xz']
@@ -0,0 +1,88 @@
+import queue
+import threading
+
+import pytest
+
+import progress
+from progress import ProgressCounter, ProgressPublisher, format_eta, UNIT_FILES
+
+class FakeClock:
+    # 代替 progress 模块中的 time：sleep() 阻塞到测试调用 tick()，发布线程每轮读到的时间由测试决定
+    def __init__(self):
+        self.now = 1000.0
+        self.ticks = threading.Semaphore(0)
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.ticks.acquire()
+    
+    def tick(self, seconds):
+        self.now += seconds
+        self.ticks.release()
+
+def test_concurrent_adds_are_not_lost():
+    # 多个线程同时累加，总数不丢失；读取在累加过程中也不出错
+    counter = ProgressCounter(8 * 10000)
+    
+    def work():
+        for _index in range(10000):
+            counter.add(1)
+    
+    threads = [threading.Thread(target=work) for _index in range(8)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        assert 0 <= counter.done <= counter.total
+    for thread in threads:
+        thread.join()
+    assert counter.done == 80000
+
+def test_start_and_set():
+    # set() 覆盖已累加的值，start() 开始新阶段并重置进度
+    counter = ProgressCounter(100)
+    counter.add(30)
+    counter.set(50)
+    assert counter.done == 50
+    counter.add(5)
+    assert counter.done == 55
+    counter.start(10, unit=UNIT_FILES, message='remove')
+    assert (counter.done, counter.total, counter.unit, counter.message, counter.phase) == (0, 10, UNIT_FILES, 'remove', 1)
+
+def test_speed_and_eta_with_fake_clock(monkeypatch):
+    # 速度按发布间隔的增量做指数平滑，剩余时间 = 剩余量 / 速度；新阶段重新计算速度
+    clock = FakeClock()
+    monkeypatch.setattr(progress, 'time', clock)
+    publisher = ProgressPublisher(interval=1, smoothing=0.5)
+    counter = ProgressCounter(1000)
+    snapshots = queue.Queue()
+    publisher.subscribe(counter, snapshots.put)
+    
+    def step(seconds, amount):
+        counter.add(amount)
+        clock.tick(seconds)
+        return snapshots.get(timeout=5)
+    
+    first = step(1, 0)
+    assert (first.done, first.speed, first.eta) == (0, None, None)
+    second = step(1, 100)
+    assert (second.done, second.speed, second.eta) == (100, 100, 9)
+    third = step(2, 400)
+    assert third.speed == 150
+    assert third.eta == pytest.approx(500 / 150)
+    
+    counter.start(50, unit=UNIT_FILES)
+    fourth = step(1, 10)
+    assert (fourth.done, fourth.total, fourth.speed, fourth.unit) == (10, 50, None, UNIT_FILES)
+    fifth = step(1, 20)
+    assert (fifth.speed, fifth.eta) == (20, 1)
+    
+    publisher.unsubscribe(counter)
+    assert snapshots.get(timeout=5).done == 30
+    clock.tick(1)  # 没有订阅后发布线程退出
+
+def test_format_eta():
+    assert format_eta(None) == ''
+    assert format_eta(59.6) == '1:00'
+    assert format_eta(3723) == '1:02:03'
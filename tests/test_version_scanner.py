@@ -0,0 +1,62 @@
+import os
+
+import version_scanner
+from version_scanner import FolderScanner
+
+def make_version(folder, name, executable=True):
+    path = folder / name
+    path.mkdir()
+    if executable:
+        (path / 'blender').write_bytes(b'')
+    return path
+
+def bump_mtime(path, step=1):
+    # 部分文件系统的修改时间精度较低，显式推进修改时间，确保扫描器能看到变化
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + step * 1000000000))
+
+def test_incremental_rescan(tmp_path, monkeypatch):
+    folder = tmp_path / 'versions'
+    folder.mkdir()
+    make_version(folder, 'Blender 4.2.3')
+    make_version(folder, 'Blender 3.6.5')
+    copying = make_version(folder, 'Blender 4.1.1', executable=False)
+    make_version(folder, '.blender_store', executable=False)
+    checked = []
+    blender_executable = version_scanner.blender_executable
+    
+    def counting_executable(directory):
+        checked.append(os.path.basename(directory))
+        return blender_executable(directory)
+    
+    monkeypatch.setattr(version_scanner, 'blender_executable', counting_executable)
+    scanner = FolderScanner(str(folder))
+    assert scanner.scan() == {
+        'Blender 4.2.3': str(folder / 'Blender 4.2.3' / 'blender'),
+        'Blender 3.6.5': str(folder / 'Blender 3.6.5' / 'blender'),
+    }
+    assert sorted(checked) == ['Blender 3.6.5', 'Blender 4.1.1', 'Blender 4.2.3']
+    
+    # 文件夹没有变化时只复查还没有可执行文件的子目录（正在复制中的版本）
+    checked.clear()
+    assert len(scanner.scan()) == 2
+    assert checked == []
+    (copying / 'blender').write_bytes(b'')
+    bump_mtime(copying)
+    assert 'Blender 4.1.1' in scanner.scan()
+    assert checked == ['Blender 4.1.1']
+    
+    # 增删子目录时只检查新出现的子目录，删除的版本从结果中消失
+    checked.clear()
+    make_version(folder, 'Blender 2.93.18')
+    os.rename(folder / 'Blender 3.6.5', tmp_path / 'removed')
+    bump_mtime(folder)
+    assert sorted(scanner.scan()) == ['Blender 2.93.18', 'Blender 4.1.1', 'Blender 4.2.3']
+    assert checked == ['Blender 2.93.18']
+
+def test_missing_folder(tmp_path):
+    scanner = FolderScanner(str(tmp_path / 'versions'))
+    assert scanner.scan() == {}
+    (tmp_path / 'versions').mkdir()
+    make_version(tmp_path / 'versions', 'Blender 4.2.3')
+    assert list(scanner.scan()) == ['Blender 4.2.3']
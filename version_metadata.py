@@ -0,0 +1,147 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from mirror_index import CACHE_DIR
+from lazy_import import lazy_import
+
+# 延迟加载的模块：第一次使用时才导入，不拖慢界面启动
+subprocess = lazy_import('subprocess')
+
+# 常量定义
+METADATA_PATH = os.path.join(CACHE_DIR, "version_metadata.json")
+PROBE_WORKERS = 4  # 后台探测版本信息的并发数
+PROBE_TIMEOUT = 20  # 运行 blender --version 的超时（秒）
+VERSION_OUTPUT_PATTERN = re.compile(r'^Blender (\S.*?)\s*$', re.MULTILINE)
+VERSION_DIR_PATTERN = re.compile(r'^\d+\.\d+$')  # 安装目录中以版本号命名的资源目录，例如 4.2
+CREATE_NO_WINDOW = 0x08000000  # Windows：运行 blender --version 时不弹出控制台窗口
+
+def probe_version(executable):
+    # 运行 blender --version 读取真实版本（每日构建会带 Alpha/Beta 等后缀）；失败时退回资源目录名
+    try:
+        result = subprocess.run([executable, '--version'], capture_output=True, text=True, errors='replace', timeout=PROBE_TIMEOUT,
+                                creationflags=CREATE_NO_WINDOW if sys.platform.startswith('win') else 0)
+        match = VERSION_OUTPUT_PATTERN.search(result.stdout)
+        if match:
+            return match.group(1)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    try:
+        with os.scandir(os.path.dirname(executable)) as iterator:
+            names = [entry.name for entry in iterator if entry.is_dir() and VERSION_DIR_PATTERN.match(entry.name)]
+    except OSError:
+        return None
+    return max(names, key=lambda name: tuple(int(part) for part in name.split('.'))) if names else None
+
+def directory_size(path):
+    # 递归统计目录中文件的总大小，不跟随符号链接
+    total = 0
+    try:
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += directory_size(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total
+
+class VersionMetadata:
+    # 已安装版本的附加信息（真实版本号、安装大小、上次启动时间），按可执行文件路径缓存到磁盘；
+    # 可执行文件修改时间变化后重新探测，探测在后台线程池中进行
+    def __init__(self, cache_path=METADATA_PATH, workers=PROBE_WORKERS):
+        self.cache_path = cache_path
+        self.workers = workers
+        self.entries = self.load()  # 可执行文件路径 -> {'mtime', 'version', 'size', 'last_launched'}
+        self._pending = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._executor = None
+    
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                entries = json.load(file)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def save(self):
+        # 先写临时文件再替换
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self.entries)
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        temp_path = f"{self.cache_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(temp_path, self.cache_path)
+    
+    def get(self, executable):
+        # 返回缓存的信息；可执行文件修改时间变化后版本号和大小视为过期（上次启动时间保留）
+        with self._lock:
+            entry = self.entries.get(executable)
+        if entry is None:
+            return None
+        try:
+            mtime = os.stat(executable).st_mtime_ns
+        except OSError:
+            return None
+        return entry if entry.get('mtime') == mtime else dict(entry, version=None, size=None)
+    
+    def request(self, executable, callback=None):
+        # 返回已缓存的信息；缓存缺失或过期时提交后台探测，完成后调用 callback(executable, entry)
+        entry = self.get(executable)
+        if entry is not None and entry.get('version') is not None:
+            return entry
+        with self._lock:
+            if executable in self._pending:
+                return entry
+            self._pending.add(executable)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='probe')
+            self._executor.submit(self.probe, executable, callback)
+        return entry
+    
+    def probe(self, executable, callback):
+        try:
+            mtime = os.stat(executable).st_mtime_ns
+            version = probe_version(executable)
+            size = directory_size(os.path.dirname(executable))
+        except OSError:
+            with self._lock:
+                self._pending.discard(executable)
+            return
+        with self._lock:
+            entry = dict(self.entries.get(executable, {}), mtime=mtime, version=version or '', size=size)
+            self.entries[executable] = entry
+            self._pending.discard(executable)
+            self._dirty = True
+            idle = not self._pending
+        if idle:
+            # 一批探测全部完成后才写一次磁盘
+            self.save()
+        if callback:
+            callback(executable, entry)
+    
+    def record_launch(self, executable):
+        with self._lock:
+            self.entries[executable] = dict(self.entries.get(executable, {}), last_launched=time.time())
+            self._dirty = True
+        self.save()
+    
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.save()
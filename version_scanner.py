@@ -0,0 +1,68 @@
+import os
+import threading
+from file_remover import REMOVING_SUFFIX
+
+# 常量定义
+BLENDER_EXECUTABLES = ('blender.exe', 'blender')
+WATCH_INTERVAL = 10  # 自动获取开启时检查版本文件夹变化的间隔（秒）
+
+def blender_executable(directory):
+    # 返回安装目录中的 Blender 可执行文件，找不到时返回 None
+    for name in BLENDER_EXECUTABLES:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+class FolderScanner:
+    # 增量扫描版本文件夹：记住文件夹和每个子目录的修改时间，只重新检查发生变化的子目录。
+    # 文件夹修改时间不变说明没有增删子目录，此时只需复查尚未找到可执行文件的子目录（例如正在复制中的版本）
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.folder_mtime = None
+        self.entries = {}  # 子目录名 -> (修改时间, 可执行文件路径或 None)
+        self._lock = threading.Lock()
+    
+    def scan(self):
+        # 返回 {子目录名: 可执行文件路径}；文件夹不存在时返回空字典
+        with self._lock:
+            try:
+                folder_mtime = os.stat(self.folder_path).st_mtime_ns
+            except OSError:
+                self.folder_mtime = None
+                self.entries = {}
+                return {}
+            
+            if folder_mtime == self.folder_mtime:
+                for name, previous in list(self.entries.items()):
+                    if previous[1] is None:
+                        self.check(name, os.path.join(self.folder_path, name), previous)
+            else:
+                # scandir 一次返回目录项类型（Windows 上连同修改时间），网络共享上比逐个 isdir/exists 少很多往返
+                entries = {}
+                try:
+                    with os.scandir(self.folder_path) as iterator:
+                        for entry in iterator:
+                            if entry.is_dir() and not entry.name.startswith('.') and not entry.name.endswith(REMOVING_SUFFIX):
+                                previous = self.entries.get(entry.name)
+                                entries[entry.name] = previous
+                                self.check(entry.name, entry.path, previous, entry)
+                except OSError:
+                    return self.results()
+                self.entries = {name: self.entries[name] for name in entries if name in self.entries}
+                self.folder_mtime = folder_mtime
+            return self.results()
+    
+    def check(self, name, path, previous, entry=None):
+        # 子目录修改时间未变时沿用上次的结果
+        try:
+            mtime = entry.stat().st_mtime_ns if entry is not None else os.stat(path).st_mtime_ns
+        except OSError:
+            self.entries.pop(name, None)
+            return
+        if previous is not None and previous[0] == mtime:
+            return
+        self.entries[name] = (mtime, blender_executable(path))
+    
+    def results(self):
+        return {name: executable for name, (_mtime, executable) in self.entries.items() if executable}
@@ -0,0 +1,96 @@
+import os
+import re
+import sys
+import ctypes
+import threading
+
+# 常量定义
+WARM_BUDGET = 512 * 1024 * 1024  # 每个版本最多预读的字节数
+WARM_CHUNK_SIZE = 1024 * 1024
+WARM_VERSIONS = 2  # 预读最近启动和最常启动的版本数
+LIBRARY_DIRS = ('blender.shared', 'lib')  # 与可执行文件一起加载的动态库目录
+# 启动时读取的资源目录（位于以版本号命名的目录下，例如 4.2/datafiles），按读取顺序排列；python 目录最大，放在最后
+RESOURCE_DIRS = ('datafiles', os.path.join('scripts', 'startup'), os.path.join('scripts', 'modules'), 'python')
+VERSION_DIR_PATTERN = re.compile(r'^\d+\.\d+$')
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000  # Windows：降低线程的 CPU 和 I/O 优先级
+
+def warm_files(install_dir):
+    # 按 Blender 启动时的读取顺序列出需要预读的文件：可执行文件和同目录的动态库、动态库目录、资源目录
+    try:
+        entries = sorted(os.scandir(install_dir), key=lambda entry: entry.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_file():
+            yield entry.path
+    directories = [os.path.join(install_dir, name) for name in LIBRARY_DIRS]
+    for entry in entries:
+        if entry.is_dir() and VERSION_DIR_PATTERN.match(entry.name):
+            directories += [os.path.join(entry.path, name) for name in RESOURCE_DIRS]
+    for directory in directories:
+        for root, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for name in sorted(filenames):
+                yield os.path.join(root, name)
+
+def warm_file(path):
+    # 把文件读入页缓存，返回文件大小；支持 posix_fadvise 时只通知内核预读，不经过 Python
+    try:
+        with open(path, 'rb', buffering=0) as file:
+            size = os.fstat(file.fileno()).st_size
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(file.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+                return size
+            buffer = bytearray(WARM_CHUNK_SIZE)
+            while file.readinto(buffer):
+                pass
+            return size
+    except OSError:
+        return 0
+
+def lower_thread_priority():
+    # 预读不应与用户操作争抢磁盘和 CPU：Windows 进入后台模式，Linux 调高当前线程的 nice 值
+    if sys.platform.startswith('win'):
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+    elif sys.platform.startswith('linux'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except OSError:
+            pass
+
+class Prewarmer:
+    # 在低优先级后台线程中预读常用版本的文件，之后启动这些版本时几乎不需要读磁盘；本次运行中每个版本只预读一次
+    def __init__(self, budget=WARM_BUDGET):
+        self.budget = budget
+        self.warmed = set()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, install_dirs):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._thread
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, args=(list(install_dirs),), daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def run(self, install_dirs):
+        lower_thread_priority()
+        for install_dir in install_dirs:
+            if install_dir in self.warmed:
+                continue
+            total = 0
+            for path in warm_files(install_dir):
+                if self._stop.is_set():
+                    return
+                total += warm_file(path)
+                if total >= self.budget:
+                    break
+            self.warmed.add(install_dir)
+            print(_("已预读 {0}：{1:.1f} MB").format(install_dir, total / 1024 / 1024))  # 调试信息
+
+    def stop(self):
+        self._stop.set()